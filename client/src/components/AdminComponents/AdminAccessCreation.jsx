@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from "react";
 import Select from 'react-select';
 import { ToastContainer } from 'react-toastify';
+import { resolveJobResponse } from "../../utils/jobs";
 import { CollegeTable } from "../SuperAdminComponents/AccessCreationTables/CollegeOnboardTable";
 import { TeacherTable } from "../SuperAdminComponents/AccessCreationTables/TeacherTable";
 import { StudentTable } from "../SuperAdminComponents/AccessCreationTables/StudentTable";
@@ -390,12 +391,12 @@ const SuperAdminAccessCreation = () => {
         body: uploadFormData
       });
 
-      const result = await res.json();
+      const { ok, data: result } = await resolveJobResponse(res);
 
       let messageType = "error";
       let messageText = result.message || result.detail || "Bulk upload failed";
 
-      if (res.ok && result.status === "success") {
+      if (ok && result.status === "success") {
         messageType = "success";
         messageText = `Successfully created ${result.created_count} students in ${college.name} - ${formData.department}`;
 
@@ -411,15 +412,15 @@ const SuperAdminAccessCreation = () => {
           college: ""
         }));
 
-      } else if (res.ok && result.status === "partial") {
+      } else if (ok && result.status === "partial") {
         messageType = "warning";
         messageText = `Created ${result.created_count} students in ${college.name} - ${formData.department}. ${result.errors?.length || 0} rows had errors.`;
         setBulkErrors(result.errors || []);
-      } else if (res.ok && result.status === "error") {
+      } else if (ok && result.status === "error") {
         messageType = "error";
         messageText = result.message || "No valid students were created";
         setBulkErrors(result.errors || []);
-      } else if (!res.ok) {
+      } else if (!ok) {
         // Handle non-ok responses
         setBulkErrors(result.errors || [result.detail] || ["An unknown error occurred."]);
       }
@@ -430,7 +431,7 @@ const SuperAdminAccessCreation = () => {
       await fetchStudents();
 
       // Show errors modal if there are errors
-      if (bulkErrors.length > 0) {
+      if (result.errors?.length > 0) {
         setShowBulkErrorsModal(true);
       }
 
@@ -4,6 +4,7 @@ import JoditEditor from "jodit-react";
 import * as pdfjsLib from "pdfjs-dist";
 import mammoth from "mammoth";
 import { ToastContainer, toast } from "react-toastify";
+import { resolveJobResponse } from "../../utils/jobs";
 import AssignmentTable from "../SuperAdminComponents/UploadSectionTables/AssignmentTable";
 import OverviewTable from "../SuperAdminComponents/UploadSectionTables/OverviewTable";
 import McqTable from "../SuperAdminComponents/UploadSectionTables/McqTable";
@@ -215,7 +216,8 @@ const AdminUpload = () => {
         body: fd,
       });
 
-      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      const { ok, data } = await resolveJobResponse(res);
+      if (!ok) throw new Error(data.detail || `HTTP ${res.status}`);
       toast.success("Assignment uploaded successfully!");
       fetchAssignments();
       setFormData((prev) => ({ 
@@ -309,7 +311,8 @@ const AdminUpload = () => {
         headers: { Accept: "application/json" },
         body: fd,
       });
-      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      const { ok, data } = await resolveJobResponse(res);
+      if (!ok) throw new Error(data.detail || `HTTP ${res.status}`);
 
       toast.success("Questions uploaded successfully!");
       setFormData((prev) => ({ 
@@ -4,6 +4,7 @@ import JoditEditor from "jodit-react";
 import * as pdfjsLib from "pdfjs-dist";
 import mammoth from "mammoth";
 import { ToastContainer, toast } from "react-toastify";
+import { resolveJobResponse } from "../../utils/jobs";
 import AssignmentTable from "./UploadSectionTables/AssignmentTable";
 import OverviewTable from "./UploadSectionTables/OverviewTable";
 import McqTable from "./UploadSectionTables/McqTable";
@@ -224,7 +225,8 @@ const SuperAdminUpload = () => {
         body: fd,
       });
 
-      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      const { ok, data } = await resolveJobResponse(res);
+      if (!ok) throw new Error(data.detail || `HTTP ${res.status}`);
       toast.success("Assignment uploaded successfully!");
       fetchAssignments();
       setFormData((prev) => ({
@@ -334,7 +336,8 @@ const SuperAdminUpload = () => {
         headers: { Accept: "application/json" },
         body: fd,
       });
-      if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      const { ok, data } = await resolveJobResponse(res);
+      if (!ok) throw new Error(data.detail || `HTTP ${res.status}`);
 
       toast.success("Questions uploaded successfully!");
       setFormData((prev) => ({
@@ -1,6 +1,7 @@
 import React, { useState, useMemo } from "react";
 import ActionButtons from "./common/ActionButton";
 import { toast } from "react-toastify";
+import { resolveJobResponse } from "../../../utils/jobs";
 import Swal from "sweetalert2";
 
 
@@ -65,8 +66,8 @@ const AssignmentTable = ({
         }
       );
 
-      const data = await response.json();
-      if (response.ok) {
+      const { ok, data } = await resolveJobResponse(response);
+      if (ok) {
         toast.success(data.message || "File updated successfully!");
         setIsModalOpen(false);
         window.location.reload();
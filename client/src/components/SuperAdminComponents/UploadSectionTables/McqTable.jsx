@@ -1,5 +1,6 @@
 import React, { useState, useMemo } from "react";
 import { toast } from "react-toastify";
+import { resolveJobResponse } from "../../../utils/jobs";
 
 const McqTable = ({
   data,
@@ -97,8 +98,8 @@ const McqTable = ({
         }
       );
 
-      const data = await response.json();
-      if (response.ok) {
+      const { ok, data } = await resolveJobResponse(response);
+      if (ok) {
         toast.success(data.message || "File updated successfully!");
         setIsModalOpen(false);
         window.location.reload();
@@ -0,0 +1,46 @@
+// Uploads that import a file run as background jobs on the server: the
+// endpoint answers 202 { status: "queued", job_id } and the outcome is
+// read from /jobs/{job_id} once the job has finished.
+
+const API_BASE = import.meta.env.VITE_BACKEND_API_URL;
+const POLL_INTERVAL_MS = 1000;
+// Give up after this long; the job keeps running on the server
+const MAX_WAIT_MS = 10 * 60 * 1000;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+/**
+ * Read an upload response, waiting for its job when the server queued one.
+ * Resolves to { ok, data }: data is the job's result (the body the endpoint
+ * returned before it was queued) or { detail } when the job failed or did
+ * not finish within MAX_WAIT_MS.
+ */
+export async function resolveJobResponse(res) {
+  const data = await res.json();
+  if (res.status !== 202 || !data.job_id) {
+    return { ok: res.ok, data };
+  }
+
+  const deadline = Date.now() + MAX_WAIT_MS;
+  while (Date.now() < deadline) {
+    await sleep(POLL_INTERVAL_MS);
+    const jobRes = await fetch(`${API_BASE}/jobs/${data.job_id}`);
+    const body = await jobRes.json();
+
+    if (!jobRes.ok) {
+      return { ok: false, data: body };
+    }
+    const job = body.data;
+    if (job.status === "succeeded") {
+      return { ok: true, data: job.result || {} };
+    }
+    if (job.status === "failed") {
+      return { ok: false, data: { detail: job.error || "Upload failed" } };
+    }
+  }
+
+  return {
+    ok: false,
+    data: { detail: "The upload is still being processed. Check again in a few minutes." },
+  };
+}
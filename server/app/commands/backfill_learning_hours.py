@@ -0,0 +1,33 @@
+"""
+Rebuild learning_hours_daily from user_sessions.
+
+Usage (from server/app):
+    python -m commands.backfill_learning_hours                          # whole history
+    python -m commands.backfill_learning_hours --from 2025-01-01 --to 2025-03-31
+    python -m commands.backfill_learning_hours --chunk-days 7
+
+Each chunk of days is deleted and recomputed in its own transaction, so
+it is safe to re-run over a range that is already filled in.
+"""
+import argparse
+import json
+from datetime import date
+from config.database import get_db
+from services.learning_hours import rebuild_learning_hours
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, help="first day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, help="last day (YYYY-MM-DD)")
+    parser.add_argument("--chunk-days", type=int, default=31, help="days rebuilt per transaction")
+    args = parser.parse_args()
+
+    with get_db() as conn:
+        report = rebuild_learning_hours(conn, start=args.start, end=args.end, chunk_days=max(1, args.chunk_days))
+
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
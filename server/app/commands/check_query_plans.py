@@ -0,0 +1,41 @@
+"""
+EXPLAIN the hot queries and fail when one falls back to a full scan.
+
+Usage (from server/app):
+    python -m commands.check_query_plans            # summary per query
+    python -m commands.check_query_plans --plans    # include the EXPLAIN rows
+
+Exits with status 1 when a query reads one of its indexed tables with a
+full table or index scan (see services/query_plans.py), so it can gate a
+deploy right after `python -m commands.migrate`.
+"""
+import argparse
+import json
+import sys
+from config.database import get_db
+from services.query_plans import check_query_plans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plans", action="store_true", help="print every EXPLAIN row")
+    args = parser.parse_args()
+
+    with get_db() as conn:
+        with conn.cursor() as cursor:
+            report = check_query_plans(cursor)
+
+    if not args.plans:
+        for query in report["queries"]:
+            query["plan"] = [
+                f"{row['table']}: {row['type']} via {row['key'] or '-'}" for row in query["plan"]
+            ]
+
+    print(json.dumps(report, indent=2, default=str))
+
+    if report["full_scans"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Apply the schema migrations in server/migrations.
+
+Usage (from server/app):
+    python -m commands.migrate                    # apply everything pending
+    python -m commands.migrate --status           # list versions and their state
+    python -m commands.migrate --to 4             # apply up to 0004 only
+    python -m commands.migrate --fake --to 5      # record 0001-0005 as applied
+                                                  # without running them
+
+--fake is for databases that already ran the old server/sql scripts by
+hand: record those versions, then run the command again for the rest.
+Exits with status 1 when something failed or (with --status) when a
+migration is pending, changed or missing.
+"""
+import argparse
+import json
+import sys
+from config.database import get_db
+from services.migrations import MigrationError, apply_migrations, migration_status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--status", action="store_true", help="only report the state of each migration")
+    parser.add_argument("--to", dest="target", type=int, help="last version to apply")
+    parser.add_argument("--fake", action="store_true", help="record migrations as applied without running them")
+    args = parser.parse_args()
+
+    with get_db() as conn:
+        if args.status:
+            status = migration_status(conn)
+            print(json.dumps(status, indent=2, default=str))
+            if any(entry["state"] != "applied" for entry in status):
+                sys.exit(1)
+            return
+
+        try:
+            report = apply_migrations(conn, target=args.target, fake=args.fake)
+        except MigrationError as e:
+            print(json.dumps({"error": str(e)}, indent=2))
+            sys.exit(1)
+
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
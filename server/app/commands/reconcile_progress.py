@@ -0,0 +1,44 @@
+"""
+Rebuild student_topic_progress from sub_topic_marks and report drift.
+
+Usage (from server/app):
+    python -m commands.reconcile_progress                 # report only
+    python -m commands.reconcile_progress --apply         # report and fix
+    python -m commands.reconcile_progress --topic-id 3 --student-id 42
+
+Exits with status 1 when drift was found and not fixed, so it can run
+from cron / CI as a check.
+"""
+import argparse
+import json
+import sys
+from config.database import get_db
+from services.topic_progress import reconcile_topic_progress
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apply", action="store_true", help="write the rebuilt values back")
+    parser.add_argument("--topic-id", type=int)
+    parser.add_argument("--student-id", type=int)
+    parser.add_argument("--samples", type=int, default=20, help="max drifted rows to print")
+    args = parser.parse_args()
+
+    with get_db() as conn:
+        report = reconcile_topic_progress(
+            conn,
+            apply=args.apply,
+            student_id=args.student_id,
+            topic_id=args.topic_id,
+            sample_limit=args.samples,
+        )
+
+    print(json.dumps(report, indent=2, default=str))
+
+    out_of_sync = report["rows_drifted"] + report["rows_missing"] + report["rows_orphaned"]
+    if out_of_sync and not args.apply:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
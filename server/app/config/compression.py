@@ -0,0 +1,285 @@
+"""
+Negotiated response compression (brotli / gzip).
+
+Pure ASGI middleware:
+  - picks br or gzip from Accept-Encoding (br only when the `brotli`
+    package is installed)
+  - leaves bodies under COMPRESSION_MIN_SIZE, already-encoded responses
+    and non-compressible media types (images, audio, zip/xlsx) alone
+  - compresses bodies of COMPRESSION_OFFLOAD_BYTES and more on a small
+    thread pool so a multi-megabyte report doesn't stall the event loop
+    (zlib and brotli release the GIL while compressing)
+  - streaming responses are compressed chunk by chunk
+
+Bytes before/after are counted per route for /system/compression.
+"""
+import asyncio
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import (
+    COMPRESSION_MIN_SIZE,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_BROTLI_QUALITY,
+    COMPRESSION_OFFLOAD_BYTES,
+    COMPRESSION_WORKERS,
+)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "text/",
+    "image/svg+xml",
+)
+
+
+def _accepted_encodings(headers):
+    """{encoding: q} from the Accept-Encoding header"""
+    accepted = {}
+    for name, value in headers:
+        if name != b"accept-encoding":
+            continue
+        for item in value.decode("latin-1").split(","):
+            parts = [p.strip() for p in item.split(";")]
+            if not parts[0]:
+                continue
+            q = 1.0
+            for param in parts[1:]:
+                if param.startswith("q="):
+                    try:
+                        q = float(param[2:])
+                    except ValueError:
+                        q = 0.0
+            accepted[parts[0].lower()] = q
+    return accepted
+
+
+def choose_encoding(headers):
+    accepted = _accepted_encodings(headers)
+    wildcard = accepted.get("*", 0.0)
+    for encoding in (("br",) if brotli else ()) + ("gzip",):
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def _gzip_compressor(level):
+    # wbits=31 -> gzip container
+    return zlib.compressobj(level, zlib.DEFLATED, 31)
+
+
+def compress(body, encoding, gzip_level=COMPRESSION_GZIP_LEVEL, brotli_quality=COMPRESSION_BROTLI_QUALITY):
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    compressor = _gzip_compressor(gzip_level)
+    return compressor.compress(body) + compressor.flush()
+
+
+class _StreamCompressor:
+    """Incremental compressor; every chunk is flushed so clients see data as it streams"""
+
+    def __init__(self, encoding, gzip_level, brotli_quality):
+        self.encoding = encoding
+        if encoding == "br":
+            self._c = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._c = _gzip_compressor(gzip_level)
+
+    def chunk(self, data, final):
+        if self.encoding == "br":
+            out = self._c.process(data)
+            return out + (self._c.finish() if final else self._c.flush())
+        out = self._c.compress(data)
+        return out + self._c.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route, encoding, raw_bytes, sent_bytes):
+        with self._lock:
+            s = self._routes.setdefault(route, {
+                "responses": 0, "compressed": 0, "bytes_in": 0, "bytes_out": 0, "encodings": {}
+            })
+            s["responses"] += 1
+            s["bytes_in"] += raw_bytes
+            s["bytes_out"] += sent_bytes
+            if encoding:
+                s["compressed"] += 1
+                s["encodings"][encoding] = s["encodings"].get(encoding, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            routes = {}
+            total_in = total_out = 0
+            for route, s in sorted(self._routes.items(), key=lambda kv: kv[1]["bytes_in"] - kv[1]["bytes_out"], reverse=True):
+                routes[route] = {
+                    **s,
+                    "encodings": dict(s["encodings"]),
+                    "bytes_saved": s["bytes_in"] - s["bytes_out"],
+                    "ratio": round(s["bytes_out"] / s["bytes_in"], 4) if s["bytes_in"] else 1.0,
+                }
+                total_in += s["bytes_in"]
+                total_out += s["bytes_out"]
+            return {
+                "bytes_in": total_in,
+                "bytes_out": total_out,
+                "bytes_saved": total_in - total_out,
+                "ratio": round(total_out / total_in, 4) if total_in else 1.0,
+                "routes": routes,
+            }
+
+
+compression_stats = CompressionStats()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_compression_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=COMPRESSION_WORKERS, thread_name_prefix="compress")
+    return _executor
+
+
+def shutdown_compression_executor():
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+
+
+def route_name(scope):
+    """Path template of the matched route ("/users/get/students", "/topics/{topic_id}")"""
+    # routes of an included router keep their own path; FastAPI records the prefixed one
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    path = getattr(context, "path", None) or getattr(scope.get("route"), "path", None)
+    return path or "<unmatched>"
+
+
+def _add_vary_accept_encoding(headers):
+    """
+    Add Accept-Encoding to Vary, merging it into a Vary header set further
+    in (CORSMiddleware always sends `Vary: Origin`)
+    """
+    for i, (key, value) in enumerate(headers):
+        if key.lower() != b"vary":
+            continue
+        listed = {v.strip().lower() for v in value.split(b",")}
+        if b"accept-encoding" in listed or b"*" in listed:
+            return headers
+        headers = list(headers)
+        headers[i] = (key, value + b", Accept-Encoding" if value.strip() else b"Accept-Encoding")
+        return headers
+    return headers + [(b"vary", b"Accept-Encoding")]
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size=COMPRESSION_MIN_SIZE, gzip_level=COMPRESSION_GZIP_LEVEL,
+                 brotli_quality=COMPRESSION_BROTLI_QUALITY, offload_bytes=COMPRESSION_OFFLOAD_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.offload_bytes = offload_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(scope["headers"])
+        start = None
+        stream = None
+        vary = False
+        counted = {"in": 0, "out": 0}
+
+        async def send_compressed(message):
+            nonlocal start, stream, encoding, vary
+
+            if message["type"] == "http.response.start":
+                start = message
+                headers = {k.lower(): v for k, v in message.get("headers", [])}
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+                vary = content_type.startswith(COMPRESSIBLE_TYPES)
+                if (
+                    encoding is None
+                    or not vary
+                    or b"content-encoding" in headers
+                    or message["status"] in (204, 304)
+                ):
+                    encoding = None
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            counted["in"] += len(body)
+
+            if stream is None and start is not None:
+                # first body message decides between whole-body and streaming
+                if encoding is None or (not more_body and len(body) < self.minimum_size):
+                    await self._send_start(send, start, None, None, vary)
+                    start = None
+                    stream = False
+                elif not more_body:
+                    if len(body) >= self.offload_bytes:
+                        loop = asyncio.get_running_loop()
+                        compressed = await loop.run_in_executor(
+                            get_compression_executor(), compress, body, encoding,
+                            self.gzip_level, self.brotli_quality
+                        )
+                    else:
+                        compressed = compress(body, encoding, self.gzip_level, self.brotli_quality)
+                    await self._send_start(send, start, encoding, len(compressed), vary)
+                    start = None
+                    counted["out"] += len(compressed)
+                    await send({"type": "http.response.body", "body": compressed, "more_body": False})
+                    self._record(scope, encoding, counted)
+                    return
+                else:
+                    stream = _StreamCompressor(encoding, self.gzip_level, self.brotli_quality)
+                    await self._send_start(send, start, encoding, None, vary)
+                    start = None
+
+            if stream:
+                data = stream.chunk(body, final=not more_body)
+                counted["out"] += len(data)
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+            else:
+                counted["out"] += len(body)
+                await send(message)
+
+            if not more_body:
+                self._record(scope, encoding if stream else None, counted)
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    async def _send_start(send, start, encoding, length, vary):
+        headers = list(start.get("headers", []))
+        if encoding:
+            headers = [(k, v) for k, v in headers if k.lower() != b"content-length"]
+            if length is not None:
+                headers.append((b"content-length", str(length).encode()))
+            headers.append((b"content-encoding", encoding.encode()))
+        if vary:
+            headers = _add_vary_accept_encoding(headers)
+        await send({**start, "headers": headers})
+
+    @staticmethod
+    def _record(scope, encoding, counted):
+        compression_stats.record(route_name(scope), encoding, counted["in"], counted["out"])
@@ -1,8 +1,18 @@
 import pymysql
-from pymysql.cursors import DictCursor
+from pymysql.cursors import DictCursor, SSDictCursor
 from contextlib import contextmanager
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import contextvars
+import functools
+import logging
+import re
+import threading
+import time
 import os
 from dotenv import load_dotenv
+from config.profiling import current_profile
 
 load_dotenv()
 
@@ -17,11 +27,531 @@ DB_CONFIG = {
     'cursorclass': DictCursor
 }
 
+# Connection pool configuration
+POOL_CONFIG = {
+    'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+    'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 20)),
+    'recycle_seconds': int(os.getenv('DB_POOL_RECYCLE_SECONDS', 1800)),
+    'max_idle_seconds': int(os.getenv('DB_POOL_MAX_IDLE_SECONDS', 300)),
+    'wait_timeout': float(os.getenv('DB_POOL_WAIT_TIMEOUT', 10)),
+}
+
+# Threads dedicated to blocking database work (defaults to one per pooled connection)
+DB_EXECUTOR_WORKERS = int(os.getenv('DB_EXECUTOR_WORKERS', POOL_CONFIG['max_size']))
+
+# SQL instrumentation: per-request query stats, Server-Timing and the slow-query log
+SQL_INSTRUMENTATION = os.getenv('SQL_INSTRUMENTATION', '1') == '1'
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 200))
+# A request running the same statement this many times is logged (likely N+1)
+REPEATED_QUERY_THRESHOLD = int(os.getenv('REPEATED_QUERY_THRESHOLD', 20))
+
+query_logger = logging.getLogger("lordmind.sql")
+
+
+# ------------------------------------------
+# SQL instrumentation
+# ------------------------------------------
+_NORMALIZE_PATTERNS = [
+    (re.compile(r"--[^\n]*|/\*.*?\*/", re.S), " "),
+    (re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\""), "?"),
+    (re.compile(r"%s|%\(\w+\)s"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\s+"), " "),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?+)"),
+    (re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+"), "(?+)..."),
+]
+NORMALIZED_SQL_MAX_CHARS = 2000
+
+
+@functools.lru_cache(maxsize=2048)
+def _normalize_sql(sql):
+    for pattern, replacement in _NORMALIZE_PATTERNS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def normalize_sql(sql):
+    """
+    Statement shape without its values, for grouping and logging:
+    "SELECT * FROM users WHERE user_id = %s AND role_id IN (1, 2)"
+    -> "SELECT * FROM users WHERE user_id = ? AND role_id IN (?+)"
+    """
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", "replace")
+    return _normalize_sql(sql[:NORMALIZED_SQL_MAX_CHARS])
+
+
+class QueryStats:
+    """Statements run on behalf of one request (or any other tracked unit of work)"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.total_time = 0.0
+        self.rows = 0
+        self.slowest_time = 0.0
+        self.slowest_sql = None
+        self.statements = {}
+        self._lock = threading.Lock()
+
+    def record(self, sql, elapsed, rows):
+        with self._lock:
+            self.count += 1
+            self.total_time += elapsed
+            self.rows += rows
+            self.statements[sql] = self.statements.get(sql, 0) + 1
+            if elapsed > self.slowest_time:
+                self.slowest_time = elapsed
+                self.slowest_sql = sql
+
+    def add_rows(self, rows):
+        with self._lock:
+            self.rows += rows
+
+    def most_repeated(self):
+        """(normalized statement, executions) of the most repeated statement"""
+        with self._lock:
+            if not self.statements:
+                return None, 0
+            sql = max(self.statements, key=self.statements.get)
+            return sql, self.statements[sql]
+
+    def summary(self):
+        repeated_sql, repeated = self.most_repeated()
+        return {
+            "queries": self.count,
+            "db_ms": round(self.total_time * 1000, 2),
+            "rows": self.rows,
+            "slowest_ms": round(self.slowest_time * 1000, 2),
+            "slowest_sql": self.slowest_sql,
+            "most_repeated": repeated,
+            "most_repeated_sql": repeated_sql,
+        }
+
+
+_query_stats = contextvars.ContextVar("query_stats", default=None)
+
+
+def current_query_stats():
+    """QueryStats of the request being served on this context (None outside one)"""
+    return _query_stats.get()
+
+
+@contextmanager
+def track_queries():
+    """
+    Collect QueryStats for the statements run inside the block, including
+    those run on the DB executor through run_db (it copies the context).
+    """
+    stats = QueryStats()
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+def log_repeated_queries(stats, label):
+    """Log a unit of work that ran one statement REPEATED_QUERY_THRESHOLD times or more"""
+    repeated_sql, repeated = stats.most_repeated()
+    if REPEATED_QUERY_THRESHOLD and repeated >= REPEATED_QUERY_THRESHOLD:
+        query_logger.warning(
+            "Repeated query in %s: ran %d times (%d queries, %.1f ms DB): %s",
+            label, repeated, stats.count, stats.total_time * 1000, repeated_sql
+        )
+
+
+def _record_query(query, elapsed, rows):
+    sql = normalize_sql(query)
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.record(sql, elapsed, rows)
+    if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+        query_logger.warning("Slow query (%.1f ms, %d rows): %s", elapsed * 1000, rows, sql)
+
+
+class InstrumentedCursor(DictCursor):
+    """DictCursor that times every statement (executemany goes through execute)"""
+
+    def execute(self, query, args=None):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, args)
+        finally:
+            rows = self._rows
+            _record_query(query, time.perf_counter() - started, len(rows) if rows else 0)
+
+
+class InstrumentedSSDictCursor(SSDictCursor):
+    """Unbuffered variant: rows are counted as they are read"""
+
+    def execute(self, query, args=None):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, args)
+        finally:
+            _record_query(query, time.perf_counter() - started, 0)
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(size)
+        stats = _query_stats.get()
+        if stats is not None and rows:
+            stats.add_rows(len(rows))
+        return rows
+
+
+if SQL_INSTRUMENTATION:
+    DB_CONFIG['cursorclass'] = InstrumentedCursor
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the wait timeout"""
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of pymysql connections.
+
+    - at most `max_size` connections exist at once (checked out + idle)
+    - idle connections older than `recycle_seconds` or unused for
+      `max_idle_seconds` are closed instead of being handed out again
+      (idle ones are never closed below `min_size`)
+    - every checkout pings the connection and reconnects if it went away
+    - when the pool is exhausted, callers wait up to `wait_timeout` seconds
+    """
+
+    def __init__(self, db_config, min_size=2, max_size=20, recycle_seconds=1800,
+                 max_idle_seconds=300, wait_timeout=10.0):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.db_config = db_config
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max_size
+        self.recycle_seconds = recycle_seconds
+        self.max_idle_seconds = max_idle_seconds
+        self.wait_timeout = wait_timeout
+
+        # idle entries are (connection, created_at, last_used_at)
+        self._idle = deque()
+        self._created_at = {}
+        self._size = 0
+        self._checked_out = 0
+        self._cond = threading.Condition()
+
+        self._stats = {
+            "connections_created": 0,
+            "connections_closed": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "timeouts": 0,
+            "ping_failures": 0,
+        }
+
+    # ------------------------------------------
+    # Connection lifecycle helpers
+    # ------------------------------------------
+    def _connect(self):
+        conn = pymysql.connect(**self.db_config)
+        self._created_at[id(conn)] = time.monotonic()
+        return conn
+
+    def _close(self, conn):
+        self._created_at.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_expired(self, created_at, last_used_at, now):
+        if self.recycle_seconds and now - created_at > self.recycle_seconds:
+            return True
+        if self.max_idle_seconds and now - last_used_at > self.max_idle_seconds:
+            return True
+        return False
+
+    def _discard(self, conn):
+        """Close a connection and free its slot (caller must hold the lock)"""
+        self._size -= 1
+        self._stats["connections_closed"] += 1
+        self._cond.notify()
+        self._close(conn)
+
+    # ------------------------------------------
+    # Public API
+    # ------------------------------------------
+    def acquire(self):
+        """Check a live connection out of the pool"""
+        waited = None
+        deadline = None
+
+        with self._cond:
+            while True:
+                now = time.monotonic()
+
+                # 1️⃣ Reuse an idle connection (newest first keeps the pool warm)
+                while self._idle:
+                    conn, created_at, last_used_at = self._idle.pop()
+                    if self._is_expired(created_at, last_used_at, now):
+                        self._discard(conn)
+                        continue
+                    self._checked_out += 1
+                    break
+                else:
+                    conn = None
+
+                if conn is not None:
+                    break
+
+                # 2️⃣ Open a new connection if below max_size
+                if self._size < self.max_size:
+                    self._size += 1
+                    self._checked_out += 1
+                    break
+
+                # 3️⃣ Pool exhausted -> wait for a release
+                if deadline is None:
+                    waited = now
+                    deadline = now + self.wait_timeout
+                    self._stats["waits"] += 1
+
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    self._record_wait(waited)
+                    raise PoolTimeoutError(
+                        f"Timed out after {self.wait_timeout}s waiting for a database connection "
+                        f"({self._checked_out}/{self.max_size} checked out)"
+                    )
+                self._cond.wait(remaining)
+
+            self._stats["checkouts"] += 1
+            if waited is not None:
+                self._record_wait(waited)
+
+        # Network I/O happens outside the lock
+        try:
+            if conn is None:
+                conn = self._connect()
+                with self._cond:
+                    self._stats["connections_created"] += 1
+            else:
+                try:
+                    conn.ping(reconnect=True)
+                except Exception:
+                    with self._cond:
+                        self._stats["ping_failures"] += 1
+                    self._close(conn)
+                    conn = self._connect()
+                    with self._cond:
+                        self._stats["connections_created"] += 1
+        except Exception:
+            with self._cond:
+                self._checked_out -= 1
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        return conn
+
+    def release(self, conn, discard=False):
+        """Return a connection to the pool (or close it when `discard` is set)"""
+        if not discard:
+            try:
+                # Never hand out a connection with an open transaction
+                conn.rollback()
+            except Exception:
+                discard = True
+
+        with self._cond:
+            self._checked_out -= 1
+
+            if discard:
+                self._discard(conn)
+                return
+
+            now = time.monotonic()
+            created_at = self._created_at.get(id(conn), now)
+            if self.recycle_seconds and now - created_at > self.recycle_seconds:
+                self._discard(conn)
+                return
+
+            self._idle.append((conn, created_at, now))
+            self._cond.notify()
+
+    def prune(self):
+        """Close idle connections past their lifetime, keeping at least min_size"""
+        with self._cond:
+            now = time.monotonic()
+            kept = deque()
+            while self._idle:
+                conn, created_at, last_used_at = self._idle.popleft()
+                if self._size > self.min_size and self._is_expired(created_at, last_used_at, now):
+                    self._discard(conn)
+                else:
+                    kept.append((conn, created_at, last_used_at))
+            self._idle = kept
+
+    def warm_up(self):
+        """Open connections until min_size idle connections exist"""
+        while True:
+            with self._cond:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                raise
+            with self._cond:
+                self._stats["connections_created"] += 1
+                self._idle.append((conn, time.monotonic(), time.monotonic()))
+                self._cond.notify()
+
+    def close_all(self):
+        """Close every idle connection (checked-out ones close on release)"""
+        with self._cond:
+            while self._idle:
+                conn, _, _ = self._idle.pop()
+                self._discard(conn)
+
+    def _record_wait(self, started):
+        elapsed = time.monotonic() - started
+        self._stats["wait_time_total"] += elapsed
+        self._stats["wait_time_max"] = max(self._stats["wait_time_max"], elapsed)
+
+    def stats(self):
+        """Snapshot of pool utilization, used for sizing under load"""
+        with self._cond:
+            checkouts = self._stats["checkouts"]
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "checked_out": self._checked_out,
+                "idle": len(self._idle),
+                "checkouts": checkouts,
+                "waits": self._stats["waits"],
+                "timeouts": self._stats["timeouts"],
+                "wait_time_total_ms": round(self._stats["wait_time_total"] * 1000, 2),
+                "wait_time_max_ms": round(self._stats["wait_time_max"] * 1000, 2),
+                "wait_time_avg_ms": round(
+                    self._stats["wait_time_total"] * 1000 / self._stats["waits"], 2
+                ) if self._stats["waits"] else 0.0,
+                "connections_created": self._stats["connections_created"],
+                "connections_closed": self._stats["connections_closed"],
+                "ping_failures": self._stats["ping_failures"],
+            }
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide pool (re-created after fork)"""
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool_pid != pid:
+                _pool = ConnectionPool(DB_CONFIG, **POOL_CONFIG)
+                _pool_pid = pid
+    return _pool
+
+
+def get_pool_stats():
+    """Current connection pool statistics"""
+    return get_pool().stats()
+
+
 @contextmanager
 def get_db():
-    """Context manager for database connections"""
-    connection = pymysql.connect(**DB_CONFIG)
+    """Context manager for pooled database connections"""
+    pool = get_pool()
+    connection = pool.acquire()
+    broken = False
     try:
         yield connection
+    except pymysql.err.OperationalError:
+        broken = True
+        raise
     finally:
-        connection.close()
\ No newline at end of file
+        pool.release(connection, discard=broken)
+
+
+def stream_rows(query, params=None, fetch_size=1000):
+    """
+    Yield the rows of `query` one by one from an unbuffered server-side
+    cursor (SSDictCursor), so memory stays flat however many rows match.
+    The pooled connection is held until the generator is exhausted or
+    closed; a stream abandoned half-way drops its connection instead of
+    draining the unread rows.
+    """
+    pool = get_pool()
+    connection = pool.acquire()
+    finished = False
+    try:
+        cursor = connection.cursor(InstrumentedSSDictCursor if SQL_INSTRUMENTATION else SSDictCursor)
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            yield from rows
+        cursor.close()
+        finished = True
+    finally:
+        pool.release(connection, discard=not finished)
+
+
+_executor = None
+_executor_pid = None
+
+
+def get_db_executor():
+    """Return the process-wide executor used for blocking database work"""
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _pool_lock:
+            if _executor is None or _executor_pid != pid:
+                _executor = ThreadPoolExecutor(
+                    max_workers=DB_EXECUTOR_WORKERS,
+                    thread_name_prefix="db"
+                )
+                _executor_pid = pid
+    return _executor
+
+
+async def run_db(func, *args, **kwargs):
+    """
+    Run a blocking function on the DB executor so the event loop stays free.
+    The caller's context variables are visible inside `func`.
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    profile = current_profile.get()
+    if profile is not None:
+        # a profiled request: let the sampler see this executor thread
+        func = profile.wrap(func)
+    return await loop.run_in_executor(
+        get_db_executor(),
+        functools.partial(ctx.run, func, *args, **kwargs)
+    )
+
+
+def db_route(func):
+    """
+    Turn a synchronous route handler into an awaitable one that runs on
+    the DB executor. FastAPI still sees the original signature.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_db(func, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,379 @@
+"""
+Prometheus metrics (GET /metrics, text exposition format 0.0.4).
+
+Request metrics come from MetricsMiddleware:
+
+    lordmind_http_requests_total{route, method, status}     status class: 2xx, 4xx, ...
+    lordmind_http_request_duration_seconds{route, method}   histogram
+    lordmind_http_requests_in_flight
+
+Their counters are plain ints and floats touched only on the event loop
+thread, so recording a request takes no lock. It allocates nothing
+beyond the first request of a route, because labels are route templates
+("/topics/{topic_id}"), not raw paths. Everything else is read when
+/metrics is scraped:
+
+    DB pool         size, checked-out / idle connections, waits, timeouts
+    executors       threads, busy threads and queued tasks of the DB,
+                    compression and bcrypt thread pools
+    voice analysis  queue depth, clips in progress, outcomes
+    jobs            running jobs and free slots
+    caches          hits, misses, entries and hit ratio per cache
+    SQL             statements and DB time per route (config/server_timing.py)
+
+Multiple uvicorn workers: each worker writes its own samples to
+METRICS_DIR/<pid>.json every METRICS_FLUSH_SECONDS. A scrape is built
+from those files only: the answering worker first flushes its own file,
+then sums every file (counters, histograms and gauges; ratios are derived
+after the merge). Live counters are never added on top of older
+snapshots, and a worker's file only ever moves forward, so summed
+counters don't go down when consecutive scrapes land on different
+workers. Files not refreshed for METRICS_STALE_SECONDS belong to workers
+that are gone and are removed. A worker that restarts or goes away
+drops its counters, which Prometheus treats as a counter reset.
+"""
+import asyncio
+import json
+import os
+import time
+from bisect import bisect_left
+from config import database, compression
+from config.compression import route_name
+from config.server_timing import query_route_stats
+from config.settings import METRICS_DIR, METRICS_FLUSH_SECONDS, METRICS_STALE_SECONDS
+from jobs.runner import dispatcher
+from services import passwords
+from services.catalog_cache import catalog_cache
+from services.dashboard_cache import dashboard_cache
+from services.question_bundles import bundle_cache
+from voice.analysis_service import voice_service
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "lordmind_"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_BUCKET_LABELS = tuple(repr(b) for b in LATENCY_BUCKETS) + ("+Inf",)
+STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+
+# name -> (type, help); samples of unknown names are rendered as untyped
+METRICS = {
+    "http_requests_total": ("counter", "HTTP requests by route, method and status class"),
+    "http_request_duration_seconds": ("histogram", "HTTP request latency by route and method"),
+    "http_requests_in_flight": ("gauge", "HTTP requests being served"),
+    "workers": ("gauge", "Worker processes reporting metrics"),
+    "db_pool_connections": ("gauge", "Pooled database connections by state"),
+    "db_pool_max_connections": ("gauge", "Upper bound of the connection pool"),
+    "db_pool_checkouts_total": ("counter", "Connections handed out by the pool"),
+    "db_pool_waits_total": ("counter", "Checkouts that had to wait for a free connection"),
+    "db_pool_timeouts_total": ("counter", "Checkouts that gave up waiting"),
+    "db_pool_wait_seconds_total": ("counter", "Time spent waiting for a connection"),
+    "db_pool_connections_created_total": ("counter", "Database connections opened"),
+    "executor_threads": ("gauge", "Threads started by an executor"),
+    "executor_busy_threads": ("gauge", "Executor threads running a task"),
+    "executor_max_threads": ("gauge", "Thread limit of an executor"),
+    "executor_queued_tasks": ("gauge", "Tasks waiting for a free executor thread"),
+    "voice_queue_depth": ("gauge", "Voice clips waiting for an analysis worker"),
+    "voice_queue_capacity": ("gauge", "Voice clips accepted before new ones are rejected"),
+    "voice_active": ("gauge", "Voice clips being analysed"),
+    "voice_workers": ("gauge", "Voice analysis worker processes"),
+    "voice_clips_total": ("counter", "Voice clips by outcome"),
+    "jobs_running": ("gauge", "Background jobs being processed"),
+    "jobs_free_slots": ("gauge", "Background job slots available"),
+    "cache_hits_total": ("counter", "Cache lookups served from memory"),
+    "cache_misses_total": ("counter", "Cache lookups that loaded from the database"),
+    "cache_entries": ("gauge", "Entries held in a cache"),
+    "cache_hit_ratio": ("gauge", "Hits / lookups per cache since start (all workers)"),
+    "db_queries_total": ("counter", "SQL statements run by route"),
+    "db_query_seconds_total": ("counter", "Time spent in SQL statements by route"),
+}
+
+
+class RouteMetrics:
+    __slots__ = ("buckets", "count", "sum", "statuses")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.statuses = [0] * len(STATUS_CLASSES)
+
+
+class HttpMetrics:
+    """Request counters; mutated only on the event loop thread"""
+
+    def __init__(self):
+        self.routes = {}
+        self.in_flight = 0
+
+    def observe(self, route, method, status, elapsed):
+        key = (route, method)
+        metrics = self.routes.get(key)
+        if metrics is None:
+            metrics = self.routes[key] = RouteMetrics()
+        metrics.buckets[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+        metrics.count += 1
+        metrics.sum += elapsed
+        metrics.statuses[min(max(status // 100, 1), 5) - 1] += 1
+
+    def samples(self, out):
+        for (route, method), m in list(self.routes.items()):
+            labels = (("route", route), ("method", method))
+            for status, total in zip(STATUS_CLASSES, m.statuses):
+                if total:
+                    out.append(("http_requests_total", labels + (("status", status),), total))
+            cumulative = 0
+            for le, hits in zip(_BUCKET_LABELS, m.buckets):
+                cumulative += hits
+                out.append(("http_request_duration_seconds_bucket", labels + (("le", le),), cumulative))
+            out.append(("http_request_duration_seconds_sum", labels, m.sum))
+            out.append(("http_request_duration_seconds_count", labels, m.count))
+        out.append(("http_requests_in_flight", (), self.in_flight))
+
+
+http_metrics = HttpMetrics()
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        http_metrics.in_flight += 1
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_metrics.in_flight -= 1
+            http_metrics.observe(route_name(scope), scope["method"], status, time.perf_counter() - started)
+
+
+# ------------------------------------------
+# Scrape-time collectors
+# ------------------------------------------
+def _executor_stats(out, name, executor):
+    if executor is None:
+        return
+    labels = (("executor", name),)
+    threads = len(executor._threads)
+    idle = getattr(getattr(executor, "_idle_semaphore", None), "_value", 0)
+    out.append(("executor_threads", labels, threads))
+    out.append(("executor_busy_threads", labels, max(0, threads - idle)))
+    out.append(("executor_max_threads", labels, executor._max_workers))
+    out.append(("executor_queued_tasks", labels, executor._work_queue.qsize()))
+
+
+def _db_pool_samples(out):
+    stats = database.get_pool_stats()
+    out.append(("db_pool_connections", (("state", "checked_out"),), stats["checked_out"]))
+    out.append(("db_pool_connections", (("state", "idle"),), stats["idle"]))
+    out.append(("db_pool_max_connections", (), stats["max_size"]))
+    out.append(("db_pool_checkouts_total", (), stats["checkouts"]))
+    out.append(("db_pool_waits_total", (), stats["waits"]))
+    out.append(("db_pool_timeouts_total", (), stats["timeouts"]))
+    out.append(("db_pool_wait_seconds_total", (), stats["wait_time_total_ms"] / 1000))
+    out.append(("db_pool_connections_created_total", (), stats["connections_created"]))
+
+
+def _voice_samples(out):
+    stats = voice_service.stats()
+    out.append(("voice_queue_depth", (), stats["queued"]))
+    out.append(("voice_queue_capacity", (), stats["queue_size"]))
+    out.append(("voice_active", (), stats["active"]))
+    out.append(("voice_workers", (), stats["workers"]))
+    for outcome in ("completed", "failed", "rejected", "timeouts"):
+        out.append(("voice_clips_total", (("outcome", outcome),), stats[outcome]))
+
+
+def _job_samples(out):
+    stats = dispatcher.stats()
+    out.append(("jobs_running", (), stats["running"]))
+    out.append(("jobs_free_slots", (), stats["free_slots"]))
+
+
+def _cache_samples(out):
+    for name, cache in (("catalog", catalog_cache), ("dashboard", dashboard_cache), ("question_bundles", bundle_cache)):
+        stats = cache.stats()
+        labels = (("cache", name),)
+        out.append(("cache_hits_total", labels, stats["hits"]))
+        out.append(("cache_misses_total", labels, stats["misses"]))
+        out.append(("cache_entries", labels, stats["entries"]))
+
+
+def _query_samples(out):
+    for route, stats in query_route_stats.snapshot()["routes"].items():
+        labels = (("route", route),)
+        out.append(("db_queries_total", labels, stats["queries"]))
+        out.append(("db_query_seconds_total", labels, stats["db_ms_total"] / 1000))
+
+
+def _executor_samples(out):
+    _executor_stats(out, "db", database._executor)
+    _executor_stats(out, "compression", compression._executor)
+    _executor_stats(out, "bcrypt", passwords._executor)
+
+
+COLLECTORS = (_db_pool_samples, _executor_samples, _voice_samples, _job_samples, _cache_samples, _query_samples)
+
+
+def collect_local():
+    """This worker's samples: [(name, labels, value)]"""
+    out = []
+    http_metrics.samples(out)
+    for collector in COLLECTORS:
+        try:
+            collector(out)
+        except Exception as e:
+            print(f"Metrics collector {collector.__name__} failed: {e}")
+    return out
+
+
+# ------------------------------------------
+# Sharing samples between worker processes
+# ------------------------------------------
+def _worker_file(pid):
+    return os.path.join(METRICS_DIR, f"{pid}.json")
+
+
+def write_worker_samples(samples):
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    path = _worker_file(os.getpid())
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump([[name, list(labels), value] for name, labels, value in samples], f)
+    os.replace(tmp, path)
+
+
+def read_worker_samples():
+    """Samples of every live worker, this one included; stale files are removed"""
+    workers = []
+    if not os.path.isdir(METRICS_DIR):
+        return workers
+    now = time.time()
+    for entry in os.scandir(METRICS_DIR):
+        if not entry.name.endswith(".json"):
+            continue
+        try:
+            if now - entry.stat().st_mtime > METRICS_STALE_SECONDS:
+                os.remove(entry.path)
+                continue
+            with open(entry.path) as f:
+                workers.append([(name, tuple(tuple(pair) for pair in labels), value) for name, labels, value in json.load(f)])
+        except (OSError, ValueError):
+            # being replaced or removed right now; it will be read next scrape
+            continue
+    return workers
+
+
+def merge_samples(workers):
+    merged = {}
+    for samples in workers:
+        for name, labels, value in samples:
+            key = (name, labels)
+            merged[key] = merged.get(key, 0) + value
+
+    # ratios only make sense over the summed counters
+    for (name, labels), hits in list(merged.items()):
+        if name == "cache_hits_total":
+            lookups = hits + merged.get(("cache_misses_total", labels), 0)
+            merged[("cache_hit_ratio", labels)] = hits / lookups if lookups else 0.0
+    merged[("workers", ())] = len(workers)
+    return merged
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _base_name(name):
+    for suffix in ("_bucket", "_sum", "_count"):
+        if name.endswith(suffix) and name[:-len(suffix)] in METRICS:
+            return name[:-len(suffix)]
+    return name
+
+
+def render(merged):
+    """Prometheus text exposition of merged samples"""
+    families = {}
+    for (name, labels), value in merged.items():
+        families.setdefault(_base_name(name), []).append((name, labels, value))
+
+    lines = []
+    for family in sorted(families):
+        metric_type, help_text = METRICS.get(family, ("untyped", family))
+        lines.append(f"# HELP {PREFIX}{family} {help_text}")
+        lines.append(f"# TYPE {PREFIX}{family} {metric_type}")
+        for name, labels, value in families[family]:
+            label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels)
+            value_text = repr(float(value)) if isinstance(value, float) else str(value)
+            lines.append(f"{PREFIX}{name}{{{label_text}}} {value_text}" if label_text else f"{PREFIX}{name} {value_text}")
+    return "\n".join(lines) + "\n"
+
+
+async def render_metrics():
+    """Exposition text for every worker; called by GET /metrics"""
+    try:
+        await metrics_exporter.flush()
+    except Exception as e:
+        print(f"Metrics flush failed: {e}")
+    workers = await asyncio.to_thread(read_worker_samples)
+    return render(merge_samples(workers))
+
+
+class MetricsExporter:
+    """Writes this worker's samples for the other workers every METRICS_FLUSH_SECONDS"""
+
+    def __init__(self):
+        self._task = None
+        self._lock = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            os.remove(_worker_file(os.getpid()))
+        except OSError:
+            pass
+
+    async def flush(self):
+        """
+        Collect and write this worker's samples. Serialized, so a snapshot
+        collected earlier can never overwrite a newer one in the file.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            samples = collect_local()
+            await asyncio.to_thread(write_worker_samples, samples)
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Metrics flush failed: {e}")
+            await asyncio.sleep(METRICS_FLUSH_SECONDS)
+
+
+metrics_exporter = MetricsExporter()
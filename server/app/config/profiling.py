@@ -0,0 +1,266 @@
+"""
+On-demand stack-sampling profiles of single requests.
+
+A request is profiled when
+  - it carries `X-Profile-Token: <PROFILE_TOKEN>` (admins only: the token
+    is a shared secret from the environment), or
+  - it is picked at random with probability PROFILE_SAMPLE_RATE, limited
+    to the PROFILE_ROUTES templates when that is set
+    (e.g. "/topics/{user_id}/subtopics").
+
+While at least one profile is running, a sampler thread wakes every
+PROFILE_INTERVAL_MS and records the stack of:
+  - the event-loop thread, when the request's task is the one running
+  - every DB executor thread working for the request (run_db / @db_route
+    register the thread for the duration of the call)
+  - "<waiting>" when neither is: the request awaits I/O or the loop is
+    busy with other requests
+
+The stacks are written in collapsed / folded format, one
+"root;...;leaf count" line per distinct stack, ready for flamegraph.pl,
+inferno or speedscope. Files go to PROFILE_DIR as
+<time>-<method>-<path>.folded. Only the newest PROFILE_MAX_FILES
+are kept. Profiled responses carry an X-Profile-File header with the
+file name, so it can be fetched from GET /system/profiles/{name}.
+
+When neither PROFILE_TOKEN nor PROFILE_SAMPLE_RATE is set, the
+middleware is not installed and no sampler thread exists.
+"""
+import asyncio
+import contextvars
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+from config.settings import (
+    PROFILE_TOKEN,
+    PROFILE_SAMPLE_RATE,
+    PROFILE_ROUTES,
+    PROFILE_INTERVAL_MS,
+    PROFILE_DIR,
+    PROFILE_MAX_FILES,
+)
+
+
+PROFILE_HEADER = b"x-profile-token"
+PROFILE_FILE_SUFFIX = ".folded"
+
+current_profile = contextvars.ContextVar("current_profile", default=None)
+
+
+def profiling_enabled():
+    return bool(PROFILE_TOKEN) or PROFILE_SAMPLE_RATE > 0
+
+
+def valid_profile_token(token):
+    if not PROFILE_TOKEN or not token:
+        return False
+    if isinstance(token, bytes):
+        token = token.decode("latin-1")
+    return hmac.compare_digest(token, PROFILE_TOKEN)
+
+
+def _route_pattern(template):
+    parts = re.split(r"(\{[^}]+\})", template)
+    return "".join("[^/]+" if part.startswith("{") else re.escape(part) for part in parts)
+
+
+_SAMPLED_PATHS = re.compile(
+    "^(?:" + "|".join(_route_pattern(r.strip()) for r in PROFILE_ROUTES.split(",") if r.strip()) + ")$"
+) if PROFILE_ROUTES.strip() else None
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def _stack(frame):
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    names.reverse()
+    return names
+
+
+class RequestProfile:
+    """Samples collected for one request"""
+
+    def __init__(self, loop, task, loop_thread):
+        self.loop = loop
+        self.task = task
+        self.loop_thread = loop_thread
+        self.threads = {}
+        self.stacks = {}
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def wrap(self, func):
+        """Register the executor thread running `func` as working for this request"""
+        def profiled(*args, **kwargs):
+            ident = threading.get_ident()
+            with self._lock:
+                self.threads[ident] = self.threads.get(ident, 0) + 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    if self.threads[ident] == 1:
+                        del self.threads[ident]
+                    else:
+                        self.threads[ident] -= 1
+        return profiled
+
+    def _add(self, stack):
+        key = ";".join(stack)
+        self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    def sample(self, frames):
+        """Record one tick (called on the sampler thread)"""
+        self.samples += 1
+        recorded = False
+        if asyncio.current_task(self.loop) is self.task:
+            frame = frames.get(self.loop_thread)
+            if frame is not None:
+                self._add(["event-loop"] + _stack(frame))
+                recorded = True
+        with self._lock:
+            threads = list(self.threads)
+        for ident in threads:
+            frame = frames.get(ident)
+            if frame is not None:
+                self._add(["executor"] + _stack(frame))
+                recorded = True
+        if not recorded:
+            self._add(["<waiting>"])
+
+    def folded(self):
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+class Sampler:
+    """One background thread sampling every active profile; exits when none are left"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._profiles = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def add(self, profile):
+        with self._lock:
+            self._profiles.add(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+                self._thread.start()
+
+    def remove(self, profile):
+        with self._lock:
+            self._profiles.discard(profile)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                profiles = list(self._profiles)
+                if not profiles:
+                    self._thread = None
+                    return
+            frames = sys._current_frames()
+            for profile in profiles:
+                try:
+                    profile.sample(frames)
+                except Exception:
+                    pass
+            del frames
+            time.sleep(self.interval)
+
+
+sampler = Sampler(PROFILE_INTERVAL_MS / 1000)
+
+
+# ------------------------------------------
+# Output directory
+# ------------------------------------------
+def profile_filename(method, path):
+    now = time.time()
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", path).strip("-").lower()[:80] or "root"
+    return f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}-{int(now * 1000) % 1000:03d}-{method.lower()}-{slug}{PROFILE_FILE_SUFFIX}"
+
+
+def list_profiles():
+    """Stored profiles, newest first"""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    entries = [e for e in os.scandir(PROFILE_DIR) if e.name.endswith(PROFILE_FILE_SUFFIX)]
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    return [
+        {"name": e.name, "bytes": e.stat().st_size, "created_at": e.stat().st_mtime}
+        for e in entries
+    ]
+
+
+def profile_path(name):
+    """Path of a stored profile, or None when the name is not one"""
+    if os.path.basename(name) != name or not name.endswith(PROFILE_FILE_SUFFIX):
+        return None
+    path = os.path.join(PROFILE_DIR, name)
+    return path if os.path.isfile(path) else None
+
+
+def save_profile(name, profile):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, name)
+    with open(path, "w") as f:
+        f.write(profile.folded())
+
+    # rotate: keep the newest PROFILE_MAX_FILES
+    for stale in list_profiles()[PROFILE_MAX_FILES:]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, stale["name"]))
+        except OSError:
+            pass
+    return path
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    def _wanted(self, scope):
+        for key, value in scope["headers"]:
+            if key == PROFILE_HEADER:
+                return valid_profile_token(value)
+        if PROFILE_SAMPLE_RATE <= 0 or random.random() >= PROFILE_SAMPLE_RATE:
+            return False
+        return _SAMPLED_PATHS is None or bool(_SAMPLED_PATHS.match(scope["path"]))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(asyncio.get_running_loop(), asyncio.current_task(), threading.get_ident())
+        name = profile_filename(scope["method"], scope["path"])
+        token = current_profile.set(profile)
+
+        async def send_with_name(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-file", name.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        sampler.add(profile)
+        try:
+            await self.app(scope, receive, send_with_name)
+        finally:
+            sampler.remove(profile)
+            current_profile.reset(token)
+            try:
+                await asyncio.to_thread(save_profile, name, profile)
+            except Exception as e:
+                print(f"Saving profile failed: {e}")
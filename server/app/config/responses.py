@@ -0,0 +1,99 @@
+"""
+Fast JSON responses.
+
+FastAPI normally runs every returned dict through `jsonable_encoder` (a
+recursive pure-Python walk) and then `json.dumps`. For report endpoints
+that return thousands of DictCursor rows full of Decimal and datetime
+values, that walk is a large part of the request time.
+
+`FastJSONResponse` encodes with orjson, which handles dict / list /
+datetime / date / UUID natively; Decimal is converted the same way
+jsonable_encoder does (int when it has no fractional part, else float)
+and anything else falls back to jsonable_encoder, so the JSON produced
+is unchanged.
+
+`FastJSONRoute` makes a route hand its return value straight to
+FastJSONResponse, skipping the jsonable_encoder pass. Routes that declare
+a response_model, a return annotation, or a `Response` parameter keep
+FastAPI's normal path.
+"""
+import datetime
+import decimal
+import functools
+import inspect
+import orjson
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from fastapi.datastructures import Default, DefaultPlaceholder
+
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value):
+    if isinstance(value, decimal.Decimal):
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).decode()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return jsonable_encoder(value)
+
+
+def dumps(content):
+    """Serialize to JSON bytes exactly as the API responses do"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content):
+        return dumps(content)
+
+
+def _takes_response(endpoint):
+    try:
+        params = inspect.signature(endpoint).parameters.values()
+    except (TypeError, ValueError):
+        return True
+    return any(
+        inspect.isclass(p.annotation) and issubclass(p.annotation, Response)
+        for p in params
+    )
+
+
+class FastJSONRoute(APIRoute):
+    """APIRoute whose plain return values are encoded by FastJSONResponse directly"""
+
+    def __init__(self, path, endpoint, **kwargs):
+        response_model = kwargs.get("response_model", Default(None))
+        has_model = not isinstance(response_model, DefaultPlaceholder) and response_model is not None
+        annotated = inspect.signature(endpoint).return_annotation is not inspect.Signature.empty
+        if not (has_model or annotated or _takes_response(endpoint)):
+            endpoint = self._wrap(endpoint, kwargs.get("status_code"))
+        super().__init__(path, endpoint, **kwargs)
+
+    @staticmethod
+    def _wrap(endpoint, status_code):
+        status_code = status_code or 200
+
+        def respond(result):
+            if isinstance(result, Response):
+                return result
+            return FastJSONResponse(result, status_code=status_code)
+
+        if inspect.iscoroutinefunction(endpoint):
+            @functools.wraps(endpoint)
+            async def wrapper(*args, **kwargs):
+                return respond(await endpoint(*args, **kwargs))
+        else:
+            # stays synchronous so FastAPI keeps running it in the threadpool
+            @functools.wraps(endpoint)
+            def wrapper(*args, **kwargs):
+                return respond(endpoint(*args, **kwargs))
+        return wrapper
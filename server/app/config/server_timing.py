@@ -0,0 +1,101 @@
+"""
+Per-request SQL accounting.
+
+QueryTimingMiddleware gives every HTTP request its own QueryStats (see
+config/database.py), so each statement a handler runs, on the event loop
+or on the DB executor, is counted against that request. Then:
+
+- the response carries a Server-Timing header with the DB share of the
+  request (visible in the browser's network panel):
+
+      Server-Timing: db;dur=12.4;desc="7 queries, 130 rows", app;dur=31.0
+
+- when the request finishes, its totals are added to `query_route_stats`
+  (GET /system/queries). A request that ran one statement
+  REPEATED_QUERY_THRESHOLD times or more is logged; that is the usual
+  sign of a per-row lookup (N+1) loop.
+"""
+import threading
+import time
+from config.database import track_queries, log_repeated_queries
+from config.compression import route_name
+
+
+class QueryRouteStats:
+    """Statement counts and DB time aggregated per route"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route, stats, elapsed):
+        with self._lock:
+            s = self._routes.setdefault(route, {
+                "requests": 0, "queries": 0, "rows": 0, "db_time": 0.0, "total_time": 0.0,
+                "max_queries": 0, "slowest_time": 0.0, "slowest_sql": None,
+            })
+            s["requests"] += 1
+            s["queries"] += stats.count
+            s["rows"] += stats.rows
+            s["db_time"] += stats.total_time
+            s["total_time"] += elapsed
+            s["max_queries"] = max(s["max_queries"], stats.count)
+            if stats.slowest_time > s["slowest_time"]:
+                s["slowest_time"] = stats.slowest_time
+                s["slowest_sql"] = stats.slowest_sql
+
+    def snapshot(self):
+        with self._lock:
+            routes = {}
+            for route, s in sorted(self._routes.items(), key=lambda kv: kv[1]["db_time"], reverse=True):
+                requests = s["requests"]
+                routes[route] = {
+                    "requests": requests,
+                    "queries": s["queries"],
+                    "queries_per_request": round(s["queries"] / requests, 2),
+                    "max_queries": s["max_queries"],
+                    "rows": s["rows"],
+                    "db_ms_total": round(s["db_time"] * 1000, 2),
+                    "db_ms_avg": round(s["db_time"] * 1000 / requests, 2),
+                    "db_share": round(s["db_time"] / s["total_time"], 4) if s["total_time"] else 0.0,
+                    "slowest_ms": round(s["slowest_time"] * 1000, 2),
+                    "slowest_sql": s["slowest_sql"],
+                }
+            return {"routes": routes}
+
+
+query_route_stats = QueryRouteStats()
+
+
+def server_timing_value(stats, elapsed):
+    return (
+        f'db;dur={stats.total_time * 1000:.1f};desc="{stats.count} queries, {stats.rows} rows", '
+        f"app;dur={elapsed * 1000:.1f}"
+    ).encode("latin-1")
+
+
+class QueryTimingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+
+        with track_queries() as stats:
+            async def send_with_timing(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", server_timing_value(stats, time.perf_counter() - started)))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                route = route_name(scope)
+                query_route_stats.record(route, stats, time.perf_counter() - started)
+                log_repeated_queries(stats, f"{scope.get('method', '')} {route}")
@@ -0,0 +1,72 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Excel question ingestion
+QUESTION_INGEST_CHUNK_SIZE = int(os.getenv('QUESTION_INGEST_CHUNK_SIZE', 1000))
+
+# Password hashing (bcrypt cost factor and bulk hashing threads)
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 2))
+
+# Background jobs (bulk imports / test uploads)
+JOBS_DB_PATH = os.getenv('JOBS_DB_PATH', 'data/jobs.sqlite3')
+JOB_FILES_DIR = os.getenv('JOB_FILES_DIR', 'data/job_files')
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', 1.0))
+JOB_HEARTBEAT_SECONDS = float(os.getenv('JOB_HEARTBEAT_SECONDS', 10))
+JOB_STALE_SECONDS = float(os.getenv('JOB_STALE_SECONDS', 60))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+
+# Voice analysis worker pool
+VOICE_WORKERS = int(os.getenv('VOICE_WORKERS', os.cpu_count() or 2))
+VOICE_QUEUE_SIZE = int(os.getenv('VOICE_QUEUE_SIZE', 16))
+VOICE_TIMEOUT_SECONDS = float(os.getenv('VOICE_TIMEOUT_SECONDS', 15))
+# Speech recognition backend: google (network) or vosk (offline model)
+VOICE_RECOGNIZER = os.getenv('VOICE_RECOGNIZER', 'google')
+VOICE_VOSK_MODEL_PATH = os.getenv('VOICE_VOSK_MODEL_PATH', 'models/vosk-model-small-en-us-0.15')
+# Short clips queued together while every worker is busy are handed to one worker
+# as a batch of up to this many (vosk only; google clips are never batched)
+VOICE_BATCH_SIZE = int(os.getenv('VOICE_BATCH_SIZE', 8))
+
+# Catalog cache (topics / sub-topics / colleges); version source: mysql, redis or local
+CATALOG_CACHE_BACKEND = os.getenv('CATALOG_CACHE_BACKEND', 'mysql')
+CATALOG_CACHE_MAX_ENTRIES = int(os.getenv('CATALOG_CACHE_MAX_ENTRIES', 512))
+CATALOG_VERSION_POLL_SECONDS = float(os.getenv('CATALOG_VERSION_POLL_SECONDS', 1.0))
+CATALOG_CACHE_REDIS_URL = os.getenv('CATALOG_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+
+# Per-student dashboard snapshots (invalidation feed: mysql, redis or local)
+DASHBOARD_CACHE_BACKEND = os.getenv('DASHBOARD_CACHE_BACKEND', CATALOG_CACHE_BACKEND)
+DASHBOARD_CACHE_MAX_ENTRIES = int(os.getenv('DASHBOARD_CACHE_MAX_ENTRIES', 5000))
+
+# Precompiled question bundles kept in memory per process
+QUESTION_BUNDLE_CACHE_ENTRIES = int(os.getenv('QUESTION_BUNDLE_CACHE_ENTRIES', 256))
+
+# Response compression (br is used only when the brotli package is installed)
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 5))
+# Bodies at least this large are compressed off the event loop
+COMPRESSION_OFFLOAD_BYTES = int(os.getenv('COMPRESSION_OFFLOAD_BYTES', 262144))
+COMPRESSION_WORKERS = int(os.getenv('COMPRESSION_WORKERS', 2))
+
+# Listing endpoints (users / questions): page size and how long totals are reused
+LIST_DEFAULT_LIMIT = int(os.getenv('LIST_DEFAULT_LIMIT', 100))
+LIST_MAX_LIMIT = int(os.getenv('LIST_MAX_LIMIT', 500))
+LIST_COUNT_CACHE_SECONDS = float(os.getenv('LIST_COUNT_CACHE_SECONDS', 30))
+
+# Prometheus metrics: each worker shares its samples through this directory
+METRICS_DIR = os.getenv('METRICS_DIR', 'data/metrics')
+METRICS_FLUSH_SECONDS = float(os.getenv('METRICS_FLUSH_SECONDS', 5))
+METRICS_STALE_SECONDS = float(os.getenv('METRICS_STALE_SECONDS', 30))
+
+# Request profiling: requests sent with X-Profile-Token: <PROFILE_TOKEN>, or a
+# random PROFILE_SAMPLE_RATE share (of PROFILE_ROUTES, comma-separated route
+# templates, when set), are stack-sampled into PROFILE_DIR. Off when both are unset.
+PROFILE_TOKEN = os.getenv('PROFILE_TOKEN', '')
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+PROFILE_ROUTES = os.getenv('PROFILE_ROUTES', '')
+PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', 5))
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'data/profiles')
+PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', 200))
@@ -0,0 +1,281 @@
+"""
+Background job runner.
+
+Upload endpoints store their file, call `enqueue_job(kind, **payload)` and
+return the job id. A dispatcher task in each API process claims queued
+jobs from the job table and runs them in a local process pool, so a large
+import neither blocks the event loop nor holds a DB connection for the
+life of an HTTP request.
+
+Handlers are plain functions registered in JOB_HANDLERS; they receive the
+payload as keyword arguments and may call `report_job_progress`. A worker
+that dies stops heartbeating and its job is requeued (up to
+JOB_MAX_ATTEMPTS).
+
+Handlers commit their DB work in a single transaction and call
+`record_job_commit(cursor, result)` inside it, which stores the result in
+the MySQL job_commits table keyed by job_id. A worker can die after that
+commit but before the job store hears about it; the requeued attempt then
+finds the row and finishes with the recorded result instead of running
+the handler again. If two attempts overlap, the second one's insert hits
+the primary key and its transaction is rolled back.
+"""
+import asyncio
+import contextvars
+import importlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import pymysql
+from fastapi import HTTPException
+from config.database import get_db
+from config.settings import (
+    JOB_WORKERS, JOB_POLL_INTERVAL, JOB_HEARTBEAT_SECONDS,
+    JOB_STALE_SECONDS, JOB_MAX_ATTEMPTS,
+)
+from jobs.store import get_job_store
+
+
+# kind -> "module:function" (imported lazily inside the worker process)
+JOB_HANDLERS = {
+    "users.bulk_create": "routes.users:create_users_from_excel",
+    "tests.create": "routes.tests:create_test_from_file",
+    "tests.update_assignment_file": "routes.tests:replace_assignment_questions",
+    "tests.update_subtopic_file": "routes.tests:replace_subtopic_questions",
+    "assignments.upload": "routes.assignments:process_assignment_upload",
+}
+
+_current_job = contextvars.ContextVar("current_job", default=None)
+
+# MySQL duplicate-key error
+ER_DUP_ENTRY = 1062
+
+# Progress writes are throttled so tight loops don't hammer the job table
+PROGRESS_MIN_INTERVAL = 0.5
+
+
+def enqueue_job(kind, cleanup_paths=None, cleanup_on_failure=None, **payload):
+    """
+    Queue a job and return its id.
+
+    cleanup_paths are deleted once the job finishes either way (e.g. a
+    private copy of an upload); cleanup_on_failure only when it fails.
+    """
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    payload = {
+        "args": payload,
+        "cleanup_paths": cleanup_paths or [],
+        "cleanup_on_failure": cleanup_on_failure or [],
+    }
+    return get_job_store().create(kind, payload)
+
+
+class JobAlreadyCommitted(Exception):
+    """Another attempt of this job already committed its work"""
+
+
+def record_job_commit(cursor, result):
+    """
+    Record the running job's result in the handler's own transaction
+    (call right before its commit). No-op outside jobs.
+    """
+    job = _current_job.get()
+    if job is None:
+        return
+    try:
+        cursor.execute(
+            "INSERT INTO job_commits (job_id, kind, result) VALUES (%s, %s, %s)",
+            (job["job_id"], job["kind"], json.dumps(result, default=str))
+        )
+    except pymysql.err.IntegrityError as e:
+        if e.args and e.args[0] == ER_DUP_ENTRY:
+            raise JobAlreadyCommitted(job["job_id"])
+        raise
+
+
+def committed_job_result(job_id):
+    """(True, result) when an earlier attempt of the job committed, else (False, None)"""
+    with get_db() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT result FROM job_commits WHERE job_id = %s", (job_id,))
+            row = cursor.fetchone()
+    if row is None:
+        return False, None
+    return True, json.loads(row["result"]) if row["result"] else None
+
+
+def report_job_progress(done, total=None):
+    """Record progress for the job running in this context (no-op outside jobs)"""
+    job = _current_job.get()
+    if job is None:
+        return
+    now = time.monotonic()
+    if total is None or done < total:
+        if now - job["last_progress"] < PROGRESS_MIN_INTERVAL:
+            return
+    job["last_progress"] = now
+    get_job_store().update_progress(job["job_id"], done, total)
+
+
+def _load_handler(kind):
+    module_name, func_name = JOB_HANDLERS[kind].split(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def _remove_files(paths):
+    for path in paths:
+        try:
+            if path and os.path.exists(path):
+                os.remove(path)
+        except Exception as e:
+            print(f"⚠️ Warning: could not delete job file {path}: {e}")
+
+
+def _discard_job_files(payload):
+    """Clean up after a job that failed outside execute_job (crashed worker)"""
+    _remove_files(payload["cleanup_paths"] + payload["cleanup_on_failure"])
+
+
+def _heartbeat(job_id, stop):
+    store = get_job_store()
+    while not stop.wait(JOB_HEARTBEAT_SECONDS):
+        try:
+            store.heartbeat(job_id)
+        except Exception as e:
+            print(f"Job heartbeat error ({job_id}): {e}")
+
+
+def execute_job(job):
+    """Run one claimed job to completion (executes inside a worker process)"""
+    store = get_job_store()
+    payload = job["payload"]
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat, args=(job["job_id"], stop), daemon=True).start()
+    token = _current_job.set({"job_id": job["job_id"], "kind": job["kind"], "last_progress": 0.0})
+
+    failed = True
+    try:
+        committed, result = committed_job_result(job["job_id"]) if job["attempts"] > 1 else (False, None)
+        if not committed:
+            try:
+                result = _load_handler(job["kind"])(**payload["args"])
+            except JobAlreadyCommitted:
+                _, result = committed_job_result(job["job_id"])
+        store.succeed(job["job_id"], result)
+        failed = False
+    except HTTPException as e:
+        store.fail(job["job_id"], str(e.detail))
+    except ValueError as e:
+        # bad input (e.g. a malformed workbook) - retrying would not help
+        store.fail(job["job_id"], str(e))
+    except Exception as e:
+        store.fail(job["job_id"], f"{type(e).__name__}: {e}")
+    finally:
+        _current_job.reset(token)
+        stop.set()
+        _remove_files(payload["cleanup_paths"])
+        if failed:
+            _remove_files(payload["cleanup_on_failure"])
+
+
+class JobDispatcher:
+    """Claims queued jobs and feeds them to a process pool, one slot per worker"""
+
+    def __init__(self, workers=JOB_WORKERS, poll_interval=JOB_POLL_INTERVAL):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._executor = None
+        self._task = None
+        self._running = set()
+        self._last_recovery = 0.0
+
+    def _new_executor(self):
+        # spawn: the API process has live threads and sockets that must not be forked
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def start(self):
+        if self._task is None:
+            self._executor = self._new_executor()
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._executor is not None:
+            # running jobs are left to finish; unfinished ones are recovered on restart
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "running": len(self._running),
+            "free_slots": self.workers - len(self._running),
+        }
+
+    async def _loop(self):
+        store = get_job_store()
+        while True:
+            try:
+                now = time.monotonic()
+                if now - self._last_recovery > JOB_STALE_SECONDS / 2:
+                    self._last_recovery = now
+                    recovered = await asyncio.to_thread(store.recover_stale, JOB_STALE_SECONDS, JOB_MAX_ATTEMPTS)
+                    for job, status in recovered:
+                        print(f"Recovered stalled job {job['job_id']} -> {status}")
+                        if status == "failed":
+                            _discard_job_files(json.loads(job["payload"]))
+
+                while len(self._running) < self.workers:
+                    job = await asyncio.to_thread(store.claim_next, os.getpid())
+                    if job is None:
+                        break
+                    self._submit(job)
+            except Exception as e:
+                print(f"Job dispatcher error: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    def _submit(self, job):
+        job["payload"] = json.loads(job["payload"])
+        executor = self._executor
+        try:
+            future = asyncio.wrap_future(executor.submit(execute_job, job))
+        except Exception as e:
+            get_job_store().retry_or_fail(job["job_id"], f"Could not start job: {e}", JOB_MAX_ATTEMPTS)
+            raise
+        self._running.add(job["job_id"])
+        future.add_done_callback(lambda f: self._on_done(job, executor, f))
+
+    def _on_done(self, job, executor, future):
+        job_id = job["job_id"]
+        self._running.discard(job_id)
+        if future.cancelled():
+            return
+        error = future.exception()
+        if isinstance(error, BrokenProcessPool):
+            # a worker process died mid-job: requeue it and start a fresh pool
+            status = get_job_store().retry_or_fail(job_id, "Worker process crashed; job was restarted", JOB_MAX_ATTEMPTS)
+            if status == "failed":
+                _discard_job_files(job["payload"])
+            if executor is self._executor:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._new_executor()
+        elif error is not None:
+            get_job_store().fail(job_id, f"{type(error).__name__}: {error}")
+            _discard_job_files(job["payload"])
+
+
+dispatcher = JobDispatcher()
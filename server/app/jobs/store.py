@@ -0,0 +1,223 @@
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from config.settings import JOBS_DB_PATH
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id          TEXT PRIMARY KEY,
+    kind            TEXT NOT NULL,
+    status          TEXT NOT NULL,          -- queued | running | succeeded | failed
+    payload         TEXT NOT NULL,
+    progress_done   INTEGER NOT NULL DEFAULT 0,
+    progress_total  INTEGER,
+    result          TEXT,
+    error           TEXT,
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    worker_pid      INTEGER,
+    created_at      REAL NOT NULL,
+    started_at      REAL,
+    heartbeat_at    REAL,
+    finished_at     REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at);
+"""
+
+
+def _iso(ts):
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts)) if ts else None
+
+
+class JobStore:
+    """
+    Job table in a local SQLite file.
+
+    Several processes (API workers and job workers) share it, so every
+    state change is a single short transaction and claiming a job is an
+    atomic queued -> running update.
+    """
+
+    def __init__(self, path=JOBS_DB_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    # ------------------------------------------
+    # Producers
+    # ------------------------------------------
+    def create(self, kind, payload):
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, kind, status, payload, created_at) VALUES (?, ?, 'queued', ?, ?)",
+                (job_id, kind, json.dumps(payload), time.time())
+            )
+        return job_id
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    # ------------------------------------------
+    # Dispatcher
+    # ------------------------------------------
+    def claim_next(self, worker_pid):
+        """Move the oldest queued job to running and return it (or None)"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+                ).fetchone()
+                if not row:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    """
+                    UPDATE jobs
+                    SET status = 'running', attempts = attempts + 1, worker_pid = ?,
+                        started_at = ?, heartbeat_at = ?, error = NULL, progress_done = 0
+                    WHERE job_id = ?
+                    """,
+                    (worker_pid, now, now, row["job_id"])
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        job = dict(row)
+        job["attempts"] += 1
+        return job
+
+    def retry_or_fail(self, job_id, error, max_attempts):
+        """
+        Put an interrupted job back in the queue, or fail it once attempts
+        run out. Returns the new status (None if the job was not running).
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT attempts FROM jobs WHERE job_id = ? AND status = 'running'", (job_id,)
+            ).fetchone()
+            if not row:
+                conn.execute("COMMIT")
+                return None
+            status = "queued" if row["attempts"] < max_attempts else "failed"
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE job_id = ?",
+                (status, error, time.time() if status == "failed" else None, job_id)
+            )
+            conn.execute("COMMIT")
+        return status
+
+    def recover_stale(self, stale_seconds, max_attempts):
+        """
+        Requeue running jobs whose worker stopped heartbeating (crash,
+        kill, server restart). Returns [(job, new_status), ...].
+        """
+        cutoff = time.time() - stale_seconds
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'running' AND heartbeat_at < ?",
+                (cutoff,)
+            ).fetchall()
+        recovered = []
+        for row in rows:
+            status = self.retry_or_fail(row["job_id"], "Worker stopped responding; job was restarted", max_attempts)
+            if status:
+                recovered.append((dict(row), status))
+        return recovered
+
+    # ------------------------------------------
+    # Workers
+    # ------------------------------------------
+    def heartbeat(self, job_id):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE job_id = ? AND status = 'running'",
+                (time.time(), job_id)
+            )
+
+    def update_progress(self, job_id, done, total=None):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE jobs SET progress_done = ?, progress_total = COALESCE(?, progress_total), heartbeat_at = ?
+                WHERE job_id = ? AND status = 'running'
+                """,
+                (done, total, now, job_id)
+            )
+
+    def succeed(self, job_id, result):
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE jobs SET status = 'succeeded', result = ?, error = NULL, finished_at = ?
+                WHERE job_id = ?
+                """,
+                (json.dumps(result, default=str), time.time(), job_id)
+            )
+
+    def fail(self, job_id, error, result=None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, result = ?, finished_at = ? WHERE job_id = ?",
+                (error, json.dumps(result, default=str) if result is not None else None, time.time(), job_id)
+            )
+
+    def counts(self):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+
+def serialize_job(job):
+    """Public view of a job row"""
+    return {
+        "job_id": job["job_id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "progress": {
+            "done": job["progress_done"],
+            "total": job["progress_total"],
+        },
+        "attempts": job["attempts"],
+        "result": json.loads(job["result"]) if job["result"] else None,
+        "error": job["error"],
+        "created_at": _iso(job["created_at"]),
+        "started_at": _iso(job["started_at"]),
+        "finished_at": _iso(job["finished_at"]),
+    }
+
+
+_store = None
+_store_pid = None
+
+
+def get_job_store():
+    """Per-process JobStore (SQLite connections are opened per call)"""
+    global _store, _store_pid
+    if _store is None or _store_pid != os.getpid():
+        _store = JobStore()
+        _store_pid = os.getpid()
+    return _store
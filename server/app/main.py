@@ -1,13 +1,22 @@
-from fastapi import FastAPI
-from config.database import get_db
+import asyncio
+from fastapi import FastAPI, Response
+from config.database import get_db, get_pool, get_db_executor, SQL_INSTRUMENTATION
+from config.responses import FastJSONResponse
+from config.compression import CompressionMiddleware, shutdown_compression_executor
+from config.server_timing import QueryTimingMiddleware
+from config.profiling import ProfilingMiddleware, profiling_enabled
+from config.metrics import MetricsMiddleware, metrics_exporter, render_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
 from fastapi.middleware.cors import CORSMiddleware
-from routes import assignments, overviews,users,tests,colleges,topics,questions,departments,administrator,teacher,students,superadmin
+from routes import assignments, overviews,users,tests,colleges,topics,questions,departments,administrator,teacher,students,superadmin,system,jobs
+from jobs.runner import dispatcher as job_dispatcher
+from voice.analysis_service import voice_service
 from fastapi.staticfiles import StaticFiles
 
 app = FastAPI(
     title="LordMind API",
     description="Educational Management System API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 app.add_middleware(
@@ -18,6 +27,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(CompressionMiddleware)
+
+# Wraps compression, so Server-Timing covers it too; metrics and profiling
+# are added after it and sit outside
+if SQL_INSTRUMENTATION:
+    app.add_middleware(QueryTimingMiddleware)
+
+app.add_middleware(MetricsMiddleware)
+
+if profiling_enabled():
+    app.add_middleware(ProfilingMiddleware)
+
 
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
@@ -34,6 +55,68 @@ app.include_router(administrator.router, prefix="/administrator", tags=["Adminis
 app.include_router(teacher.router, prefix="/teacher", tags=["Teacher"])
 app.include_router(students.router, prefix="/student", tags=["Student"])
 app.include_router(superadmin.router, prefix="/superadmin", tags=["Superadmin"])
+app.include_router(system.router, prefix="/system", tags=["System"])
+app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
+
+
+async def prune_db_pool():
+    while True:
+        await asyncio.sleep(60)
+        try:
+            get_pool().prune()
+        except Exception as e:
+            print(f"DB pool prune error: {e}")
+
+
+@app.on_event("startup")
+async def start_db_pool():
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, get_pool().warm_up)
+    except Exception as e:
+        # The pool opens connections lazily, so a cold start is not fatal
+        print(f"DB pool warm-up failed: {e}")
+    asyncio.create_task(prune_db_pool())
+
+
+@app.on_event("startup")
+async def start_job_dispatcher():
+    job_dispatcher.start()
+
+
+@app.on_event("startup")
+async def start_voice_service():
+    voice_service.start()
+
+
+@app.on_event("startup")
+async def start_metrics_exporter():
+    metrics_exporter.start()
+
+
+@app.on_event("shutdown")
+async def stop_metrics_exporter():
+    await metrics_exporter.stop()
+
+
+@app.on_event("shutdown")
+async def stop_job_dispatcher():
+    await job_dispatcher.stop()
+
+
+@app.on_event("shutdown")
+async def stop_voice_service():
+    await voice_service.stop()
+
+
+@app.on_event("shutdown")
+async def stop_compression_executor():
+    shutdown_compression_executor()
+
+
+@app.on_event("shutdown")
+async def close_db_pool():
+    get_db_executor().shutdown(wait=False)
+    get_pool().close_all()
 
 
 @app.get("/")
@@ -46,6 +129,11 @@ async def root():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint (all workers)"""
+    return Response(await render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
 
 if __name__ == "__main__":
     import uvicorn
@@ -3,9 +3,10 @@ from typing import Optional
 import bcrypt
 from fastapi import APIRouter, HTTPException, Form, File, UploadFile
 from config.database import get_db
+from config.responses import FastJSONRoute
 
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.get("/topics/{user_id}")
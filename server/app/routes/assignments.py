@@ -1,20 +1,26 @@
 import os
+import shutil
 import uuid
-import json
 import aiofiles
-import pandas as pd
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, Form, File, UploadFile
-from config.database import get_db
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Form, File, UploadFile, Header, Query
+from config.database import get_db, db_route, run_db, stream_rows
+from config.responses import FastJSONRoute
+from services.question_ingest import ingest_questions
+from services.question_bundles import get_question_bundle, bundle_response
+from services.department_report import fetch_student_metrics, student_metrics_query
+from services.exports import EXPORT_FORMATS, export_response
+from jobs.runner import enqueue_job, record_job_commit, report_job_progress
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 UPLOAD_DIR = "uploads/assignments"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 
-@router.post("/upload", status_code=201)
+@router.post("/upload", status_code=202)
 async def upload_assignment(
     department_id: int = Form(...),
     assignment_number: str = Form(...),
@@ -23,10 +29,48 @@ async def upload_assignment(
     end_date: datetime = Form(...),
     file: UploadFile = File(...)
 ):
-    """Optimized Assignment Upload"""
+    """Store the workbook and queue the assignment import as a background job"""
     if not file.filename.endswith((".xlsx", ".xls")):
         raise HTTPException(status_code=400, detail="Only Excel (.xlsx/.xls) files allowed")
 
+    try:
+        # 1️⃣ Save the upload to a staging folder (streamed in 1MB chunks)
+        staging_folder = os.path.join(UPLOAD_DIR, "pending")
+        os.makedirs(staging_folder, exist_ok=True)
+        staged_path = os.path.join(staging_folder, f"{uuid.uuid4()}{os.path.splitext(file.filename)[1]}")
+
+        async with aiofiles.open(staged_path, "wb") as out_file:
+            while content := await file.read(1024 * 1024):
+                await out_file.write(content)
+
+        # 2️⃣ Queue the import (record + questions are created by the job worker)
+        job_id = enqueue_job(
+            "assignments.upload",
+            cleanup_paths=[staged_path],
+            department_id=department_id,
+            assignment_number=assignment_number,
+            assignment_topic=assignment_topic,
+            start_date=start_date.isoformat(),
+            end_date=end_date.isoformat(),
+            original_name=file.filename,
+            staged_path=staged_path,
+        )
+
+        return {
+            "status": "queued",
+            "message": "Assignment upload accepted and queued for processing",
+            "job_id": job_id,
+            "job_url": f"/jobs/{job_id}",
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+def process_assignment_upload(department_id, assignment_number, assignment_topic,
+                              start_date, end_date, original_name, staged_path):
+    """Create the assignment, file its workbook and import the questions (job handler)"""
+    file_path = None
     try:
         with get_db() as conn:
             with conn.cursor() as cursor:
@@ -38,7 +82,7 @@ async def upload_assignment(
                 if not cursor.fetchone():
                     raise HTTPException(status_code=400, detail="Department not found")
 
-                # 2️⃣ Create assignment record first
+                # 2️⃣ Create assignment record
                 cursor.execute(
                     """
                     INSERT INTO assignments
@@ -49,137 +93,100 @@ async def upload_assignment(
                         assignment_number,
                         assignment_topic,
                         department_id,
-                        start_date.strftime("%Y-%m-%d %H:%M:%S"),
-                        end_date.strftime("%Y-%m-%d %H:%M:%S"),
+                        datetime.fromisoformat(start_date).strftime("%Y-%m-%d %H:%M:%S"),
+                        datetime.fromisoformat(end_date).strftime("%Y-%m-%d %H:%M:%S"),
                     ),
                 )
-                conn.commit()
                 assignment_id = cursor.lastrowid
 
-                # 3️⃣ Create assignment folder
+                # 3️⃣ Copy the workbook into the assignment folder
+                # (the staged copy stays until the job ends so a restarted job can redo this)
                 assignment_folder = os.path.join(UPLOAD_DIR, str(assignment_id))
                 os.makedirs(assignment_folder, exist_ok=True)
-
-                # 4️⃣ Generate unique filename and save file asynchronously
-                file_extension = os.path.splitext(file.filename)[1]
-                unique_filename = f"{uuid.uuid4()}{file_extension}"
+                unique_filename = f"{uuid.uuid4()}{os.path.splitext(original_name)[1]}"
                 file_path = os.path.join(assignment_folder, unique_filename)
+                shutil.copyfile(staged_path, file_path)
 
-                async with aiofiles.open(file_path, "wb") as out_file:
-                    while content := await file.read(1024 * 1024):  # Stream 1MB chunks
-                        await out_file.write(content)
-
-                # 5️⃣ Update assignment with file info
                 cursor.execute(
                     """
                     UPDATE assignments 
                     SET file_name = %s, file_path = %s 
                     WHERE assignment_id = %s
                     """,
-                    (file.filename, file_path, assignment_id),
+                    (original_name, file_path, assignment_id),
                 )
-                conn.commit()
 
-        # ✅ Read Excel after closing DB connection (avoid blocking)
-        df = pd.read_excel(file_path)
-        if df.empty:
-            raise HTTPException(status_code=400, detail="Uploaded Excel file is empty")
+                # 4️⃣ Stream rows in fixed-size chunks (memory stays flat for large files)
+                stats = ingest_questions(
+                    cursor, file_path, "assignment", assignment_id,
+                    build_question_data=build_assignment_question_data,
+                    progress=report_job_progress
+                )
 
-        # ✅ Process & prepare questions
-        question_rows = []
-        with get_db() as conn:
-            with conn.cursor() as cursor:
-                for index, row in df.iterrows():
-                    q_type = str(row["Question_Type"]).strip().lower()
+                result = {
+                    "message": f"Assignment #{assignment_id} created with {stats['rows_inserted']} questions",
+                    "assignment_id": assignment_id,
+                    "ingest": stats,
+                    "file_info": {
+                        "original_name": original_name,
+                        "saved_as": unique_filename,
+                        "folder": f"/uploads/assignments/{assignment_id}",
+                        "download_url": f"/uploads/assignments/{assignment_id}/{unique_filename}",
+                    },
+                }
+                record_job_commit(cursor, result)
+                conn.commit()
 
-                    # Fetch question type ID
-                    cursor.execute(
-                        "SELECT question_type_id FROM question_type WHERE question_type = %s",
-                        (q_type,),
-                    )
-                    q_type_row = cursor.fetchone()
-                    if not q_type_row:
-                        raise HTTPException(status_code=400, detail=f"Invalid question type: {q_type}")
-                    question_type_id = q_type_row["question_type_id"]
-
-                    # Build question_data once
-                    qd = {}
-                    if q_type == "mcq":
-                        qd = {
-                            "options": [row.get("Option_A"), row.get("Option_B"), row.get("Option_C"), row.get("Option_D")],
-                            "correct_answer": row.get("Correct_Answer"),
-                        }
-                    elif q_type == "fill_blank":
-                        qd = {
-                            "sentence": row.get("Question_Text"),
-                            "correct_answers": [x.strip() for x in str(row.get("Correct_Answer", "")).split(",")],
-                        }
-                    elif q_type == "match":
-                        qd = {
-                            "column_a": str(row.get("Option_A", "")).split(";"),
-                            "column_b": str(row.get("Option_B", "")).split(";"),
-                            "correct_pairs": dict(
-                                pair.split("-") for pair in str(row.get("Correct_Answer", "")).split(",") if "-" in pair
-                            ),
-                        }
-                    elif q_type == "own_response":
-                        qd = {"expected_keywords": str(row.get("Extra_Data", "")).split(",")}
-                    elif q_type == "true_false":
-                        qd = {
-                            "statement": row.get("Question_Text"),
-                            "correct_answer": str(row.get("Correct_Answer")).lower() in ["true", "1"],
-                        }
-                    elif q_type == "one_word":
-                        qd = {
-                            "definition": row.get("Question_Text"),
-                            "correct_answer": row.get("Correct_Answer"),
-                        }
+    except Exception:
+        # Nothing was committed, so drop the copied workbook too
+        if file_path and os.path.exists(file_path):
+            os.remove(file_path)
+        raise
 
-                    question_rows.append(
-                        (
-                            assignment_id,
-                            question_type_id,
-                            row.get("Question_Text"),
-                            json.dumps(qd),
-                            row.get("Marks", 1),
-                            row.get("Order_No", index + 1),
-                        )
-                    )
+    return result
 
-                # ✅ Bulk insert for speed
-                cursor.executemany(
-                    """
-                    INSERT INTO questions
-                    (assignment_id, question_type_id, question_text, question_data, marks, order_no, created_at, updated_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, NOW(), NOW())
-                    """,
-                    question_rows,
-                )
-                conn.commit()
 
+def build_assignment_question_data(row, q_type):
+    """question_data for the assignment upload template (lowercased column names)"""
+    if q_type == "mcq":
         return {
-            "status": "success",
-            "message": f"Assignment #{assignment_id} created with {len(question_rows)} questions",
-            "assignment_id": assignment_id,
-            "file_info": {
-                "original_name": file.filename,
-                "saved_as": unique_filename,
-                "folder": f"/uploads/assignments/{assignment_id}",
-                "download_url": f"/uploads/assignments/{assignment_id}/{unique_filename}",
-            },
+            "options": [row.get("option_a"), row.get("option_b"), row.get("option_c"), row.get("option_d")],
+            "correct_answer": row.get("correct_answer"),
         }
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+    if q_type == "fill_blank":
+        return {
+            "sentence": row.get("question_text"),
+            "correct_answers": [x.strip() for x in str(row.get("correct_answer") or "").split(",")],
+        }
+    if q_type == "match":
+        return {
+            "column_a": str(row.get("option_a") or "").split(";"),
+            "column_b": str(row.get("option_b") or "").split(";"),
+            "correct_pairs": dict(
+                pair.split("-", 1) for pair in str(row.get("correct_answer") or "").split(",") if "-" in pair
+            ),
+        }
+    if q_type == "own_response":
+        return {"expected_keywords": str(row.get("extra_data") or "").split(",")}
+    if q_type == "true_false":
+        return {
+            "statement": row.get("question_text"),
+            "correct_answer": str(row.get("correct_answer")).lower() in ["true", "1"],
+        }
+    if q_type == "one_word":
+        return {
+            "definition": row.get("question_text"),
+            "correct_answer": row.get("correct_answer"),
+        }
+    return {}
 
 
 
 
 
 @router.get("/get-all")
-async def get_assignments():
+@db_route
+def get_assignments():
     """Get all assignments with file info"""
     try:
         with get_db() as conn:
@@ -205,24 +212,12 @@ async def get_assignments():
 
 
 @router.get("/get/{assignment_id}/questions")
-async def get_assignment_questions(assignment_id: int):
-    """Get questions for a specific assignment"""
+@db_route
+def get_assignment_questions(assignment_id: int, if_none_match: Optional[str] = Header(None)):
+    """Get questions for a specific assignment (precompiled bundle, supports If-None-Match)"""
     try:
-        with get_db() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                    SELECT * FROM questions
-                    WHERE test_scope = 'assignment' AND reference_id = %s
-                    ORDER BY order_no
-                """, (assignment_id,))
-                questions = cursor.fetchall()
-
-                # Parse JSON data
-                for question in questions:
-                    if question['question_data']:
-                        question['question_data'] = json.loads(question['question_data'])
-
-                return questions
+        bundle = get_question_bundle("assignment", assignment_id)
+        return bundle_response(bundle, "full", if_none_match)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
@@ -231,7 +226,8 @@ async def get_assignment_questions(assignment_id: int):
 
 
 @router.get("/assignment-marks/{college_id}/{department_id}")
-async def get_assignment_marks(college_id: int, department_id: int):
+@db_route
+def get_assignment_marks(college_id: int, department_id: int):
     """
     Fetch total assignment marks for each student filtered by
     specific college and department. Uses assignments table 
@@ -299,7 +295,8 @@ async def get_assignment_marks(college_id: int, department_id: int):
 
 
 @router.get("/assignment-marks/{department_id}")
-async def get_assignment_marks_by_department(department_id: int):
+@db_route
+def get_assignment_marks_by_department(department_id: int):
     """
     Fetch total assignment marks for each student using only department_id.
     college_id is auto-detected from departments table.
@@ -406,7 +403,8 @@ async def get_assignment_marks_by_department(department_id: int):
 
     
 @router.get("/topic-averages/{college_id}/{department_id}")
-async def get_topic_average_marks(college_id: int, department_id: int):
+@db_route
+def get_topic_average_marks(college_id: int, department_id: int):
     """
     Fetch student-wise topic-wise average marks
     using NEW schema (topic_college_department mapping)
@@ -536,7 +534,8 @@ async def get_topic_average_marks(college_id: int, department_id: int):
 
 
 @router.get("/topic-averages/{department_id}")
-async def get_topic_average_marks_by_department(department_id: int):
+@db_route
+def get_topic_average_marks_by_department(department_id: int):
     """
     Fetch student-wise topic-wise average marks for a specific department
     using NEW topic_college_department mapping.
@@ -663,7 +662,8 @@ async def get_topic_average_marks_by_department(department_id: int):
 
 
 @router.get("/total-duration/{department_id}")
-async def get_total_session_duration(department_id: int):
+@db_route
+def get_total_session_duration(department_id: int):
     """
     Fetch total session duration (in hours) for each ACTIVE student
     in a specific department. Department automatically validates
@@ -748,8 +748,46 @@ async def get_total_session_duration(department_id: int):
 
 
 
+def overall_report_row(row):
+    """
+    One student's overall-report entry from a department_report metrics
+    row, or None when the student has no marks for the department's
+    assignments (they are not listed).
+    """
+    if not row["department_assignment_count"]:
+        return None
+
+    total_marks = row["department_assignment_marks"] or 0
+    max_marks = row["department_assignment_max"] or 0
+    assignment_percentage = round((total_marks / max_marks) * 100, 2) if max_marks > 0 else 0
+
+    topic_avg = row["topic_average_percentage"]
+    if topic_avg is None:
+        topic_avg = 0
+
+    total_seconds = row["total_seconds"]
+    total_hours = round(total_seconds / 3600, 2)
+
+    last_login = (
+        row["last_login"].strftime("%d/%m/%y - %I:%M %p")
+        if row["last_login"]
+        else "No Login"
+    )
+
+    return {
+        "student_name": row["student_name"],
+        "full_name": row["full_name"],
+        "department_name": row["department_name"],
+        "assignment_percentage": assignment_percentage,
+        "topic_average_percentage": topic_avg,
+        "total_session_hours": total_hours,
+        "last_login": last_login
+    }
+
+
 @router.get("/overall-report/{department_id}")
-async def get_overall_report(department_id: int):
+@db_route
+def get_overall_report(department_id: int):
     """
     Fetch overall report combining assignment marks, topic averages,
     session durations, and last login — ONLY for active students
@@ -777,144 +815,227 @@ async def get_overall_report(department_id: int):
                 college_id = dept["college_id"]
 
                 # -----------------------------------------
-                # 2️⃣ ASSIGNMENT MARKS
+                # 2️⃣ PER-STUDENT METRICS (single pass)
                 # -----------------------------------------
-                cursor.execute("""
-                    SELECT 
-                        u.user_id,
-                        u.username AS student_name,
-                        u.full_name,
-                        u.last_login,
-                        d.department_name,
-                        SUM(am.marks_obtained) AS total_assignment_marks,
-                        SUM(am.max_marks) AS total_assignment_max
-                    FROM assignment_marks am
-                    JOIN assignments a 
-                        ON am.assignment_id = a.assignment_id
-                       AND a.department_id = %s
-                       AND a.college_id = %s
-                       AND a.is_active = 1
-                    JOIN users u 
-                        ON am.student_id = u.user_id
-                       AND u.department_id = %s
-                       AND u.college_id = %s
-                       AND u.is_active = 1
-                    JOIN departments d 
-                        ON d.department_id = u.department_id
-                    GROUP BY u.user_id, u.username, u.full_name, u.last_login, d.department_name
-                """, (department_id, college_id, department_id, college_id))
-
-                assignment_rows = cursor.fetchall()
+                students = fetch_student_metrics(
+                    cursor, college_id=college_id, department_id=department_id
+                )
 
                 # -----------------------------------------
-                # 3️⃣ TOPIC AVERAGES
+                # 3️⃣ BUILD FINAL OUTPUT
                 # -----------------------------------------
-                cursor.execute("""
-                    SELECT
-                        u.user_id,
-                        ROUND(
-                            SUM(stm.marks_obtained) / SUM(stm.max_marks) * 100,
-                            2
-                        ) AS topic_avg
-                    FROM sub_topic_marks stm
+                final = [
+                    report_row for report_row in map(overall_report_row, students)
+                    if report_row is not None
+                ]
 
-                    JOIN users u 
-                        ON stm.student_id = u.user_id
-                    AND u.department_id = %s
-                    AND u.college_id = %s
-                    AND u.is_active = 1
+                final.sort(key=lambda x: x["assignment_percentage"], reverse=True)
 
-                    JOIN sub_topics st
-                        ON stm.sub_topic_id = st.sub_topic_id
-                    AND st.is_active = 1
+                return {
+                    "status": "success",
+                    "department_id": department_id,
+                    "college_id": college_id,
+                    "department_name": dept["department_name"],
+                    "count": len(final),
+                    "data": final
+                }
 
-                    JOIN topics t
-                        ON st.topic_id = t.topic_id
-                    AND t.is_active = 1
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error fetching overall report: {str(e)}"
+        )
 
-                    JOIN topic_college_department tcd
-                        ON tcd.topic_id = t.topic_id
-                    AND tcd.college_id = %s
-                    AND tcd.department_id = %s
-                    AND tcd.is_active = 1
 
-                    WHERE stm.marks_obtained IS NOT NULL
-                    AND stm.max_marks > 0
 
-                    GROUP BY u.user_id
-                """, (
-                    department_id,
-                    college_id,
-                    college_id,
-                    department_id
-                ))
 
-                topic_avg_map = {row["user_id"]: row["topic_avg"] for row in cursor.fetchall()}
+# ------------------------------------------
+# Exports (CSV / XLSX)
+# ------------------------------------------
+OVERALL_REPORT_COLUMNS = [
+    ("student_name", "Student"),
+    ("full_name", "Full Name"),
+    ("department_name", "Department"),
+    ("assignment_percentage", "Assignment %"),
+    ("topic_average_percentage", "Topic Average %"),
+    ("total_session_hours", "Session Hours"),
+    ("last_login", "Last Login"),
+]
+
+ASSIGNMENT_MARKS_COLUMNS = [
+    ("student_name", "Student"),
+    ("full_name", "Full Name"),
+    ("assignment_number", "Assignment No"),
+    ("assignment_topic", "Assignment"),
+    ("marks_obtained", "Marks Obtained"),
+    ("max_marks", "Max Marks"),
+    ("percentage", "Percentage"),
+    ("graded_at", "Graded At"),
+]
+
+TOPIC_AVERAGES_COLUMNS = [
+    ("student_name", "Student"),
+    ("full_name", "Full Name"),
+    ("topic_name", "Topic"),
+    ("attempts", "Attempts"),
+    ("marks_obtained", "Marks Obtained"),
+    ("max_marks", "Max Marks"),
+    ("average_percentage", "Average %"),
+]
+
+
+def get_active_department(department_id: int):
+    """department_name / college_id of an active department, else 404"""
+    with get_db() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT department_name, college_id
+                FROM departments
+                WHERE department_id = %s
+                  AND is_active = 1
+            """, (department_id,))
+
+            dept = cursor.fetchone()
+            if not dept:
+                raise HTTPException(
+                    status_code=404,
+                    detail="Department not found or inactive."
+                )
+            return dept
 
-                # -----------------------------------------
-                # 4️⃣ SESSION DURATION
-                # -----------------------------------------
-                cursor.execute("""
-                    SELECT
-                        u.user_id,
-                        COALESCE(SUM(us.duration_seconds), 0) AS total_seconds
-                    FROM user_sessions us
-                    JOIN users u
-                        ON us.user_id = u.user_id
-                       AND u.department_id = %s
-                       AND u.college_id = %s
-                       AND u.is_active = 1
-                    GROUP BY u.user_id
-                """, (department_id, college_id))
 
-                session_map = {row["user_id"]: row["total_seconds"] for row in cursor.fetchall()}
+def check_export_format(export_format: str):
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}"
+        )
 
-                # -----------------------------------------
-                # 5️⃣ BUILD FINAL OUTPUT
-                # -----------------------------------------
-                final = []
 
-                for row in assignment_rows:
-                    uid = row["user_id"]
+@router.get("/export/overall-report/{department_id}")
+async def export_overall_report(department_id: int, export_format: str = Query("csv", alias="format")):
+    """
+    Overall report of a department as CSV or XLSX, streamed from a
+    server-side cursor (students in username order).
+    """
+    check_export_format(export_format)
+    try:
+        dept = await run_db(get_active_department, department_id)
 
-                    total_marks = row["total_assignment_marks"] or 0
-                    max_marks = row["total_assignment_max"] or 0
-                    assignment_percentage = round((total_marks / max_marks) * 100, 2) if max_marks > 0 else 0
+        query, params = student_metrics_query(
+            college_id=dept["college_id"], department_id=department_id
+        )
+        rows = (
+            report_row for report_row in map(overall_report_row, stream_rows(query, params))
+            if report_row is not None
+        )
 
-                    topic_avg = topic_avg_map.get(uid, 0)
+        return await export_response(
+            OVERALL_REPORT_COLUMNS, rows,
+            f"overall-report-{dept['department_name']}", export_format
+        )
 
-                    total_seconds = session_map.get(uid, 0)
-                    total_hours = round(total_seconds / 3600, 2)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error exporting overall report: {str(e)}")
 
-                    last_login = (
-                        row["last_login"].strftime("%d/%m/%y - %I:%M %p")
-                        if row["last_login"]
-                        else "No Login"
-                    )
 
-                    final.append({
-                        "student_name": row["student_name"],
-                        "full_name": row["full_name"],
-                        "department_name": row["department_name"],
-                        "assignment_percentage": assignment_percentage,
-                        "topic_average_percentage": topic_avg,
-                        "total_session_hours": total_hours,
-                        "last_login": last_login
-                    })
+@router.get("/export/assignment-marks/{department_id}")
+async def export_assignment_marks(department_id: int, export_format: str = Query("csv", alias="format")):
+    """
+    Every assignment mark of the department's active students on its
+    active assignments, one row per submission.
+    """
+    check_export_format(export_format)
+    try:
+        dept = await run_db(get_active_department, department_id)
+        college_id = dept["college_id"]
+
+        rows = stream_rows("""
+            SELECT
+                u.username AS student_name,
+                u.full_name,
+                a.assignment_number,
+                a.assignment_topic,
+                am.marks_obtained,
+                am.max_marks,
+                ROUND(am.marks_obtained / NULLIF(am.max_marks, 0) * 100, 2) AS percentage,
+                am.graded_at
+            FROM assignment_marks am
+            JOIN assignments a
+                ON am.assignment_id = a.assignment_id
+               AND a.department_id = %s
+               AND a.college_id = %s
+               AND a.is_active = 1
+            JOIN users u
+                ON am.student_id = u.user_id
+               AND u.department_id = %s
+               AND u.college_id = %s
+               AND u.is_active = 1
+            ORDER BY u.username, a.assignment_id, am.id
+        """, (department_id, college_id, department_id, college_id))
+
+        return await export_response(
+            ASSIGNMENT_MARKS_COLUMNS, rows,
+            f"assignment-marks-{dept['department_name']}", export_format
+        )
 
-                final.sort(key=lambda x: x["assignment_percentage"], reverse=True)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error exporting assignment marks: {str(e)}")
 
-                return {
-                    "status": "success",
-                    "department_id": department_id,
-                    "college_id": college_id,
-                    "department_name": dept["department_name"],
-                    "count": len(final),
-                    "data": final
-                }
 
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error fetching overall report: {str(e)}"
+@router.get("/export/topic-averages/{department_id}")
+async def export_topic_averages(department_id: int, export_format: str = Query("csv", alias="format")):
+    """
+    Per-student, per-topic averages over the department's active topics
+    (same scoring as the overall report's topic average).
+    """
+    check_export_format(export_format)
+    try:
+        dept = await run_db(get_active_department, department_id)
+        college_id = dept["college_id"]
+
+        rows = stream_rows("""
+            SELECT
+                u.username AS student_name,
+                u.full_name,
+                t.topic_name,
+                COUNT(*) AS attempts,
+                SUM(stm.marks_obtained) AS marks_obtained,
+                SUM(stm.max_marks) AS max_marks,
+                ROUND(SUM(stm.marks_obtained) / SUM(stm.max_marks) * 100, 2) AS average_percentage
+            FROM sub_topic_marks stm
+            JOIN users u
+                ON stm.student_id = u.user_id
+               AND u.department_id = %s
+               AND u.college_id = %s
+               AND u.is_active = 1
+            JOIN sub_topics st
+                ON stm.sub_topic_id = st.sub_topic_id
+               AND st.is_active = 1
+            JOIN topics t
+                ON st.topic_id = t.topic_id
+               AND t.is_active = 1
+            JOIN topic_college_department tcd
+                ON tcd.topic_id = t.topic_id
+               AND tcd.college_id = %s
+               AND tcd.department_id = %s
+               AND tcd.is_active = 1
+            WHERE stm.marks_obtained IS NOT NULL
+              AND stm.max_marks > 0
+            GROUP BY u.user_id, u.username, u.full_name, t.topic_id, t.topic_name
+            ORDER BY u.username, t.topic_name
+        """, (department_id, college_id, college_id, department_id))
+
+        return await export_response(
+            TOPIC_AVERAGES_COLUMNS, rows,
+            f"topic-averages-{dept['department_name']}", export_format
         )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error exporting topic averages: {str(e)}")
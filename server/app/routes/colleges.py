@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Form, HTTPException
-from  config.database import get_db
+from  config.database import get_db, db_route
+from config.responses import FastJSONRoute
+from services.catalog_cache import catalog_cache, bump_catalog_version
 from pydantic import BaseModel,field_validator
 from typing import List, Optional
 from datetime import datetime
 
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 
@@ -81,6 +83,7 @@ async def onboard_college(data: CollegeOnboard):
                     created_depts.append(dept)
 
                 conn.commit()
+                bump_catalog_version()
 
                 return {
                     "status": "success",
@@ -214,8 +217,7 @@ async def get_topics_for_college_department(college_id: int, department_id: int)
 
 
     
-@router.get("/get-all-with-department")
-async def get_colleges():
+def load_colleges_with_departments():
     """Fetch all active colleges with their own departments"""
     try:
         with get_db() as conn:
@@ -274,6 +276,13 @@ async def get_colleges():
 
 
 
+@router.get("/get-all-with-department")
+@db_route
+def get_colleges():
+    """Active colleges with their departments, served from the catalog cache"""
+    return catalog_cache.get_or_load(("colleges_with_departments",), load_colleges_with_departments)
+
+
 @router.put("/update/{college_id}")
 async def update_college(
     college_id: int,
@@ -352,6 +361,7 @@ async def update_college(
                         added_departments.append(dept_name)
 
                 conn.commit()
+                bump_catalog_version()
 
                 # 4️⃣ Fetch updated college + departments
                 cursor.execute("""
@@ -404,6 +414,7 @@ async def delete_college(college_id: int):
                 # Soft delete by setting is_active = 0 instead of actual deletion
                 cursor.execute("UPDATE colleges SET is_active = 0 WHERE college_id = %s", (college_id,))
                 conn.commit()
+                bump_catalog_version()
 
                 if cursor.rowcount == 0:
                     raise HTTPException(status_code=404, detail="College not found")
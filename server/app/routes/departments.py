@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException, Form
-from config.database import get_db
+from config.database import get_db, db_route
+from config.responses import FastJSONRoute
+from services.catalog_cache import catalog_cache, bump_catalog_version
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 @router.get("/get-departments")
 async def get_departments():
@@ -42,6 +44,7 @@ async def create_department(
                     
                 ))
                 conn.commit()
+                bump_catalog_version()
 
                 return {
                     "status": "success",
@@ -53,8 +56,7 @@ async def create_department(
 
  
     
-@router.get("/{department_id}/topics")
-async def get_department_topics(department_id: int):
+def load_department_topics(department_id: int):
     """
     Fetch topics assigned to a department
     (NEW schema using topic_college_department)
@@ -113,3 +115,13 @@ async def get_department_topics(department_id: int):
             status_code=500,
             detail=f"Error fetching topics: {str(e)}"
         )
+
+
+@router.get("/{department_id}/topics")
+@db_route
+def get_department_topics(department_id: int):
+    """Topics assigned to a department, served from the catalog cache"""
+    return catalog_cache.get_or_load(
+        ("department_topics", department_id),
+        lambda: load_department_topics(department_id)
+    )
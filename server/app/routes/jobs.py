@@ -0,0 +1,38 @@
+from fastapi import APIRouter, HTTPException
+from config.responses import FastJSONRoute
+from jobs.store import get_job_store, serialize_job
+from jobs.runner import dispatcher
+
+router = APIRouter(route_class=FastJSONRoute)
+
+
+@router.get("/stats")
+def get_job_stats():
+    """Job counts by status plus this process's worker slots"""
+    try:
+        return {
+            "status": "success",
+            "data": {
+                "jobs": get_job_store().counts(),
+                "dispatcher": dispatcher.stats()
+            }
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching job stats: {str(e)}")
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str):
+    """Status, progress, row counts and errors of a background job"""
+    try:
+        job = get_job_store().get(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return {
+            "status": "success",
+            "data": serialize_job(job)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching job: {str(e)}")
@@ -1,8 +1,11 @@
 from typing import Optional
 from fastapi import APIRouter, HTTPException, Form
 from config.database import get_db
+from config.responses import FastJSONRoute
+from services.catalog_cache import bump_catalog_version
+from services.question_bundles import compile_question_bundle
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 @router.post("/upload", status_code=201)
 async def upload_overview(
@@ -79,6 +82,7 @@ async def upload_overview(
                 ))
 
                 conn.commit()
+                bump_catalog_version()
 
                 return {
                     "status": "success",
@@ -194,6 +198,7 @@ async def deactivate_subtopic(sub_topic_id: int):
                     (sub_topic_id,)
                 )
                 questions_updated = cursor.rowcount
+                compile_question_bundle(cursor, "sub_topic", sub_topic_id)
 
                 # Deactivate the subtopic itself
                 cursor.execute(
@@ -201,6 +206,7 @@ async def deactivate_subtopic(sub_topic_id: int):
                     (sub_topic_id,)
                 )
                 conn.commit()
+                bump_catalog_version()
 
         return {
             "status": "success",
@@ -279,6 +285,7 @@ async def update_subtopic_overview(
 
                 cursor.execute(update_sql, tuple(params))
                 conn.commit()
+                bump_catalog_version()
 
         return {
             "status": "success",
@@ -1,8 +1,13 @@
-from fastapi import APIRouter, HTTPException
-from config.database import get_db
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Header, Query
+from config.database import get_db, db_route
+from config.responses import FastJSONRoute
+from config.settings import LIST_DEFAULT_LIMIT, LIST_MAX_LIMIT
+from services.question_bundles import get_question_bundle, bundle_response
+from services.pagination import fetch_page, estimated_total
 import json
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 @router.get("/db")
 async def get_question_types():
@@ -27,29 +32,67 @@ async def get_question_types():
 
 
 @router.get("/get-questions")
-async def get_questions(assignment_id : int = None):
-    """Get questions, optionally filtered by assignment_id"""
+@db_route
+def get_questions(
+    assignment_id: int = None,
+    test_scope: Optional[str] = None,
+    reference_id: Optional[int] = None,
+    question_type_id: Optional[int] = None,
+    active: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(LIST_DEFAULT_LIMIT, ge=1, le=LIST_MAX_LIMIT),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Get questions. With assignment_id: that assignment's full question set
+    (precompiled bundle). Otherwise one page of questions in question_id
+    order, filtered by test_scope / reference_id / question_type_id /
+    active; pass `next_cursor` back as `cursor` for the next page.
+    """
     try:
-        with get_db() as conn:
-            with conn.cursor() as cursor:
-                if assignment_id:
-                    cursor.execute("""
-                            SELECT * FROM questions 
-                            WHERE assignment_id = %s
-                            ORDER BY order_no
-                        """, (assignment_id,))
-                else:
-                    cursor.execute("SELECT * FROM questions ORDER BY order_no")
+        if assignment_id:
+            # questions reference assignments through test_scope / reference_id
+            bundle = get_question_bundle("assignment", assignment_id)
+            return bundle_response(bundle, "full", if_none_match)
 
-                questions = cursor.fetchall()
+        filters = []
+        params = []
+        for column, value in (
+            ("test_scope", test_scope),
+            ("reference_id", reference_id),
+            ("question_type_id", question_type_id),
+        ):
+            if value is not None:
+                filters.append(f"{column} = %s")
+                params.append(value)
+        if active is not None:
+            filters.append("is_active = %s")
+            params.append(1 if active else 0)
 
-                print(questions)
+        with get_db() as conn:
+            with conn.cursor() as db_cursor:
+                questions, next_cursor = fetch_page(
+                    db_cursor, "SELECT * FROM questions", filters, params,
+                    key_column="question_id", key_field="question_id",
+                    page_cursor=cursor, limit=limit, descending=False
+                )
+                total = estimated_total(
+                    db_cursor, "questions", "SELECT COUNT(*) AS total FROM questions", filters, params
+                )
 
                 # Parse JSON data
                 for question in questions:
                     if question['question_data']:
                         question['question_data'] = json.loads(question['question_data'])
 
-                return questions
+                return {
+                    "status": "success",
+                    "count": len(questions),
+                    "total": total,
+                    "next_cursor": next_cursor,
+                    "data": questions
+                }
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
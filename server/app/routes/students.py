@@ -7,15 +7,19 @@ from uuid import uuid4
 import bcrypt
 from fastapi import APIRouter, HTTPException, Form, File, UploadFile
 from pydantic import BaseModel
-from config.database import get_db
+from config.database import get_db, db_route
+from config.responses import FastJSONRoute
+from services.topic_progress import apply_sub_topic_mark
+from services.dashboard_cache import invalidate_student_dashboard
 
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 
 @router.get("/department/{college_id}/{department_id}/topic/{topic_id}/progress")
-async def get_specific_topic_progress(college_id: int, department_id: int, topic_id: int):
+@db_route
+def get_specific_topic_progress(college_id: int, department_id: int, topic_id: int):
     """
     Fetch average progress and score for a specific topic 
     under a department in a college using department_topic_map.
@@ -202,7 +206,8 @@ async def get_specific_topic_progress(college_id: int, department_id: int, topic
 
 
 @router.post("/store-marks")
-async def store_marks(marks_data: Dict[str, Any]):
+@db_route
+def store_marks(marks_data: Dict[str, Any]):
     """
     Store subtopic marks (ONE ATTEMPT ONLY).
     After first submission:
@@ -284,7 +289,13 @@ async def store_marks(marks_data: Dict[str, Any]):
                         }
                     }
 
-                # 5️⃣ Insert into sub_topic_marks (use topic_id, college_id, department_id)
+                # 5️⃣ Fold this submission into topic-level progress (O(1) counter update;
+                #    runs before the marks insert so it can tell a first-time sub-topic)
+                topic_progress = apply_sub_topic_mark(
+                    cursor, student_id, topic_id, sub_topic_id, marks_obtained, max_marks
+                )
+
+                # 6️⃣ Insert into sub_topic_marks (use topic_id, college_id, department_id)
                 cursor.execute("""
                     INSERT INTO sub_topic_marks
                     (student_id, sub_topic_id, topic_id, college_id, department_id,
@@ -300,7 +311,7 @@ async def store_marks(marks_data: Dict[str, Any]):
                     Decimal(str(max_marks))
                 ))
 
-                # 6️⃣ Insert into student_test_attempts (first attempt, completed)
+                # 7️⃣ Insert into student_test_attempts (first attempt, completed)
                 # attempt_number = 1 (since retake blocked), is_completed = 1, completed_at = NOW()
                 cursor.execute("""
                     INSERT INTO student_test_attempts
@@ -317,7 +328,7 @@ async def store_marks(marks_data: Dict[str, Any]):
                     None                    # time_spent_minutes (optional)
                 ))
 
-                # 7️⃣ Upsert student_subtopic_progress (mark completed regardless of pass/fail)
+                # 8️⃣ Upsert student_subtopic_progress (mark completed regardless of pass/fail)
                 cursor.execute("""
                     INSERT INTO student_subtopic_progress
                     (student_id, topic_id, sub_topic_id, is_completed, score, time_spent_minutes, last_accessed)
@@ -336,71 +347,9 @@ async def store_marks(marks_data: Dict[str, Any]):
                     None
                 ))
 
-                # 8️⃣ Recompute and upsert topic-level progress in student_topic_progress
-                # a) completed_sub_topics (distinct sub_topic_id entries for this student & topic)
-                cursor.execute("""
-                    SELECT COUNT(DISTINCT sub_topic_id) AS completed_sub_topics
-                    FROM sub_topic_marks
-                    WHERE student_id = %s AND topic_id = %s
-                """, (student_id, topic_id))
-                completed_row = cursor.fetchone()
-                completed_sub_topics = int(completed_row.get("completed_sub_topics") or 0)
-
-                # b) total_sub_topics for the topic (active ones)
-                cursor.execute("""
-                    SELECT COUNT(*) AS total_sub_topics
-                    FROM sub_topics
-                    WHERE topic_id = %s AND is_active = TRUE
-                """, (topic_id,))
-                total_row = cursor.fetchone()
-                total_sub_topics = int(total_row.get("total_sub_topics") or 0)
-
-                # c) average_score across this student's sub_topic_marks for the topic (percent)
-                cursor.execute("""
-                    SELECT AVG((marks_obtained / NULLIF(max_marks,0)) * 100) AS avg_percent
-                    FROM sub_topic_marks
-                    WHERE student_id = %s AND topic_id = %s
-                """, (student_id, topic_id))
-                avg_row = cursor.fetchone()
-                average_score = float(avg_row.get("avg_percent") or 0.0)
-
-                # safe compute progress_percent
-                progress_percent = (completed_sub_topics / total_sub_topics * 100.0) if total_sub_topics else 0.0
-
-                # map progress_percent to status (adjust mapping as needed)
-                if progress_percent == 0:
-                    status = 'Not Started'
-                elif progress_percent < 50:
-                    status = 'Learning Now'
-                elif progress_percent < 100:
-                    status = 'Ongoing'
-                else:
-                    status = 'Completed'
-
-                # upsert into student_topic_progress
-                cursor.execute("""
-                    INSERT INTO student_topic_progress
-                    (student_id, topic_id, completed_sub_topics, total_sub_topics, progress_percent, average_score, status, last_updated)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())
-                    ON DUPLICATE KEY UPDATE
-                        completed_sub_topics = VALUES(completed_sub_topics),
-                        total_sub_topics = VALUES(total_sub_topics),
-                        progress_percent = VALUES(progress_percent),
-                        average_score = VALUES(average_score),
-                        status = VALUES(status),
-                        last_updated = NOW()
-                """, (
-                    student_id,
-                    topic_id,
-                    completed_sub_topics,
-                    total_sub_topics,
-                    Decimal(str(round(progress_percent, 2))),
-                    Decimal(str(round(average_score, 2))),
-                    status
-                ))
-
                 # commit transaction
                 conn.commit()
+                invalidate_student_dashboard(student_id)
 
                 # return success response (include computed percentage & pass/fail)
                 return {
@@ -416,11 +365,11 @@ async def store_marks(marks_data: Dict[str, Any]):
                         "completion_status": "completed",
                         "topic_progress": {
                             "topic_id": topic_id,
-                            "completed_sub_topics": completed_sub_topics,
-                            "total_sub_topics": total_sub_topics,
-                            "progress_percent": round(progress_percent, 2),
-                            "average_score_percent": round(average_score, 2),
-                            "status": status
+                            "completed_sub_topics": topic_progress["completed_sub_topics"],
+                            "total_sub_topics": topic_progress["total_sub_topics"],
+                            "progress_percent": float(topic_progress["progress_percent"]),
+                            "average_score_percent": float(topic_progress["average_score"]),
+                            "status": topic_progress["status"]
                         }
                     }
                 }
@@ -436,7 +385,8 @@ async def store_marks(marks_data: Dict[str, Any]):
 
 
 @router.get("/{user_id}/test-attempt-status/{test_scope}/{reference_id}")
-async def get_test_attempt_status(user_id: int, test_scope: str, reference_id: int):
+@db_route
+def get_test_attempt_status(user_id: int, test_scope: str, reference_id: int):
     """Check if student has already attempted this test"""
     try:
         with get_db() as conn:
@@ -481,7 +431,8 @@ async def get_test_attempt_status(user_id: int, test_scope: str, reference_id: i
 
 
 @router.post("/store-assignment-marks")
-async def store_assignment_marks(marks_data: dict):
+@db_route
+def store_assignment_marks(marks_data: dict):
     """
     Store assignment marks (ONE ATTEMPT ONLY).
     After first submission:
@@ -564,6 +515,7 @@ async def store_assignment_marks(marks_data: dict):
                 ))
 
                 conn.commit()
+                invalidate_student_dashboard(student_id)
 
         return {
             "status": "success",
@@ -587,7 +539,8 @@ async def store_assignment_marks(marks_data: dict):
 
 
 @router.put("/update/{user_id}")
-async def update_student(
+@db_route
+def update_student(
     user_id: int,
     full_name: Optional[str] = Form(None),
     username: Optional[str] = Form(None),
@@ -655,7 +608,8 @@ async def update_student(
 
 
 @router.delete("/delete/{user_id}")
-async def delete_student(user_id: int):
+@db_route
+def delete_student(user_id: int):
     try:
         with get_db() as conn:
             with conn.cursor() as cursor:
@@ -675,6 +629,7 @@ async def delete_student(user_id: int):
                     (user_id,)
                 )
                 conn.commit()
+                invalidate_student_dashboard(user_id)
 
         return {
             "status": "success",
@@ -689,7 +644,8 @@ async def delete_student(user_id: int):
 
 
 @router.get("/subtopic/{sub_topic_id}/view/{student_id}")
-async def view_completed_subtopic_test(sub_topic_id: int, student_id: int):
+@db_route
+def view_completed_subtopic_test(sub_topic_id: int, student_id: int):
     """
     Return ONLY:
     - Questions
@@ -786,7 +742,8 @@ async def view_completed_subtopic_test(sub_topic_id: int, student_id: int):
 
 
 @router.get("/assignment/{assignment_id}/answers/{student_id}")
-async def view_assignment_answers_only(assignment_id: int, student_id: int):
+@db_route
+def view_assignment_answers_only(assignment_id: int, student_id: int):
     """
     Return ONLY questions + options + correct answer
     Student must have completed the assignment.
@@ -869,7 +826,8 @@ class ProfileData(BaseModel):
 
 
 @router.post("/profile")
-async def save_student_profile(data: ProfileData):
+@db_route
+def save_student_profile(data: ProfileData):
 
     if not data.user_id:
         raise HTTPException(status_code=400, detail="user_id is required")
@@ -955,7 +913,8 @@ async def upload_resume(file: UploadFile):
 
 
 @router.get("/{user_id}/is-onboarded")
-async def check_onboarded(user_id: int):
+@db_route
+def check_onboarded(user_id: int):
     try:
         with get_db() as conn:
             with conn.cursor() as cursor:
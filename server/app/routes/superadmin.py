@@ -1,7 +1,11 @@
+from datetime import date
+from typing import Optional
 from fastapi import APIRouter, HTTPException
-from config.database import get_db
+from config.database import get_db, db_route
+from config.responses import FastJSONRoute
+from services.learning_hours import GRANULARITIES, fetch_learning_hours
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 @router.get("/get-superadmin-report")
 async def get_superadmin_report():
@@ -145,36 +149,56 @@ async def get_students_by_college():
 
 
 @router.get("/daily-learning-hours")
-async def get_daily_learning_hours():
+@db_route
+def get_daily_learning_hours(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    granularity: str = "day",
+    college_id: Optional[int] = None,
+    department_id: Optional[int] = None
+):
     """
     DAILY TOTAL LEARNING TIME (LINE CHART)
     ---------------------------------------
-    Returns total hours spent by all students per day
-    based on user_sessions table (duration_seconds).
+    Returns total hours spent by students per day / week / month, read from
+    the learning_hours_daily rollup (kept current by tests.end_session).
+
+    - start_date / end_date: inclusive range (YYYY-MM-DD), default all history
+    - granularity: day | week (from Monday) | month
+    - department_id or college_id narrows it down; default is all students
     """
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of: {', '.join(GRANULARITIES)}")
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+
+    if department_id is not None:
+        scope, scope_id = "department", department_id
+    elif college_id is not None:
+        scope, scope_id = "college", college_id
+    else:
+        scope, scope_id = "global", 0
+
     try:
         with get_db() as conn:
             with conn.cursor() as cursor:
-
-                query = """
-                    SELECT 
-                        DATE(end_time) AS date,
-                        ROUND(SUM(duration_seconds) / 3600, 2) AS total_hours
-                    FROM user_sessions
-                    WHERE end_time IS NOT NULL
-                    GROUP BY DATE(end_time)
-                    ORDER BY DATE(end_time) ASC;
-                """
-
-                cursor.execute(query)
-                rows = cursor.fetchall() or []
+                rows = fetch_learning_hours(
+                    cursor,
+                    scope=scope,
+                    scope_id=scope_id,
+                    start=start_date,
+                    end=end_date,
+                    granularity=granularity
+                )
 
                 # Convert to chart.js format
-                dates = [str(row["date"]) for row in rows]
-                hours = [float(row["total_hours"]) for row in rows]
+                dates = [row["date"] for row in rows]
+                hours = [row["total_hours"] for row in rows]
 
                 return {
                     "status": "success",
+                    "granularity": granularity,
+                    "scope": scope,
                     "count": len(rows),
                     "labels": dates,         # X-axis
                     "values": hours,         # Y-axis
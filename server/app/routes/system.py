@@ -0,0 +1,103 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import FileResponse
+from config.database import get_pool_stats
+from config.responses import FastJSONRoute
+from config.compression import compression_stats
+from config.server_timing import query_route_stats
+from config.profiling import list_profiles, profile_path, valid_profile_token
+from voice.analysis_service import voice_service
+from services.catalog_cache import catalog_cache
+from services.dashboard_cache import dashboard_cache
+from services.question_bundles import bundle_cache
+
+router = APIRouter(route_class=FastJSONRoute)
+
+
+@router.get("/db-pool")
+async def get_db_pool_stats():
+    """Connection pool utilization (checked-out, idle, waits, wait time)"""
+    try:
+        return {
+            "status": "success",
+            "data": get_pool_stats()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching pool stats: {str(e)}")
+
+
+@router.get("/voice")
+async def get_voice_service_stats():
+    """Voice analysis pool: queue depth, rejections, queue wait and processing times"""
+    try:
+        return {
+            "status": "success",
+            "data": voice_service.stats()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching voice stats: {str(e)}")
+
+
+@router.get("/cache")
+async def get_cache_stats():
+    """Catalog, dashboard and question bundle caches: entries, hit ratios, invalidations"""
+    try:
+        return {
+            "status": "success",
+            "data": {
+                "catalog": catalog_cache.stats(),
+                "dashboard": dashboard_cache.stats(),
+                "question_bundles": bundle_cache.stats()
+            }
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching cache stats: {str(e)}")
+
+
+@router.get("/compression")
+async def get_compression_stats():
+    """Response bytes before/after compression per route, largest savings first"""
+    try:
+        return {
+            "status": "success",
+            "data": compression_stats.snapshot()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching compression stats: {str(e)}")
+
+
+@router.get("/queries")
+async def get_query_stats():
+    """SQL statements and DB time per route (most DB time first), with each route's slowest statement"""
+    try:
+        return {
+            "status": "success",
+            "data": query_route_stats.snapshot()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching query stats: {str(e)}")
+
+
+@router.get("/profiles")
+async def get_profiles(x_profile_token: Optional[str] = Header(None)):
+    """Stored request profiles (folded stacks), newest first; needs X-Profile-Token"""
+    if not valid_profile_token(x_profile_token):
+        raise HTTPException(status_code=403, detail="Profiling token required")
+    try:
+        return {
+            "status": "success",
+            "data": list_profiles()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error listing profiles: {str(e)}")
+
+
+@router.get("/profiles/{name}")
+async def download_profile(name: str, x_profile_token: Optional[str] = Header(None)):
+    """One profile in folded format (flamegraph.pl / inferno / speedscope input)"""
+    if not valid_profile_token(x_profile_token):
+        raise HTTPException(status_code=403, detail="Profiling token required")
+    path = profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain; charset=utf-8", filename=name)
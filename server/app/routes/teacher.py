@@ -3,9 +3,10 @@ from typing import Optional
 import bcrypt
 from fastapi import APIRouter, HTTPException, Form, File, UploadFile
 from config.database import get_db
+from config.responses import FastJSONRoute
 
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 @router.get("/department/{college_id}/{department_id}/topics-progress")
 async def get_department_topics_average_progress(college_id: int, department_id: int):
     """
@@ -6,14 +6,20 @@ import aiofiles
 import pandas as pd
 from datetime import datetime
 from fastapi import APIRouter, HTTPException, Form, File, UploadFile
-from config.database import get_db
+from config.database import get_db, db_route
+from config.responses import FastJSONRoute
+from services.catalog_cache import bump_catalog_version
+from services.question_bundles import compile_question_bundle, drop_question_bundle
+from services.question_ingest import ingest_questions
+from services.learning_hours import record_session_end
+from jobs.runner import enqueue_job, record_job_commit, report_job_progress
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 UPLOAD_DIR = "uploads/tests"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-@router.post("/create", status_code=201)
+@router.post("/create", status_code=202)
 async def create_test(
     test_type: str = Form(...),
     file: UploadFile = File(...),
@@ -35,6 +41,9 @@ async def create_test(
     if not file.filename.endswith((".xlsx", ".xls")):
         raise HTTPException(400, "Only Excel files allowed")
 
+    if test_type not in ("assignment", "sub_topic"):
+        raise HTTPException(400, "Invalid test_type")
+
     unique_id = str(uuid.uuid4())
     save_folder = os.path.join(UPLOAD_DIR, test_type)
     os.makedirs(save_folder, exist_ok=True)
@@ -49,161 +58,138 @@ async def create_test(
     original_file_name = file.filename
 
     try:
-        with get_db() as conn:
-            with conn.cursor() as cursor:
+        # ===============================
+        # 2️⃣ Queue the import
+        # ===============================
+        job_id = enqueue_job(
+            "tests.create",
+            cleanup_on_failure=[file_path],
+            test_type=test_type,
+            file_path=file_path,
+            original_file_name=original_file_name,
+            college_id=college_id,
+            department_id=department_id,
+            assignment_number=assignment_number,
+            assignment_topic=assignment_topic,
+            start_date=start_date,
+            end_date=end_date,
+            sub_topic_id=sub_topic_id,
+        )
+        return {
+            "status": "queued",
+            "message": "Test upload accepted and queued for processing",
+            "job_id": job_id,
+            "job_url": f"/jobs/{job_id}"
+        }
+
+    except Exception as e:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise HTTPException(500, f"Error creating test: {str(e)}")
 
-                # ===============================
-                # 2️⃣ ASSIGNMENT TEST
-                # ===============================
-                if test_type == "assignment":
-
-                    if not all([college_id, department_id, assignment_number, assignment_topic]):
-                        raise HTTPException(400, "Missing assignment fields")
-
-                    cursor.execute("""
-                        INSERT INTO assignments (
-                            assignment_number,
-                            assignment_topic,
-                            college_id,
-                            department_id,
-                            start_date,
-                            end_date,
-                            file_name,
-                            file_path,
-                            created_at,
-                            updated_at
-                        )
-                        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,NOW(),NOW())
-                    """, (
+
+def create_test_from_file(test_type, file_path, original_file_name,
+                          college_id, department_id, assignment_number, assignment_topic,
+                          start_date, end_date, sub_topic_id):
+    """Create the assignment / attach the sub-topic file and ingest its questions"""
+    with get_db() as conn:
+        with conn.cursor() as cursor:
+
+            # ===============================
+            # 2️⃣ ASSIGNMENT TEST
+            # ===============================
+            if test_type == "assignment":
+
+                if not all([college_id, department_id, assignment_number, assignment_topic]):
+                    raise HTTPException(400, "Missing assignment fields")
+
+                cursor.execute("""
+                    INSERT INTO assignments (
                         assignment_number,
                         assignment_topic,
                         college_id,
                         department_id,
                         start_date,
                         end_date,
-                        original_file_name,
-                        file_path
-                    ))
-
-                    reference_id = cursor.lastrowid
-                    test_scope = "assignment"
-
-                # ===============================
-                # 3️⃣ SUB-TOPIC MCQ TEST
-                # ===============================
-                elif test_type == "sub_topic":
-
-                    if not sub_topic_id:
-                        raise HTTPException(400, "sub_topic_id is required")
-
-                    cursor.execute("""
-                        SELECT sub_topic_id
-                        FROM sub_topics
-                        WHERE sub_topic_id = %s AND is_active = 1
-                    """, (sub_topic_id,))
-
-                    if not cursor.fetchone():
-                        raise HTTPException(404, "Sub-topic not found")
-
-                    # 🔑 Store MCQ file against sub_topic
-                    cursor.execute("""
-                        UPDATE sub_topics
-                        SET
-                            file_name = %s,
-                            test_file = %s,
-                            updated_at = NOW()
-                        WHERE sub_topic_id = %s
-                    """, (
-                        original_file_name,
+                        file_name,
                         file_path,
-                        sub_topic_id
-                    ))
-
-                    reference_id = sub_topic_id
-                    test_scope = "sub_topic"
-
-                else:
-                    raise HTTPException(400, "Invalid test_type")
-
-                # ===============================
-                # 4️⃣ PARSE EXCEL
-                # ===============================
-                df = pd.read_excel(file_path)
-                df.columns = [c.strip().lower() for c in df.columns]
-
-                if "question_type" not in df.columns or "question_text" not in df.columns:
-                    raise HTTPException(
-                        400,
-                        "Excel must contain 'question_type' and 'question_text'"
-                    )
-
-                question_rows = []
-                question_type_cache = {}
-
-                for idx, row in df.iterrows():
-                    if pd.isna(row["question_text"]):
-                        continue
-
-                    q_type = str(row["question_type"]).strip().lower()
-
-                    if q_type not in question_type_cache:
-                        cursor.execute(
-                            "SELECT question_type_id FROM question_type WHERE question_type=%s",
-                            (q_type,)
-                        )
-                        qt = cursor.fetchone()
-                        if not qt:
-                            raise HTTPException(400, f"Invalid question type: {q_type}")
-                        question_type_cache[q_type] = qt["question_type_id"]
-
-                    question_data = {
-                        k: row[k]
-                        for k in df.columns
-                        if k not in ["question_type", "question_text"]
-                        and not pd.isna(row[k])
-                    }
-
-                    question_rows.append((
-                        test_scope,
-                        reference_id,
-                        question_type_cache[q_type],
-                        row["question_text"],
-                        json.dumps(question_data),
-                        float(row.get("marks", 1)),
-                        int(row.get("order_no", idx + 1)),
-                    ))
-
-                if not question_rows:
-                    raise HTTPException(400, "No valid questions found")
-
-                cursor.executemany("""
-                    INSERT INTO questions (
-                        test_scope,
-                        reference_id,
-                        question_type_id,
-                        question_text,
-                        question_data,
-                        marks,
-                        order_no,
                         created_at,
                         updated_at
                     )
-                    VALUES (%s,%s,%s,%s,%s,%s,%s,NOW(),NOW())
-                """, question_rows)
+                    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,NOW(),NOW())
+                """, (
+                    assignment_number,
+                    assignment_topic,
+                    college_id,
+                    department_id,
+                    start_date,
+                    end_date,
+                    original_file_name,
+                    file_path
+                ))
+
+                reference_id = cursor.lastrowid
+                test_scope = "assignment"
+
+            # ===============================
+            # 3️⃣ SUB-TOPIC MCQ TEST
+            # ===============================
+            elif test_type == "sub_topic":
+
+                if not sub_topic_id:
+                    raise HTTPException(400, "sub_topic_id is required")
 
-                conn.commit()
+                cursor.execute("""
+                    SELECT sub_topic_id
+                    FROM sub_topics
+                    WHERE sub_topic_id = %s AND is_active = 1
+                """, (sub_topic_id,))
 
-        return {
-            "status": "success",
-            "message": f"{len(question_rows)} questions uploaded successfully",
-            "test_scope": test_scope,
-            "reference_id": reference_id
-        }
+                if not cursor.fetchone():
+                    raise HTTPException(404, "Sub-topic not found")
 
-    except Exception as e:
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        raise HTTPException(500, f"Error creating test: {str(e)}")
+                # 🔑 Store MCQ file against sub_topic
+                cursor.execute("""
+                    UPDATE sub_topics
+                    SET
+                        file_name = %s,
+                        test_file = %s,
+                        updated_at = NOW()
+                    WHERE sub_topic_id = %s
+                """, (
+                    original_file_name,
+                    file_path,
+                    sub_topic_id
+                ))
+
+                reference_id = sub_topic_id
+                test_scope = "sub_topic"
+
+            else:
+                raise HTTPException(400, "Invalid test_type")
+
+            # ===============================
+            # 4️⃣ STREAM EXCEL INTO QUESTIONS
+            # ===============================
+            stats = ingest_questions(
+                cursor, file_path, test_scope, reference_id,
+                progress=report_job_progress
+            )
+
+            # 5️⃣ Precompile the served question bundle in the same transaction
+            compile_question_bundle(cursor, test_scope, reference_id)
+
+            result = {
+                "message": f"{stats['rows_inserted']} questions uploaded successfully",
+                "test_scope": test_scope,
+                "reference_id": reference_id,
+                "ingest": stats
+            }
+            record_job_commit(cursor, result)
+            conn.commit()
+            bump_catalog_version()
+
+    return result
 
 
 
@@ -237,29 +223,27 @@ async def start_session(user_id: int):
 
 
 @router.put("/end/{session_id}")
-async def end_session(session_id: int):
+@db_route
+def end_session(session_id: int):
     """
     End a user's active session (calculate duration automatically).
     """
     try:
         with get_db() as conn:
             with conn.cursor() as cursor:
-                # Ensure the session exists and is not already ended
+                # End session; the end_time guard makes a repeated call a no-op,
+                # so a session is never added to the rollup twice
                 cursor.execute("""
-                    SELECT * FROM user_sessions 
+                    UPDATE user_sessions
+                    SET end_time = %s
                     WHERE id = %s AND end_time IS NULL
-                """, (session_id,))
-                session = cursor.fetchone()
+                """, (datetime.now(), session_id))
 
-                if not session:
+                if cursor.rowcount == 0:
                     raise HTTPException(status_code=404, detail="Session not found or already ended")
 
-                # End session
-                cursor.execute("""
-                    UPDATE user_sessions
-                    SET end_time = %s
-                    WHERE id = %s
-                """, (datetime.now(), session_id))
+                # Add it to the daily learning-hours rollup
+                record_session_end(cursor, session_id)
                 conn.commit()
 
                 return {
@@ -275,7 +259,7 @@ async def end_session(session_id: int):
 
 
 
-@router.put("/update-file/{assignment_id}")
+@router.put("/update-file/{assignment_id}", status_code=202)
 async def update_assignment_file(assignment_id: int, file: UploadFile = File(...)):
 
     if not file.filename.endswith((".xlsx", ".xls")):
@@ -293,74 +277,62 @@ async def update_assignment_file(assignment_id: int, file: UploadFile = File(...
             await out.write(chunk)
 
     try:
-        with get_db() as conn:
-            with conn.cursor() as cursor:
-
-                # Delete old file
-                cursor.execute("SELECT file_path FROM assignments WHERE assignment_id=%s", (assignment_id,))
-                data = cursor.fetchone()
-                if not data:
-                    raise HTTPException(404, "Assignment not found")
-
-                if data["file_path"] and os.path.exists(data["file_path"]):
-                    os.remove(data["file_path"])
+        job_id = enqueue_job(
+            "tests.update_assignment_file",
+            cleanup_on_failure=[new_file_path],
+            assignment_id=assignment_id,
+            original_name=file.filename,
+            new_file_path=new_file_path,
+        )
+        return {
+            "status": "queued",
+            "message": "Assignment file accepted and queued for processing",
+            "job_id": job_id,
+            "job_url": f"/jobs/{job_id}"
+        }
 
-                # Delete old questions
-                cursor.execute("DELETE FROM questions WHERE test_scope='assignment' AND reference_id=%s", (assignment_id,))
-                conn.commit()
+    except Exception as e:
+        if os.path.exists(new_file_path):
+            os.remove(new_file_path)
+        raise HTTPException(500, f"Error: {str(e)}")
 
-        # Parse Excel
-        df = pd.read_excel(new_file_path)
-        df = normalize_columns(df)
 
-        question_rows = []
+def replace_assignment_questions(assignment_id, original_name, new_file_path):
+    """Swap the assignment question file: old questions are replaced in one transaction"""
+    with get_db() as conn:
+        with conn.cursor() as cursor:
 
-        with get_db() as conn:
-            with conn.cursor() as cursor:
+            cursor.execute("SELECT file_path FROM assignments WHERE assignment_id=%s", (assignment_id,))
+            data = cursor.fetchone()
+            if not data:
+                raise HTTPException(404, "Assignment not found")
+            old_file_path = data["file_path"]
 
-                qt_cache = {}
-
-                for idx, row in df.iterrows():
-                    q_type = str(row.get("question_type")).strip().lower()
-
-                    if q_type not in qt_cache:
-                        cursor.execute("SELECT question_type_id FROM question_type WHERE question_type=%s", (q_type,))
-                        qt = cursor.fetchone()
-                        if not qt:
-                            raise HTTPException(400, f"Invalid question type: {q_type}")
-                        qt_cache[q_type] = qt["question_type_id"]
-
-                    qd = build_question_json(row, q_type)
-
-                    question_rows.append((
-                        "assignment",
-                        assignment_id,
-                        qt_cache[q_type],
-                        row.get("question_text"),
-                        json.dumps(qd),
-                        float(row.get("marks", 1)),
-                        int(row.get("order_no", idx + 1)),
-                    ))
-
-                cursor.executemany("""
-                    INSERT INTO questions
-                    (test_scope,reference_id,question_type_id,question_text,question_data,
-                     marks,order_no,created_at,updated_at)
-                    VALUES (%s,%s,%s,%s,%s,%s,%s,NOW(),NOW())
-                """, question_rows)
+            # Replace old questions with the new file's questions
+            cursor.execute("DELETE FROM questions WHERE test_scope='assignment' AND reference_id=%s", (assignment_id,))
+            stats = ingest_questions(
+                cursor, new_file_path, "assignment", assignment_id,
+                build_question_data=build_question_json,
+                progress=report_job_progress
+            )
 
-                cursor.execute("""
-                    UPDATE assignments
-                    SET file_name=%s, file_path=%s, updated_at=NOW()
-                    WHERE assignment_id=%s
-                """, (file.filename, new_file_path, assignment_id))
+            cursor.execute("""
+                UPDATE assignments
+                SET file_name=%s, file_path=%s, updated_at=NOW()
+                WHERE assignment_id=%s
+            """, (original_name, new_file_path, assignment_id))
 
-                conn.commit()
+            compile_question_bundle(cursor, "assignment", assignment_id)
+            result = {"message": "Assignment updated", "questions": stats["rows_inserted"], "ingest": stats}
+            record_job_commit(cursor, result)
+            conn.commit()
+            bump_catalog_version()
 
-        return {"status": "success", "message": "Assignment updated", "questions": len(question_rows)}
+    # Old file is only removed once the new questions are committed
+    if old_file_path and old_file_path != new_file_path and os.path.exists(old_file_path):
+        os.remove(old_file_path)
 
-    except Exception as e:
-        raise HTTPException(500, f"Error: {str(e)}")
+    return result
 
     
 
@@ -398,6 +370,7 @@ async def delete_assignment(assignment_id: int):
                     (assignment_id,)
                 )
                 questions_deleted = cursor.rowcount
+                drop_question_bundle(cursor, "assignment", assignment_id)
 
                 # ✅ Step 3: Delete assignment record
                 cursor.execute(
@@ -409,6 +382,7 @@ async def delete_assignment(assignment_id: int):
                     raise HTTPException(status_code=404, detail="Assignment not found or already deleted")
                 
                 conn.commit()
+                bump_catalog_version()
 
         # ✅ Step 4: Delete file (after DB commit)
         file_deleted = False
@@ -449,7 +423,7 @@ async def delete_assignment(assignment_id: int):
 
 
 
-@router.put("/update-file/subtopic/{sub_topic_id}")
+@router.put("/update-file/subtopic/{sub_topic_id}", status_code=202)
 async def update_subtopic_file(sub_topic_id: int, file: UploadFile = File(...)):
 
     if not file.filename.endswith((".xlsx",".xls")):
@@ -466,71 +440,62 @@ async def update_subtopic_file(sub_topic_id: int, file: UploadFile = File(...)):
             await out.write(chunk)
 
     try:
-        with get_db() as conn:
-            with conn.cursor() as cursor:
-
-                cursor.execute("SELECT test_file FROM sub_topics WHERE sub_topic_id=%s", (sub_topic_id,))
-                subtopic = cursor.fetchone()
-                if not subtopic:
-                    raise HTTPException(404, "Subtopic not found")
-
-                if subtopic["test_file"] and os.path.exists(subtopic["test_file"]):
-                    os.remove(subtopic["test_file"])
+        job_id = enqueue_job(
+            "tests.update_subtopic_file",
+            cleanup_on_failure=[new_file_path],
+            sub_topic_id=sub_topic_id,
+            original_name=file.filename,
+            new_file_path=new_file_path,
+        )
+        return {
+            "status": "queued",
+            "message": "Subtopic file accepted and queued for processing",
+            "job_id": job_id,
+            "job_url": f"/jobs/{job_id}"
+        }
 
-                cursor.execute("DELETE FROM questions WHERE test_scope='sub_topic' AND reference_id=%s", (sub_topic_id,))
-                conn.commit()
+    except Exception as e:
+        if os.path.exists(new_file_path):
+            os.remove(new_file_path)
+        raise HTTPException(500, f"Error: {str(e)}")
 
-        df = pd.read_excel(new_file_path)
-        df = normalize_columns(df)
 
-        question_rows = []
+def replace_subtopic_questions(sub_topic_id, original_name, new_file_path):
+    """Swap the sub-topic question file: old questions are replaced in one transaction"""
+    with get_db() as conn:
+        with conn.cursor() as cursor:
 
-        with get_db() as conn:
-            with conn.cursor() as cursor:
+            cursor.execute("SELECT test_file FROM sub_topics WHERE sub_topic_id=%s", (sub_topic_id,))
+            data = cursor.fetchone()
+            if not data:
+                raise HTTPException(404, "Subtopic not found")
+            old_file_path = data["test_file"]
 
-                qt_cache = {}
-
-                for idx, row in df.iterrows():
-                    q_type = str(row.get("question_type")).strip().lower()
-
-                    if q_type not in qt_cache:
-                        cursor.execute("SELECT question_type_id FROM question_type WHERE question_type=%s", (q_type,))
-                        qt = cursor.fetchone()
-                        if not qt:
-                            raise HTTPException(400, f"Invalid question type: {q_type}")
-                        qt_cache[q_type] = qt["question_type_id"]
-
-                    qd = build_question_json(row, q_type)
-
-                    question_rows.append((
-                        "sub_topic",
-                        sub_topic_id,
-                        qt_cache[q_type],
-                        row.get("question_text"),
-                        json.dumps(qd),
-                        float(row.get("marks", 1)),
-                        int(row.get("order_no", idx + 1)),
-                    ))
-
-                cursor.executemany("""
-                    INSERT INTO questions
-                    (test_scope,reference_id,question_type_id,question_text,question_data,
-                     marks,order_no,created_at,updated_at)
-                    VALUES (%s,%s,%s,%s,%s,%s,%s,NOW(),NOW())
-                """, question_rows)
+            # Replace old questions with the new file's questions
+            cursor.execute("DELETE FROM questions WHERE test_scope='sub_topic' AND reference_id=%s", (sub_topic_id,))
+            stats = ingest_questions(
+                cursor, new_file_path, "sub_topic", sub_topic_id,
+                build_question_data=build_question_json,
+                progress=report_job_progress
+            )
 
-                cursor.execute("""
-                    UPDATE sub_topics
-                    SET file_name=%s, test_file=%s, updated_at=NOW()
-                    WHERE sub_topic_id=%s
-                """, (file.filename, new_file_path, sub_topic_id))
+            cursor.execute("""
+                UPDATE sub_topics
+                SET file_name=%s, test_file=%s, updated_at=NOW()
+                WHERE sub_topic_id=%s
+            """, (original_name, new_file_path, sub_topic_id))
 
-                conn.commit()
+            compile_question_bundle(cursor, "sub_topic", sub_topic_id)
+            result = {"message": "Subtopic updated", "questions": stats["rows_inserted"], "ingest": stats}
+            record_job_commit(cursor, result)
+            conn.commit()
+            bump_catalog_version()
 
-        return {"status": "success", "message": "Subtopic updated", "questions": len(question_rows)}
+    # Old file is only removed once the new questions are committed
+    if old_file_path and old_file_path != new_file_path and os.path.exists(old_file_path):
+        os.remove(old_file_path)
 
-    except Exception as e:
-        raise HTTPException(500, f"Error: {str(e)}")
+    return result
 
 
 
@@ -2,12 +2,17 @@ from datetime import datetime
 from typing import List
 from fastapi import APIRouter, Form, HTTPException
 from pydantic import BaseModel
-from config.database import get_db
+from config.database import get_db, db_route
+from config.responses import FastJSONRoute
+from services.catalog_cache import catalog_cache, bump_catalog_version
+from services.dashboard_cache import dashboard_cache
+from services.department_report import fetch_student_metrics
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 @router.get("/topic-subtopic")
-async def get_topic_subtopic(department_id : int):
+@db_route
+def get_topic_subtopic(department_id : int):
     """Fetch topics and their subtopics for a given department"""
     try:
         with get_db() as conn:
@@ -50,8 +55,7 @@ async def get_topic_subtopic(department_id : int):
 
 
 
-@router.get("/get-topic-with-subtopics")
-async def get_topic_with_subtopics():
+def load_topic_with_subtopics():
     """Fetch all topics with their subtopics and question counts (global topics)"""
     try:
         with get_db() as conn:
@@ -156,8 +160,14 @@ async def get_topic_with_subtopics():
 
 
 
-@router.get("/all-topics")
-async def get_all_topics():
+@router.get("/get-topic-with-subtopics")
+@db_route
+def get_topic_with_subtopics():
+    """Topics with subtopics and question counts, served from the catalog cache"""
+    return catalog_cache.get_or_load(("topic_with_subtopics",), load_topic_with_subtopics)
+
+
+def load_all_topics():
     """Fetch all active global topics (no department association)"""
     try:
         with get_db() as conn:
@@ -179,6 +189,13 @@ async def get_all_topics():
     
 
 
+@router.get("/all-topics")
+@db_route
+def get_all_topics():
+    """Active global topics, served from the catalog cache"""
+    return catalog_cache.get_or_load(("all_topics",), load_all_topics)
+
+
 class AssignTopicsRequest(BaseModel):
     college_id: int
     department_id: int
@@ -186,7 +203,8 @@ class AssignTopicsRequest(BaseModel):
 
 
 @router.post("/assign-topics")
-async def assign_topics_to_college_department(payload: AssignTopicsRequest):
+@db_route
+def assign_topics_to_college_department(payload: AssignTopicsRequest):
     """
     Assign topics to a college + department
     using topic_college_department mapping table
@@ -242,6 +260,7 @@ async def assign_topics_to_college_department(payload: AssignTopicsRequest):
                     assigned += 1
 
                 conn.commit()
+                bump_catalog_version()
 
                 return {
                     "status": "success",
@@ -413,8 +432,7 @@ async def assign_topics_to_college_department(payload: AssignTopicsRequest):
 # 
 #  
 
-@router.get("/{user_id}/subtopics")
-async def get_user_subtopics(user_id: int):
+def load_user_subtopics(user_id: int):
     """
     Fetch ALL topics + subtopics + progress for a student
     using NEW schema:
@@ -572,8 +590,16 @@ async def get_user_subtopics(user_id: int):
 
 
 
+@router.get("/{user_id}/subtopics")
+@db_route
+def get_user_subtopics(user_id: int):
+    """Student dashboard tree, served from the per-student snapshot cache"""
+    return dashboard_cache.get_or_load(user_id, lambda: load_user_subtopics(user_id))
+
+
 @router.get("/{user_id}/subtopics/{topic_id}")
-async def get_user_subtopics_by_topic(user_id: int, topic_id: int):
+@db_route
+def get_user_subtopics_by_topic(user_id: int, topic_id: int):
     """
     Fetch subtopics + progress for a specific topic for a user.
     NEW SCHEMA:
@@ -726,7 +752,8 @@ class TopicCreate(BaseModel):
     topic_name: str
 
 @router.post("/create-topic")
-async def create_topic(data: TopicCreate):
+@db_route
+def create_topic(data: TopicCreate):
     """Create a new topic (only topic_name)"""
     try:
         with get_db() as conn:
@@ -736,6 +763,7 @@ async def create_topic(data: TopicCreate):
                     VALUES (%s, TRUE, CURRENT_TIMESTAMP)
                 """, (data.topic_name,))
                 conn.commit()
+                bump_catalog_version()
                 return {
                     "status": "success",
                     "message": f"Topic '{data.topic_name}' created successfully."
@@ -748,7 +776,8 @@ async def create_topic(data: TopicCreate):
 
 
 @router.get("/overall-report/{college_id}/{department_id}")
-async def get_overall_report(college_id: int, department_id: int):
+@db_route
+def get_overall_report(college_id: int, department_id: int):
     """
     Fetch overall average marks across all topics for each STUDENT ONLY
     in a given college and department.
@@ -757,65 +786,24 @@ async def get_overall_report(college_id: int, department_id: int):
         with get_db() as conn:
             with conn.cursor() as cursor:
 
-                query = """
-                    SELECT 
-                        u.user_id,
-                        u.username AS student_name,
-                        u.full_name,
-                        u.last_login,
-                        
-                        -- Total obtained marks (subtopics + assignments)
-                        (
-                            COALESCE(SUM(stm.marks_obtained), 0) +
-                            COALESCE(SUM(am.marks_obtained), 0)
-                        ) AS total_obtained,
-
-                        -- Total maximum marks
-                        (
-                            COALESCE(SUM(stm.max_marks), 0) +
-                            COALESCE(SUM(am.max_marks), 0)
-                        ) AS total_max,
-
-                        -- Final percentage
-                        ROUND(
-                            (
-                                COALESCE(SUM(stm.marks_obtained), 0) +
-                                COALESCE(SUM(am.marks_obtained), 0)
-                            ) /
-                            NULLIF(
-                                (
-                                    COALESCE(SUM(stm.max_marks), 0) +
-                                    COALESCE(SUM(am.max_marks), 0)
-                                ), 0
-                            ) * 100, 
-                            2
-                        ) AS overall_percentage
-                    FROM users u
-                    LEFT JOIN sub_topic_marks stm 
-                        ON stm.student_id = u.user_id  
-                        AND stm.college_id = %s
-                        AND stm.department_id = %s
-                    LEFT JOIN assignment_marks am 
-                        ON am.student_id = u.user_id
-                    LEFT JOIN assignments a
-                        ON a.assignment_id = am.assignment_id
-                        AND a.college_id = %s
-                        AND a.department_id = %s
-                    WHERE u.college_id = %s 
-                      AND u.department_id = %s
-                      AND u.role_id = '5' 
-                      AND u.is_active = 1
-                    GROUP BY u.user_id, u.username, u.full_name, u.last_login
-                    ORDER BY u.username ASC;
-                """
-
-                cursor.execute(query, (
-                    college_id, department_id,
-                    college_id, department_id,
-                    college_id, department_id
-                ))
+                # Sub-topic marks recorded for this college / department plus
+                # all of the student's assignment marks (see services.department_report)
+                students = fetch_student_metrics(
+                    cursor, college_id=college_id, department_id=department_id, role_id=5
+                )
 
-                rows = cursor.fetchall()
+                rows = [
+                    {
+                        "user_id": row["user_id"],
+                        "student_name": row["student_name"],
+                        "full_name": row["full_name"],
+                        "last_login": row["last_login"],
+                        "total_obtained": row["overall_obtained"],
+                        "total_max": row["overall_max"],
+                        "overall_percentage": row["overall_percentage"]
+                    }
+                    for row in students
+                ]
 
                 return {"status": "success", "data": rows}
 
@@ -825,7 +813,8 @@ async def get_overall_report(college_id: int, department_id: int):
 
 
 @router.get("/topic-with-department")
-async def get_topics_with_department_detailed():
+@db_route
+def get_topics_with_department_detailed():
     """
     Fetch topics with detailed status information
     """
@@ -892,7 +881,8 @@ async def get_topics_with_department_detailed():
 
 
 @router.put("/update/{topic_id}")
-async def update_topic_assignment(
+@db_route
+def update_topic_assignment(
     topic_id: int,
     college_id: int = Form(...),
     department_id: int = Form(...),
@@ -950,6 +940,7 @@ async def update_topic_assignment(
             """, (new_topic_id, college_id, department_id, topic_id))
 
             conn.commit()
+            bump_catalog_version()
 
             return {"status": "success", "message": "Topic updated"}
 
@@ -964,7 +955,8 @@ async def update_topic_assignment(
     
     
 @router.delete("/delete/{topic_id}")
-async def delete_topic(topic_id: int):
+@db_route
+def delete_topic(topic_id: int):
     """Soft delete a topic by setting is_active = 0"""
     try:
         with get_db() as conn:
@@ -993,6 +985,7 @@ async def delete_topic(topic_id: int):
                 """, (topic_id,))
                 
                 conn.commit()
+                bump_catalog_version()
 
                 return {
                     "status": "success",
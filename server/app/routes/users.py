@@ -1,85 +1,60 @@
 
-import json
-from fastapi import APIRouter, HTTPException, Form, File, UploadFile
-from config.database import get_db
+from fastapi import APIRouter, HTTPException, Form, File, UploadFile, Header, Query
+from config.database import get_db, db_route, run_db
+from config.responses import FastJSONRoute
 from pydantic import BaseModel, Field, field_validator,EmailStr
 from typing import Optional, List
 import bcrypt
+from services.passwords import BCRYPT_MAX_PASSWORD_BYTES, hash_password, hash_passwords, password_too_long
+from services.question_bundles import get_question_bundle, bundle_response
+from services.department_report import fetch_student_metrics, format_clock
+from jobs.runner import JobAlreadyCommitted, enqueue_job, record_job_commit, report_job_progress
+from config.settings import JOB_FILES_DIR, LIST_MAX_LIMIT
+from services.pagination import fetch_all, fetch_page, estimated_total, prefix_pattern
 import pandas as pd
-from io import BytesIO
 from datetime import datetime
-from voice.voice_analyzer import VoiceAnalyzer
-import shutil
+from voice.analysis_service import voice_service, VoiceQueueFull
+import aiofiles
 import os
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
 import secrets
-import glob
-import time
 
 
-router = APIRouter()
-analyzer = VoiceAnalyzer()
-executor = ThreadPoolExecutor(max_workers=4)
+router = APIRouter(route_class=FastJSONRoute)
+
+# Clips up to this size are analyzed ahead of longer recordings
+VOICE_SHORT_CLIP_BYTES = 1024 * 1024
+VOICE_MAX_BYTES = 25 * 1024 * 1024  # recordings are tiny; this is a safety cap
 
 UPLOAD_DIR = "uploads/profile_images"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 
-async def cleanup_task():
-    while True:
-        try:
-            for file in glob.glob("temp_uploads/voice_*"):
-                if os.path.exists(file) and (time.time() - os.path.getctime(file) > 3600):  # 1 hour old
-                    try:
-                        os.remove(file)
-                        print(f"Cleaned up old file: {file}")
-                    except:
-                        pass
-            await asyncio.sleep(600)  # Every 10 minutes
-        except Exception as e:
-            print(f"Cleanup error: {e}")
-            await asyncio.sleep(600)
-
-
-@router.on_event("startup")
-async def start_cleanup():
-    asyncio.create_task(cleanup_task())
-    print("Auto cleanup task started (every 10 minutes)")
-
-
 @router.post("/analyze-voice")
 async def analyze_voice(file: UploadFile = File(...)):
-    temp_path = None
     try:
         # 1. Validate content type & extension
         allowed_types = {'audio/wav', 'audio/mpeg', 'audio/mp4', 'audio/ogg', 'audio/flac'}
         if file.content_type not in allowed_types:
             raise HTTPException(status_code=400, detail="Invalid audio format")
 
-        # 2. Generate secure random filename (prevents collision + attacks)
-        file_extension = ".wav"  # Force .wav — your frontend sends WAV
-        secure_filename = f"voice_{secrets.token_hex(12)}{file_extension}"
-        temp_path = os.path.join("temp_uploads", secure_filename)
-
-        # Ensure temp directory exists
-        os.makedirs("temp_uploads", exist_ok=True)
-
-        # 3. Save file safely
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        # 4. File size limit
-        file_size = os.path.getsize(temp_path)
-        if file_size > 25 * 1024 * 1024:  # 25MB max (your recordings are tiny)
+        # 2. Read into memory with a size limit (no temp files)
+        audio = await file.read(VOICE_MAX_BYTES + 1)
+        if len(audio) > VOICE_MAX_BYTES:
             raise HTTPException(status_code=413, detail="File too large (max 25MB)")
+        if not audio:
+            raise HTTPException(status_code=400, detail="Empty audio file")
 
-        # 5. Run analysis with TIMEOUT (CRITICAL!)
-        loop = asyncio.get_event_loop()
+        # 3. Queue for the analyzer pool (short clips jump ahead of long ones);
+        #    timeout covers queue wait + processing
+        priority = 0 if len(audio) <= VOICE_SHORT_CLIP_BYTES else 1
         try:
-            result = await asyncio.wait_for(
-                loop.run_in_executor(executor, analyzer.analyze_audio, temp_path),
-                timeout=15.0  # Max 15 seconds per audio
+            result, metrics = await voice_service.analyze(audio, priority=priority)
+        except VoiceQueueFull as e:
+            raise HTTPException(
+                status_code=503,
+                detail="Voice analysis is busy, please retry shortly",
+                headers={"Retry-After": str(e.retry_after)}
             )
         except asyncio.TimeoutError:
             raise HTTPException(status_code=408, detail="Audio processing timed out")
@@ -87,6 +62,7 @@ async def analyze_voice(file: UploadFile = File(...)):
         return {
             "status": "success",
             "data": result,
+            "metrics": metrics,
             "message": "Voice analyzed successfully"
         }
 
@@ -95,14 +71,6 @@ async def analyze_voice(file: UploadFile = File(...)):
     except Exception as e:
         print(f"Analyze voice error: {e}")
         raise HTTPException(status_code=500, detail="Voice analysis failed")
-    
-    finally:
-        # Always clean up — even on crash
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-            except:
-                pass  # Never crash on cleanup
 
 
 class UserCreate(BaseModel):
@@ -140,7 +108,8 @@ ROLE_MAP = {
 
 
 @router.post("/create")
-async def create_user(user_data: UserCreate):
+@db_route
+def create_user(user_data: UserCreate):
     """Create a single user based on role type"""
     conn = None
     try:
@@ -236,7 +205,7 @@ async def create_user(user_data: UserCreate):
 
 
 
-@router.post("/bulk")
+@router.post("/bulk", status_code=202)
 async def bulk_create_users(
     file: UploadFile = File(...), 
     role: str = Form(...),
@@ -249,11 +218,75 @@ async def bulk_create_users(
     if not college_name or not department_name:
         raise HTTPException(status_code=400, detail="College name and department name are required")
 
-    conn = None
+    # Keep a private copy of the sheet (it holds passwords) and queue the import
+    os.makedirs(JOB_FILES_DIR, exist_ok=True)
+    file_ext = os.path.splitext(file.filename or "")[1].lower() or ".xlsx"
+    file_path = os.path.join(JOB_FILES_DIR, f"users_{secrets.token_hex(16)}{file_ext}")
     try:
-        # Read Excel content
-        content = await file.read()
-        df = pd.read_excel(BytesIO(content))
+        async with aiofiles.open(file_path, "wb") as out:
+            while chunk := await file.read(1024 * 1024):
+                await out.write(chunk)
+
+        job_id = enqueue_job(
+            "users.bulk_create",
+            cleanup_paths=[file_path],
+            file_path=file_path,
+            role=role,
+            college_name=college_name,
+            department_name=department_name,
+        )
+    except Exception as e:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise HTTPException(status_code=500, detail=f"Error in bulk user creation: {str(e)}")
+
+    return {
+        "status": "queued",
+        "message": "Bulk user import accepted and queued for processing",
+        "job_id": job_id,
+        "job_url": f"/jobs/{job_id}"
+    }
+
+
+USERNAME_LOOKUP_BATCH_SIZE = 1000
+
+
+# Collation of users.username (migrations/0001_baseline.sql): case- and
+# accent-insensitive, NO PAD (trailing spaces count)
+USERNAME_COLLATION = "utf8mb4_0900_ai_ci"
+
+
+def lookup_usernames(cursor, usernames, batch_size: int = USERNAME_LOOKUP_BATCH_SIZE) -> list:
+    """
+    Resolve usernames against users.username, one query per batch.
+
+    Returns one (key, taken) pair per input, in input order. `key` is the
+    username's weight under the column collation, so two inputs with the
+    same key are the same username to MySQL; `taken` is whether a user
+    with that name already exists.
+    """
+    usernames = [str(u) for u in usernames]
+    results = []
+    for start in range(0, len(usernames), batch_size):
+        batch = usernames[start:start + batch_size]
+        batch_sql = " UNION ALL ".join(
+            [f"SELECT %s AS pos, %s COLLATE {USERNAME_COLLATION} AS username"] * len(batch)
+        )
+        cursor.execute(f"""
+            SELECT b.pos,
+                   HEX(WEIGHT_STRING(b.username)) AS username_key,
+                   EXISTS (SELECT 1 FROM users u WHERE u.username = b.username) AS taken
+            FROM ({batch_sql}) b
+            ORDER BY b.pos
+        """, [value for pos, username in enumerate(batch) for value in (pos, username)])
+        results.extend((r["username_key"], bool(r["taken"])) for r in cursor.fetchall())
+    return results
+
+
+def create_users_from_excel(file_path: str, role: str, college_name: str, department_name: str):
+    """Validate, hash and insert the students listed in an uploaded workbook (job handler)"""
+    try:
+        df = pd.read_excel(file_path)
 
         # Required columns
         required_cols = ['full_name', 'username', 'password']
@@ -264,7 +297,7 @@ async def bulk_create_users(
             )
 
         role_id = ROLE_MAP.get(role)
-        valid_rows = []
+        pending_rows = []
         errors = []
 
         insert_query = """
@@ -299,7 +332,8 @@ async def bulk_create_users(
 
                 dept_id = dept_res['department_id']
 
-                # Process each row
+                # 1️⃣ Per-row field validation
+                candidates = []
                 for idx, row in df.iterrows():
                     try:
                         # Skip fully empty rows
@@ -316,77 +350,102 @@ async def bulk_create_users(
                             missing_fields.append('password')
 
                         if missing_fields:
-                            errors.append(f"Row {idx+1}: Missing required fields - {', '.join(missing_fields)}")
+                            candidates.append((idx, None, f"Row {idx+1}: Missing required fields - {', '.join(missing_fields)}"))
                             continue
 
-                        # Username uniqueness check
-                        cursor.execute("SELECT user_id FROM users WHERE username = %s", (row['username'],))
-                        if cursor.fetchone():
-                            errors.append(f"Row {idx+1}: Duplicate username '{row['username']}'")
+                        # Hashing runs later over the whole batch, so reject what bcrypt would here
+                        if password_too_long(str(row['password'])):
+                            candidates.append((
+                                idx, None,
+                                f"Row {idx+1}: Password is longer than {BCRYPT_MAX_PASSWORD_BYTES} bytes"
+                            ))
                             continue
 
-                        # Hash password
-                        password_hash = bcrypt.hashpw(
-                            str(row['password']).encode('utf-8'),
-                            bcrypt.gensalt()
-                        ).decode('utf-8')
-
-                        valid_rows.append((
-                            row['username'],
-                            password_hash,
-                            row['full_name'],
-                            college_id,
-                            dept_id,
-                            role_id,
-                            datetime.now()
-                        ))
+                        candidates.append((idx, row, None))
 
                     except Exception as row_err:
-                        errors.append(f"Row {idx+1}: {str(row_err)}")
+                        candidates.append((idx, None, f"Row {idx+1}: {str(row_err)}"))
 
-                # Insert valid rows
-                if valid_rows:
-                    conn.begin()
-                    cursor.executemany(insert_query, valid_rows)
-                    conn.commit()
+                # 2️⃣ Username uniqueness against the DB, in batches
+                valid = [(idx, row) for idx, row, error in candidates if error is None]
+                lookups = dict(zip(
+                    (idx for idx, _ in valid),
+                    lookup_usernames(cursor, [row['username'] for _, row in valid])
+                ))
 
-                # SINGLE return section
-                if valid_rows:
-                    return {
-                        "status": "partial" if errors else "success",
-                        "message": f"Created {len(valid_rows)} students in {college_name} - {department_name}. {len(errors)} errors.",
-                        "created_count": len(valid_rows),
-                        "errors": errors,
-                        "data": {
-                            "college": college_name,
-                            "department": department_name,
-                            "processed_rows": len(valid_rows)
-                        }
-                    }
+                # 3️⃣ Collect results in file order (also catches duplicates within the file)
+                seen = {}
+                for idx, row, error in candidates:
+                    if error:
+                        errors.append(error)
+                        continue
+
+                    key, taken = lookups[idx]
+                    if taken:
+                        errors.append(f"Row {idx+1}: Duplicate username '{row['username']}'")
+                        continue
+                    if key in seen:
+                        errors.append(
+                            f"Row {idx+1}: Duplicate username '{row['username']}' (already used in row {seen[key]+1})"
+                        )
+                        continue
+                    seen[key] = idx
 
-                else:
-                    return {
-                        "status": "error",
-                        "message": "No valid students were created",
-                        "created_count": 0,
-                        "errors": errors,
-                        "data": None
-                    }
+                    pending_rows.append((row['username'], row['full_name'], str(row['password'])))
 
-    except HTTPException:
+        # Hash passwords in parallel without holding a DB connection
+        password_hashes = hash_passwords(
+            (password for _, _, password in pending_rows),
+            progress=report_job_progress
+        )
+
+        now = datetime.now()
+        valid_rows = [
+            (username, password_hash, full_name, college_id, dept_id, role_id, now)
+            for (username, full_name, _), password_hash in zip(pending_rows, password_hashes)
+        ]
+
+        # Insert valid rows
+        if valid_rows:
+            result = {
+                "status": "partial" if errors else "success",
+                "message": f"Created {len(valid_rows)} students in {college_name} - {department_name}. {len(errors)} errors.",
+                "created_count": len(valid_rows),
+                "errors": errors,
+                "data": {
+                    "college": college_name,
+                    "department": department_name,
+                    "processed_rows": len(valid_rows)
+                }
+            }
+            with get_db() as conn:
+                with conn.cursor() as cursor:
+                    conn.begin()
+                    cursor.executemany(insert_query, valid_rows)
+                    record_job_commit(cursor, result)
+                    conn.commit()
+            return result
+
+        else:
+            return {
+                "status": "error",
+                "message": "No valid students were created",
+                "created_count": 0,
+                "errors": errors,
+                "data": None
+            }
+
+    except (HTTPException, JobAlreadyCommitted):
         raise
     except Exception as e:
-        if conn:
-            try:
-                conn.rollback()
-            except:
-                pass
+        # Uncommitted work is rolled back when the connection returns to the pool
         raise HTTPException(status_code=500, detail=f"Error in bulk user creation: {str(e)}")
 
     
 
 @router.post("/login")
-async def login(username: str = Form(...), password: str = Form(...)):
+@db_route
+def login(username: str = Form(...), password: str = Form(...)):
     """
     Authenticate user and validate college / department
     based on role rules.
@@ -506,16 +565,9 @@ class CreateAdminUserRequest(BaseModel):
 
 
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(
-        password.encode("utf-8"),
-        bcrypt.gensalt()
-    ).decode("utf-8")
-
-
-
 @router.post("/create-admin")
-async def create_superadmin_or_admin(payload: CreateAdminUserRequest):
+@db_route
+def create_superadmin_or_admin(payload: CreateAdminUserRequest):
     """
     Create Super Admin or Admin user
     """
@@ -588,7 +640,8 @@ async def create_superadmin_or_admin(payload: CreateAdminUserRequest):
 
 
 @router.get("/{user_id}")
-async def get_user(user_id: int):
+@db_route
+def get_user(user_id: int):
     """Fetch user details by user_id (excluding deactivated users)"""
     try:
         with get_db() as conn:
@@ -674,7 +727,8 @@ async def get_user(user_id: int):
 
 
 @router.get("/colleges/{college_id}/departments/{department_id}/assignments")
-async def get_assignments_by_department(
+@db_route
+def get_assignments_by_department(
     college_id: int,
     department_id: int,
     student_id: int = None
@@ -812,7 +866,8 @@ async def get_assignments_by_department(
 
 
 @router.get("/{student_id}/topics-progress")
-async def get_student_topic_progress(student_id: int):
+@db_route
+def get_student_topic_progress(student_id: int):
     """
     Fetch topic-wise progress for a student
     using NEW schema (topic_college_department mapping).
@@ -903,7 +958,8 @@ async def get_student_topic_progress(student_id: int):
     
 
 @router.get("/colleges/{college_id}/departments/{department_id}/topics")
-async def get_topics_with_progress(college_id: int, department_id: int):
+@db_route
+def get_topics_with_progress(college_id: int, department_id: int):
     """
     Fetch all active topics for a given college + department,
     including average progress and average score.
@@ -995,7 +1051,8 @@ async def get_topics_with_progress(college_id: int, department_id: int):
 
 
 @router.get("/{topic_id}/subtopics")
-async def get_subtopics_by_topic(topic_id: int):
+@db_route
+def get_subtopics_by_topic(topic_id: int):
     """Fetch all active subtopics for a given topic"""
     try:
         with get_db() as conn:
@@ -1041,7 +1098,8 @@ async def get_subtopics_by_topic(topic_id: int):
     
 
 @router.get("/subtopic/{sub_topic_id}")
-async def get_subtopic_details(sub_topic_id: int):
+@db_route
+def get_subtopic_details(sub_topic_id: int):
     """Fetch details of a specific subtopic by its ID"""
     try:
         with get_db() as conn:
@@ -1081,46 +1139,12 @@ async def get_subtopic_details(sub_topic_id: int):
       
     
 @router.get("/subtopic/{sub_topic_id}/questions")
-async def get_questions_by_subtopic(sub_topic_id: int):
-    """Fetch all active questions for a given subtopic"""
+@db_route
+def get_questions_by_subtopic(sub_topic_id: int, if_none_match: Optional[str] = Header(None)):
+    """Fetch all active questions for a given subtopic (precompiled bundle, supports If-None-Match)"""
     try:
-        with get_db() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                    SELECT 
-                        q.question_id,
-                        q.question_text,
-                        q.question_data,
-                        q.marks,
-                        q.order_no,
-                        q.created_at,
-                        qt.question_type
-                    FROM questions q
-                    JOIN question_type qt ON q.question_type_id = qt.question_type_id
-                    WHERE q.test_scope = 'sub_topic' 
-                      AND q.reference_id = %s
-                    ORDER BY q.order_no
-                """, (sub_topic_id,))
-                
-                questions = cursor.fetchall()
-
-                # ✅ PARSE THE question_data JSON!
-                for question in questions:
-                    if question['question_data']:
-                        try:
-                            question['question_data'] = json.loads(question['question_data'])
-                        except json.JSONDecodeError:
-                            # If it's already an object or invalid, keep as is
-                            if isinstance(question['question_data'], dict):
-                                pass
-                            else:
-                                question['question_data'] = {}
-
-                return {
-                    "status": "success",
-                    "count": len(questions),
-                    "data": questions
-                }
+        bundle = get_question_bundle("sub_topic", sub_topic_id)
+        return bundle_response(bundle, "student", if_none_match)
 
     except Exception as e:
         raise HTTPException(
@@ -1130,113 +1154,153 @@ async def get_questions_by_subtopic(sub_topic_id: int):
     
     
     
-@router.get("/get/students")
-async def get_all_students():
-    """Fetch all ACTIVE students from ACTIVE colleges"""
-    try:
-        with get_db() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                    SELECT 
-                        u.user_id,
-                        u.username,
-                        u.full_name,
-                        c.name AS college_name,
-                        d.department_name,
-                        u.created_at
-                    FROM users u
-                    JOIN roles r ON u.role_id = r.role_id
-                    JOIN colleges c ON u.college_id = c.college_id
-                    LEFT JOIN departments d ON u.department_id = d.department_id
-                    WHERE r.name = 'student'
-                      AND u.is_active = 1
-                      AND c.is_active = 1  -- ADD THIS LINE
-                    ORDER BY u.created_at DESC
-                """)
-                students = cursor.fetchall()
-
+USER_LIST_SELECT = """
+    SELECT
+        u.user_id,
+        u.username,
+        u.full_name,
+        c.name AS college_name,
+        d.department_name,
+        u.created_at
+    FROM users u
+    JOIN roles r ON u.role_id = r.role_id
+    JOIN colleges c ON u.college_id = c.college_id
+    LEFT JOIN departments d ON u.department_id = d.department_id
+"""
+
+USER_LIST_COUNT = """
+    SELECT COUNT(*) AS total
+    FROM users u
+    JOIN roles r ON u.role_id = r.role_id
+    JOIN colleges c ON u.college_id = c.college_id
+"""
+
+
+def list_users(role_name, college_id=None, department_id=None, active=True, name_prefix=None,
+               cursor_token=None, limit=None, active_colleges_only=False):
+    """
+    One page of users with a role, newest first (keyset on user_id), plus
+    the estimated total for the same filters. Without a cursor or limit,
+    the whole list.
+    """
+    filters = ["r.name = %s"]
+    params = [role_name]
+    if active is not None:
+        filters.append("u.is_active = %s")
+        params.append(1 if active else 0)
+    if active_colleges_only:
+        filters.append("c.is_active = 1")
+    if college_id is not None:
+        filters.append("u.college_id = %s")
+        params.append(college_id)
+    if department_id is not None:
+        filters.append("u.department_id = %s")
+        params.append(department_id)
+    if name_prefix:
+        filters.append("(u.username LIKE %s OR u.full_name LIKE %s)")
+        params += [prefix_pattern(name_prefix)] * 2
+
+    with get_db() as conn:
+        with conn.cursor() as cursor:
+            if cursor_token is None and limit is None:
+                rows = fetch_all(cursor, USER_LIST_SELECT, filters, params, key_column="u.user_id")
                 return {
                     "status": "success",
-                    "count": len(students),
-                    "data": students
+                    "count": len(rows),
+                    "total": len(rows),
+                    "next_cursor": None,
+                    "data": rows
                 }
 
+            rows, next_cursor = fetch_page(
+                cursor, USER_LIST_SELECT, filters, params,
+                key_column="u.user_id", key_field="user_id",
+                page_cursor=cursor_token, limit=limit
+            )
+            total = estimated_total(cursor, f"users:{role_name}", USER_LIST_COUNT, filters, params)
+
+    return {
+        "status": "success",
+        "count": len(rows),
+        "total": total,
+        "next_cursor": next_cursor,
+        "data": rows
+    }
+
+
+@router.get("/get/students")
+@db_route
+def get_all_students(
+    college_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    active: bool = True,
+    name: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=LIST_MAX_LIMIT)
+):
+    """
+    Fetch students from ACTIVE colleges, newest first. Filters: college_id,
+    department_id, active, name (username / full name prefix). Paging is
+    opt-in: pass `limit` for pages of that size and `next_cursor` back as
+    `cursor` for the next one; without either, the whole list is returned.
+    """
+    try:
+        return list_users(
+            "student", college_id, department_id, active, name, cursor, limit,
+            active_colleges_only=True
+        )
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching students: {str(e)}")
     
 
 
 @router.get("/get/teachers")
-async def get_all_teachers():
-    """Fetch all users with the 'teacher' role"""
+@db_route
+def get_all_teachers(
+    college_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    active: bool = True,
+    name: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=LIST_MAX_LIMIT)
+):
+    """Fetch users with the 'teacher' role, newest first (same filters and opt-in paging as students)"""
     try:
-        with get_db() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                    SELECT 
-                        u.user_id,
-                        u.username,
-                        u.full_name,
-                        c.name AS college_name,
-                        d.department_name,
-                        u.created_at
-                    FROM users u
-                    JOIN roles r ON u.role_id = r.role_id
-                    JOIN colleges c ON u.college_id = c.college_id
-                    LEFT JOIN departments d ON u.department_id = d.department_id
-                    WHERE r.name = 'teacher'
-                        AND u.is_active = 1
-                    ORDER BY u.created_at DESC
-                """)
-                teachers = cursor.fetchall()
-
-                return {
-                    "status": "success",
-                    "count": len(teachers),
-                    "data": teachers
-                }
+        return list_users("teacher", college_id, department_id, active, name, cursor, limit)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching teachers: {str(e)}")    
     
 @router.get("/get/administrators")
-async def get_all_administrators():
-    """Fetch all users with the 'teacher' role"""
+@db_route
+def get_all_administrators(
+    college_id: Optional[int] = None,
+    department_id: Optional[int] = None,
+    active: bool = True,
+    name: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=LIST_MAX_LIMIT)
+):
+    """Fetch users with the 'administrator' role, newest first (same filters and opt-in paging as students)"""
     try:
-        with get_db() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                    SELECT 
-                        u.user_id,
-                        u.username,
-                        u.full_name,
-                        c.name AS college_name,
-                        d.department_name,
-                        u.created_at
-                    FROM users u
-                    JOIN roles r ON u.role_id = r.role_id
-                    JOIN colleges c ON u.college_id = c.college_id
-                    LEFT JOIN departments d ON u.department_id = d.department_id
-                    WHERE r.name = 'administrator'
-                        AND u.is_active = 1
-                    ORDER BY u.created_at DESC
-                """)
-                teachers = cursor.fetchall()
-
-                return {
-                    "status": "success",
-                    "count": len(teachers),
-                    "data": teachers
-                }
+        return list_users("administrator", college_id, department_id, active, name, cursor, limit)
 
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching teachers: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error fetching administrators: {str(e)}")
     
 
 
 
 @router.get("/topicwise/testmarks/{student_id}")
-async def get_topicwise_test_marks(student_id: int):
+@db_route
+def get_topicwise_test_marks(student_id: int):
     """Fetch topic-wise test marks for an ACTIVE student"""
     try:
         with get_db() as conn:
@@ -1287,7 +1351,8 @@ async def get_topicwise_test_marks(student_id: int):
 
 
 @router.get("/assignmentmarks/{student_id}")
-async def get_assignment_marks(student_id: int):
+@db_route
+def get_assignment_marks(student_id: int):
     """
     Fetch total assignment marks for an ACTIVE student
     """
@@ -1341,7 +1406,8 @@ async def get_assignment_marks(student_id: int):
 
 
 @router.get("/totalduration/{user_id}")
-async def get_total_duration(user_id: int):
+@db_route
+def get_total_duration(user_id: int):
     """
     Fetch total duration (in hours) spent by an ACTIVE student.
     """
@@ -1401,7 +1467,8 @@ async def get_total_duration(user_id: int):
 
 
 @router.get("/overallreport/{user_id}")
-async def get_overall_report(user_id: int):
+@db_route
+def get_overall_report(user_id: int):
     """
     Overall report for an ACTIVE student:
     - total subtopic marks
@@ -1413,63 +1480,16 @@ async def get_overall_report(user_id: int):
         with get_db() as conn:
             with conn.cursor() as cursor:
 
-                # Step 1 — validate active student
-                cursor.execute("""
-                    SELECT user_id, full_name 
-                    FROM users
-                    WHERE user_id = %s AND role_id = 5 AND is_active = 1
-                """, (user_id,))
-                
-                student = cursor.fetchone()
+                # Step 1 — aggregated report for the active student
+                rows = fetch_student_metrics(cursor, student_id=user_id, role_id=5)
 
-                if not student:
+                if not rows:
                     raise HTTPException(
                         status_code=404,
                         detail=f"Active student with ID {user_id} not found"
                     )
 
-                # Step 2 — fetch overall aggregated report
-                cursor.execute("""
-                    SELECT
-                        u.user_id,
-                        u.username AS student_name,
-                        u.full_name,
-                        DATE_FORMAT(u.last_login, '%%d/%%m/%%y - %%l:%%i %%p') AS last_login,
-                        DATE_FORMAT(u.last_logout, '%%d/%%m/%%y - %%l:%%i %%p') AS last_logout,
-
-                        COALESCE(st.total_subtopic_marks, 0) AS total_subtopic_marks,
-                        COALESCE(am.total_assignment_marks, 0) AS total_assignment_marks,
-                        COALESCE(us.total_hours, 0) AS total_hours
-
-                    FROM users u
-
-                    LEFT JOIN (
-                        SELECT student_id,
-                               SUM(marks_obtained) AS total_subtopic_marks
-                        FROM sub_topic_marks
-                        GROUP BY student_id
-                    ) st ON st.student_id = u.user_id
-
-                    LEFT JOIN (
-                        SELECT student_id,
-                               SUM(marks_obtained) AS total_assignment_marks
-                        FROM assignment_marks
-                        GROUP BY student_id
-                    ) am ON am.student_id = u.user_id
-
-                    LEFT JOIN (
-                        SELECT user_id,
-                               ROUND(SUM(duration_seconds) / 3600, 2) AS total_hours
-                        FROM user_sessions
-                        GROUP BY user_id
-                    ) us ON us.user_id = u.user_id
-
-                    WHERE u.user_id = %s
-                      AND u.role_id = 5
-                      AND u.is_active = 1;
-                """, (user_id,))
-
-                row = cursor.fetchone()
+                row = rows[0]
 
                 return {
                     "status": "success",
@@ -1477,10 +1497,10 @@ async def get_overall_report(user_id: int):
                         "user_id": row["user_id"],
                         "student_name": row["student_name"],
                         "full_name": row["full_name"],
-                        "last_login": row["last_login"] or "Never logged in",
-                        "last_logout": row["last_logout"] or "Still logged in",
-                        "total_subtopic_marks": row["total_subtopic_marks"],
-                        "total_assignment_marks": row["total_assignment_marks"],
+                        "last_login": format_clock(row["last_login"]) or "Never logged in",
+                        "last_logout": format_clock(row["last_logout"]) or "Still logged in",
+                        "total_subtopic_marks": row["subtopic_marks"],
+                        "total_assignment_marks": row["assignment_marks"],
                         "total_hours": row["total_hours"]
                     }
                 }
@@ -1506,6 +1526,18 @@ async def add_profile_image(user_id: int, file: UploadFile = File(...)):
         if file_ext not in allowed_extensions:
             raise HTTPException(status_code=400, detail="Invalid file type")
 
+        contents = await file.read()
+        return await run_db(save_profile_image, user_id, file_ext, contents)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def save_profile_image(user_id: int, file_ext: str, contents: bytes):
+    """Store the image on disk and point the user's profile at it"""
+    try:
         # 2. Validate user exists and is active
         with get_db() as conn:
             with conn.cursor() as cursor:
@@ -1531,7 +1563,7 @@ async def add_profile_image(user_id: int, file: UploadFile = File(...)):
 
         # 4. Save file to disk
         with open(file_path, "wb") as f:
-            f.write(await file.read())
+            f.write(contents)
 
         # 5. Update database with relative path
         with get_db() as conn:
@@ -1562,7 +1594,8 @@ async def add_profile_image(user_id: int, file: UploadFile = File(...)):
 
 
 @router.put("/logout/{user_id}")
-async def user_logout(user_id: int):
+@db_route
+def user_logout(user_id: int):
     """
     Update the user's last logout time when they log out.
     """
@@ -1598,7 +1631,8 @@ class ChangePasswordRequest(BaseModel):
     new_password: str
 
 @router.put("/{user_id}/change-password")
-async def change_user_password(
+@db_route
+def change_user_password(
     user_id: int,
     request: ChangePasswordRequest
 ):
@@ -0,0 +1,320 @@
+"""
+Read-through cache for the topic / sub-topic / college catalog.
+
+Catalog reads (topic trees, department topics, colleges with departments)
+are served from memory and tagged with the catalog version they were built
+at. Every catalog write bumps the version after it commits; readers whose
+entry carries an older version reload it.
+
+The version lives in a pluggable source so that API workers and job
+workers agree on it:
+
+    mysql  - one row in `cache_versions`, polled at most every
+             CATALOG_VERSION_POLL_SECONDS per process (default)
+    redis  - INCR / GET on a Redis key (pip install redis)
+    local  - an in-process counter; only correct with a single process
+             and no background job workers
+
+A process sees its own writes immediately; other processes see them
+within one poll interval.
+"""
+import threading
+import time
+from collections import OrderedDict
+from config.database import get_db
+from config.settings import (
+    CATALOG_CACHE_BACKEND,
+    CATALOG_CACHE_MAX_ENTRIES,
+    CATALOG_VERSION_POLL_SECONDS,
+    CATALOG_CACHE_REDIS_URL,
+)
+
+
+CATALOG_VERSION_KEY = "catalog"
+
+
+# ------------------------------------------
+# Version sources
+# ------------------------------------------
+class LocalVersionSource:
+    name = "local"
+
+    def __init__(self):
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def current(self):
+        return self._version
+
+    def bump(self):
+        with self._lock:
+            self._version += 1
+            return self._version
+
+
+class PolledVersionSource:
+    """
+    Shared version with a per-process poll interval: at most one remote
+    read per interval, whatever the request rate. `current()` returns None
+    when the remote store is unreachable, which makes callers bypass the
+    cache rather than serve data that may be stale.
+    """
+
+    name = "polled"
+
+    def __init__(self, poll_seconds=CATALOG_VERSION_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self._version = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+        self.polls = 0
+        self.errors = 0
+
+    def _read(self):
+        raise NotImplementedError
+
+    def _increment(self):
+        raise NotImplementedError
+
+    def _fresh(self):
+        # failed polls are throttled too, so an outage doesn't add a round trip per request
+        return self._checked_at is not None and time.monotonic() - self._checked_at < self.poll_seconds
+
+    def current(self):
+        if self._fresh():
+            return self._version
+        with self._lock:
+            if self._fresh():
+                return self._version
+            self.polls += 1
+            try:
+                self._version = self._read()
+            except Exception as e:
+                self.errors += 1
+                self._version = None
+                print(f"Catalog version poll failed ({self.name}): {e}")
+            self._checked_at = time.monotonic()
+            return self._version
+
+    def bump(self):
+        with self._lock:
+            try:
+                self._version = self._increment()
+            except Exception as e:
+                self.errors += 1
+                self._version = None
+                print(f"Catalog version bump failed ({self.name}): {e}")
+            self._checked_at = time.monotonic()
+            return self._version
+
+
+class MySQLVersionSource(PolledVersionSource):
+    name = "mysql"
+
+    def _read(self):
+        with get_db() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT version FROM cache_versions WHERE name = %s",
+                    (CATALOG_VERSION_KEY,)
+                )
+                row = cursor.fetchone()
+        return int(row["version"]) if row else 0
+
+    def _increment(self):
+        with get_db() as conn:
+            with conn.cursor() as cursor:
+                # LAST_INSERT_ID(expr) hands back the new value on this connection
+                cursor.execute("""
+                    INSERT INTO cache_versions (name, version) VALUES (%s, LAST_INSERT_ID(1))
+                    ON DUPLICATE KEY UPDATE version = LAST_INSERT_ID(version + 1)
+                """, (CATALOG_VERSION_KEY,))
+                cursor.execute("SELECT LAST_INSERT_ID() AS version")
+                version = int(cursor.fetchone()["version"])
+                conn.commit()
+        return version
+
+
+class RedisVersionSource(PolledVersionSource):
+    name = "redis"
+
+    def __init__(self, url=CATALOG_CACHE_REDIS_URL, **kwargs):
+        super().__init__(**kwargs)
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CATALOG_CACHE_BACKEND=redis needs the redis package (pip install redis)")
+        self._client = redis.Redis.from_url(url, socket_timeout=1)
+        self._key = f"lordmind:version:{CATALOG_VERSION_KEY}"
+
+    def _read(self):
+        return int(self._client.get(self._key) or 0)
+
+    def _increment(self):
+        return int(self._client.incr(self._key))
+
+
+VERSION_SOURCES = {
+    "local": LocalVersionSource,
+    "mysql": MySQLVersionSource,
+    "redis": RedisVersionSource,
+}
+
+
+def get_version_source(backend=None):
+    backend = (backend or CATALOG_CACHE_BACKEND).strip().lower()
+    try:
+        return VERSION_SOURCES[backend]()
+    except KeyError:
+        raise ValueError(f"Unknown CATALOG_CACHE_BACKEND {backend!r} (choose from {', '.join(VERSION_SOURCES)})")
+
+
+_shared_source = None
+_shared_source_lock = threading.Lock()
+
+
+def get_catalog_version_source():
+    """The process-wide catalog version, shared by every cache built on it"""
+    global _shared_source
+    if _shared_source is None:
+        with _shared_source_lock:
+            if _shared_source is None:
+                _shared_source = get_version_source()
+    return _shared_source
+
+
+# ------------------------------------------
+# Cache
+# ------------------------------------------
+class CatalogCache:
+    """
+    Version-tagged, size-bounded (LRU) cache of catalog payloads.
+
+    Caches without an explicit source share the catalog version, so one
+    bump invalidates all of them. Keys are tuples whose first element names
+    the reader, e.g. ("department_topics", 7); stats are grouped by that
+    name. Concurrent misses on the same key run the loader once.
+    """
+
+    def __init__(self, source=None, max_entries=CATALOG_CACHE_MAX_ENTRIES):
+        self._source = source
+        self.max_entries = max(1, max_entries)
+        self._entries = OrderedDict()  # key -> (version, value)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._stats = {}
+        self.bumps = 0
+
+    @property
+    def source(self):
+        if self._source is None:
+            with self._lock:
+                if self._source is None:
+                    self._source = get_catalog_version_source()
+        return self._source
+
+    def version(self):
+        return self.source.current()
+
+    def _record(self, name, field, amount=1):
+        stats = self._stats.setdefault(name, {"hits": 0, "misses": 0, "bypassed": 0, "load_seconds": 0.0})
+        stats[field] += amount
+
+    def _lookup(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self._record(key[0], "hits")
+                return True, entry[1]
+        return False, None
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for `key`, calling `loader()` on a miss"""
+        version = self.version()
+        if version is None:
+            # version unknown (store unreachable): serve straight from the DB
+            with self._lock:
+                self._record(key[0], "bypassed")
+            return loader()
+
+        found, value = self._lookup(key, version)
+        if found:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            # another thread may have loaded it while we waited
+            found, value = self._lookup(key, version)
+            if found:
+                return value
+
+            started = time.perf_counter()
+            value = loader()
+            elapsed = time.perf_counter() - started
+
+            with self._lock:
+                self._record(key[0], "misses")
+                self._record(key[0], "load_seconds", elapsed)
+                self._entries[key] = (version, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._key_locks.pop(evicted, None)
+            return value
+
+    def bump(self):
+        """Mark the catalog as changed (call after the write commits)"""
+        with self._lock:
+            self.bumps += 1
+        version = self.source.bump()
+        if version is None:
+            # could not publish the bump: at least drop this process's copies
+            with self._lock:
+                self._entries.clear()
+        return version
+
+    def stats(self):
+        with self._lock:
+            readers = {}
+            hits = misses = 0
+            saved = 0.0
+            for name, s in self._stats.items():
+                avg_load = s["load_seconds"] / s["misses"] if s["misses"] else 0.0
+                lookups = s["hits"] + s["misses"]
+                readers[name] = {
+                    "hits": s["hits"],
+                    "misses": s["misses"],
+                    "bypassed": s["bypassed"],
+                    "hit_ratio": round(s["hits"] / lookups, 4) if lookups else 0.0,
+                    "avg_load_ms": round(avg_load * 1000, 2),
+                    # DB time the hits would have cost at the average load time
+                    "db_ms_saved": round(s["hits"] * avg_load * 1000, 2),
+                }
+                hits += s["hits"]
+                misses += s["misses"]
+                saved += s["hits"] * avg_load
+            source = self._source
+            return {
+                "backend": source.name if source else CATALOG_CACHE_BACKEND,
+                "version": getattr(source, "_version", None),
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bumps": self.bumps,
+                "version_polls": getattr(source, "polls", 0),
+                "version_errors": getattr(source, "errors", 0),
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                "db_ms_saved": round(saved * 1000, 2),
+                "readers": readers,
+            }
+
+
+catalog_cache = CatalogCache()
+
+
+def bump_catalog_version():
+    """Invalidate cached catalog reads in every process"""
+    return catalog_cache.bump()
@@ -0,0 +1,321 @@
+"""
+Per-student snapshot cache for the dashboard tree (topics.get_user_subtopics).
+
+Each student's payload is kept in a size-bounded LRU and reused until one
+of these happens:
+  - the student submits marks (students.store_marks / store_assignment_marks)
+    or is deactivated -> `invalidate_student_dashboard(student_id)`
+  - the catalog changes -> the catalog version the entry was built at no
+    longer matches (see services.catalog_cache)
+
+Invalidations are published to an invalidation feed that every process
+polls at most every CATALOG_VERSION_POLL_SECONDS, so a student's
+snapshot is dropped in all API workers, not only the one that took the
+submission:
+
+    mysql  - rows in `cache_invalidations` (default)
+    redis  - a Redis stream (pip install redis)
+    local  - this process only
+"""
+import threading
+import time
+from collections import OrderedDict
+from config.database import get_db
+from config.settings import (
+    DASHBOARD_CACHE_BACKEND,
+    DASHBOARD_CACHE_MAX_ENTRIES,
+    CATALOG_VERSION_POLL_SECONDS,
+    CATALOG_CACHE_REDIS_URL,
+)
+from services.catalog_cache import catalog_cache
+
+
+DASHBOARD_CACHE_NAME = "dashboard"
+
+
+# ------------------------------------------
+# Invalidation feeds
+# ------------------------------------------
+class LocalInvalidationFeed:
+    name = "local"
+
+    def publish(self, key):
+        pass
+
+    def poll(self):
+        """Keys invalidated by other processes since the last poll ([] here)"""
+        return []
+
+
+class MySQLInvalidationFeed:
+    """
+    Append-only `cache_invalidations` log. AUTO_INCREMENT ids can become
+    visible out of order when inserts commit concurrently, so each poll
+    re-reads a small window below the highest id seen and skips ids it
+    already handled.
+    """
+
+    name = "mysql"
+    OVERLAP = 256
+    BATCH = 10000
+    RETENTION_SQL = "DELETE FROM cache_invalidations WHERE created_at < NOW() - INTERVAL 1 DAY LIMIT 5000"
+
+    def __init__(self, cache_name=DASHBOARD_CACHE_NAME):
+        self.cache_name = cache_name
+        self._max_id = None
+        self._seen = set()
+        self._published = 0
+
+    def publish(self, key):
+        with get_db() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "INSERT INTO cache_invalidations (cache_name, cache_key) VALUES (%s, %s)",
+                    (self.cache_name, str(key))
+                )
+                self._published += 1
+                if self._published % 500 == 0:
+                    cursor.execute(self.RETENTION_SQL)
+                conn.commit()
+
+    def poll(self):
+        with get_db() as conn:
+            with conn.cursor() as cursor:
+                if self._max_id is None:
+                    # new process: its cache is empty, start from the end of the log
+                    cursor.execute("SELECT COALESCE(MAX(id), 0) AS max_id FROM cache_invalidations")
+                    self._max_id = int(cursor.fetchone()["max_id"])
+                    return []
+
+                low = max(0, self._max_id - self.OVERLAP)
+                cursor.execute("""
+                    SELECT id, cache_key
+                    FROM cache_invalidations
+                    WHERE id > %s AND cache_name = %s
+                    ORDER BY id
+                    LIMIT %s
+                """, (low, self.cache_name, self.BATCH))
+                rows = cursor.fetchall()
+
+        if len(rows) >= self.BATCH:
+            # fell too far behind to replay precisely
+            self._max_id = int(rows[-1]["id"])
+            self._seen = set()
+            return None
+
+        keys = []
+        for row in rows:
+            if row["id"] in self._seen:
+                continue
+            self._seen.add(row["id"])
+            keys.append(row["cache_key"])
+            self._max_id = max(self._max_id, int(row["id"]))
+        low = self._max_id - self.OVERLAP
+        self._seen = {i for i in self._seen if i > low}
+        return keys
+
+
+class RedisInvalidationFeed:
+    name = "redis"
+    MAX_LEN = 100000
+
+    def __init__(self, url=CATALOG_CACHE_REDIS_URL, cache_name=DASHBOARD_CACHE_NAME):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("DASHBOARD_CACHE_BACKEND=redis needs the redis package (pip install redis)")
+        self._client = redis.Redis.from_url(url, socket_timeout=1, decode_responses=True)
+        self._stream = f"lordmind:invalidations:{cache_name}"
+        self._last_id = None
+
+    def publish(self, key):
+        self._client.xadd(self._stream, {"key": str(key)}, maxlen=self.MAX_LEN, approximate=True)
+
+    def poll(self):
+        if self._last_id is None:
+            latest = self._client.xrevrange(self._stream, count=1)
+            self._last_id = latest[0][0] if latest else "0-0"
+            return []
+        entries = self._client.xrange(self._stream, min=f"({self._last_id}", count=self.MAX_LEN)
+        if entries:
+            self._last_id = entries[-1][0]
+        return [fields["key"] for _, fields in entries]
+
+
+INVALIDATION_FEEDS = {
+    "local": LocalInvalidationFeed,
+    "mysql": MySQLInvalidationFeed,
+    "redis": RedisInvalidationFeed,
+}
+
+
+def get_invalidation_feed(backend=None):
+    backend = (backend or DASHBOARD_CACHE_BACKEND).strip().lower()
+    try:
+        return INVALIDATION_FEEDS[backend]()
+    except KeyError:
+        raise ValueError(f"Unknown DASHBOARD_CACHE_BACKEND {backend!r} (choose from {', '.join(INVALIDATION_FEEDS)})")
+
+
+# ------------------------------------------
+# Cache
+# ------------------------------------------
+class StudentSnapshotCache:
+    """
+    LRU of per-student payloads, at most `max_entries` students.
+
+    A load that overlaps an invalidation of the same student is returned
+    but not stored, so a submission can never be hidden by a snapshot
+    that was read just before it committed.
+    """
+
+    def __init__(self, feed=None, max_entries=DASHBOARD_CACHE_MAX_ENTRIES,
+                 poll_seconds=CATALOG_VERSION_POLL_SECONDS):
+        self._feed = feed
+        self.max_entries = max(1, max_entries)
+        self.poll_seconds = poll_seconds
+        self._entries = OrderedDict()  # student_id -> (catalog_version, value)
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+        self._polled_at = None
+        self._feed_healthy = True
+
+        # invalidation sequence, used to detect loads racing an invalidation
+        self._seq = 0
+        self._invalidated_at = OrderedDict()  # student_id -> seq
+        self._stale_before = 0  # set when the whole cache was dropped
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "stores_skipped": 0,
+            "evictions": 0,
+            "local_invalidations": 0,
+            "remote_invalidations": 0,
+            "feed_errors": 0,
+            "load_seconds": 0.0,
+        }
+
+    @property
+    def feed(self):
+        if self._feed is None:
+            with self._lock:
+                if self._feed is None:
+                    self._feed = get_invalidation_feed()
+        return self._feed
+
+    def _drop(self, student_id):
+        """Forget a student's snapshot (caller holds the lock)"""
+        self._seq += 1
+        self._entries.pop(student_id, None)
+        self._invalidated_at[student_id] = self._seq
+        self._invalidated_at.move_to_end(student_id)
+        while len(self._invalidated_at) > self.max_entries * 2:
+            self._invalidated_at.popitem(last=False)
+
+    def _sync(self):
+        """Apply other processes' invalidations; False while the feed is unreadable"""
+        now = time.monotonic()
+        if self._polled_at is not None and now - self._polled_at < self.poll_seconds:
+            return self._feed_healthy
+        with self._poll_lock:
+            if self._polled_at is not None and time.monotonic() - self._polled_at < self.poll_seconds:
+                return self._feed_healthy
+            try:
+                keys = self.feed.poll()
+            except Exception as e:
+                print(f"Dashboard invalidation poll failed ({self.feed.name}): {e}")
+                keys = None
+                with self._lock:
+                    self._stats["feed_errors"] += 1
+                self._feed_healthy = False
+            else:
+                self._feed_healthy = True
+
+            with self._lock:
+                if keys is None:
+                    # missed invalidations: nothing cached can be trusted
+                    self._seq += 1
+                    self._entries.clear()
+                    self._invalidated_at.clear()
+                    self._stale_before = self._seq
+                else:
+                    for key in keys:
+                        self._drop(int(key))
+                    self._stats["remote_invalidations"] += len(keys)
+            self._polled_at = time.monotonic()
+            return self._feed_healthy
+
+    def get_or_load(self, student_id, loader):
+        catalog_version = catalog_cache.version()
+        if catalog_version is None or not self._sync():
+            with self._lock:
+                self._stats["bypassed"] += 1
+            return loader()
+
+        with self._lock:
+            entry = self._entries.get(student_id)
+            if entry is not None and entry[0] == catalog_version:
+                self._entries.move_to_end(student_id)
+                self._stats["hits"] += 1
+                return entry[1]
+            started_seq = self._seq
+
+        started = time.perf_counter()
+        value = loader()
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self._stats["misses"] += 1
+            self._stats["load_seconds"] += elapsed
+            if (self._invalidated_at.get(student_id, 0) > started_seq
+                    or self._stale_before > started_seq):
+                self._stats["stores_skipped"] += 1
+                return value
+            self._entries[student_id] = (catalog_version, value)
+            self._entries.move_to_end(student_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        return value
+
+    def invalidate(self, student_id):
+        """Drop a student's snapshot here and publish it to the other processes"""
+        with self._lock:
+            self._drop(student_id)
+            self._stats["local_invalidations"] += 1
+        try:
+            self.feed.publish(student_id)
+        except Exception as e:
+            with self._lock:
+                self._stats["feed_errors"] += 1
+            print(f"Dashboard invalidation publish failed ({self.feed.name}): {e}")
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+            lookups = s["hits"] + s["misses"]
+            return {
+                "backend": self._feed.name if self._feed else DASHBOARD_CACHE_BACKEND,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": s["hits"],
+                "misses": s["misses"],
+                "bypassed": s["bypassed"],
+                "hit_ratio": round(s["hits"] / lookups, 4) if lookups else 0.0,
+                "stores_skipped": s["stores_skipped"],
+                "evictions": s["evictions"],
+                "local_invalidations": s["local_invalidations"],
+                "remote_invalidations": s["remote_invalidations"],
+                "feed_errors": s["feed_errors"],
+                "avg_load_ms": round(s["load_seconds"] * 1000 / s["misses"], 2) if s["misses"] else 0.0,
+            }
+
+
+dashboard_cache = StudentSnapshotCache()
+
+
+def invalidate_student_dashboard(student_id):
+    """Call after committing anything that changes a student's dashboard"""
+    dashboard_cache.invalidate(int(student_id))
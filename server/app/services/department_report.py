@@ -0,0 +1,171 @@
+"""
+Per-student report metrics for a department, in one query.
+
+`fetch_student_metrics` returns one row per selected student with every
+metric the overall-report endpoints use:
+
+    identity        user_id, student_name, full_name, department_name,
+                    last_login, last_logout
+    assignments     assignment_count / assignment_marks / assignment_max
+                      (all of the student's assignment_marks)
+                    department_assignment_count / _marks / _max
+                      (only active assignments of the student's own
+                      college and department)
+    sub-topics      subtopic_marks / subtopic_max (all sub_topic_marks)
+                    scoped_subtopic_marks / _max (rows recorded for the
+                      student's college and department)
+                    topic_average_percentage (active sub-topics of active
+                      topics assigned to the department, scored rows only)
+    combined        overall_obtained / overall_max / overall_percentage
+                      (scoped sub-topic marks + all assignment marks)
+    sessions        total_seconds, total_hours (rounded in SQL)
+
+Each source table is aggregated per student in its own CTE, restricted to
+the selected students, and only then joined to the student list, so one
+student's sub-topic rows never multiply their assignment rows (and vice
+versa). Sums are 0 when a student has no rows of that kind;
+topic_average_percentage is NULL when there is nothing to average.
+"""
+
+
+STUDENT_METRICS_SQL = """
+    WITH report_students AS (
+        SELECT u.user_id, u.college_id, u.department_id
+        FROM users u
+        WHERE {student_filter}
+    ),
+    assignment_totals AS (
+        SELECT
+            am.student_id,
+            COUNT(*) AS assignment_count,
+            SUM(am.marks_obtained) AS assignment_marks,
+            SUM(am.max_marks) AS assignment_max,
+            COUNT(a.assignment_id) AS department_assignment_count,
+            SUM(CASE WHEN a.assignment_id IS NOT NULL THEN am.marks_obtained END) AS department_assignment_marks,
+            SUM(CASE WHEN a.assignment_id IS NOT NULL THEN am.max_marks END) AS department_assignment_max
+        FROM report_students s
+        JOIN assignment_marks am
+            ON am.student_id = s.user_id
+        LEFT JOIN assignments a
+            ON a.assignment_id = am.assignment_id
+           AND a.department_id = s.department_id
+           AND a.college_id = s.college_id
+           AND a.is_active = 1
+        GROUP BY am.student_id
+    ),
+    subtopic_totals AS (
+        SELECT
+            stm.student_id,
+            SUM(stm.marks_obtained) AS subtopic_marks,
+            SUM(stm.max_marks) AS subtopic_max,
+            SUM(CASE WHEN stm.college_id = s.college_id AND stm.department_id = s.department_id
+                     THEN stm.marks_obtained END) AS scoped_subtopic_marks,
+            SUM(CASE WHEN stm.college_id = s.college_id AND stm.department_id = s.department_id
+                     THEN stm.max_marks END) AS scoped_subtopic_max,
+            ROUND(
+                SUM(CASE WHEN tcd.id IS NOT NULL AND stm.marks_obtained IS NOT NULL AND stm.max_marks > 0
+                         THEN stm.marks_obtained END) /
+                SUM(CASE WHEN tcd.id IS NOT NULL AND stm.marks_obtained IS NOT NULL AND stm.max_marks > 0
+                         THEN stm.max_marks END) * 100,
+                2
+            ) AS topic_average_percentage
+        FROM report_students s
+        JOIN sub_topic_marks stm
+            ON stm.student_id = s.user_id
+        LEFT JOIN sub_topics st
+            ON st.sub_topic_id = stm.sub_topic_id
+           AND st.is_active = 1
+        LEFT JOIN topics t
+            ON t.topic_id = st.topic_id
+           AND t.is_active = 1
+        LEFT JOIN topic_college_department tcd
+            ON tcd.topic_id = t.topic_id
+           AND tcd.college_id = s.college_id
+           AND tcd.department_id = s.department_id
+           AND tcd.is_active = 1
+        GROUP BY stm.student_id
+    ),
+    session_totals AS (
+        SELECT us.user_id, SUM(us.duration_seconds) AS total_seconds
+        FROM report_students s
+        JOIN user_sessions us
+            ON us.user_id = s.user_id
+        GROUP BY us.user_id
+    )
+    SELECT
+        u.user_id,
+        u.username AS student_name,
+        u.full_name,
+        u.last_login,
+        u.last_logout,
+        d.department_name,
+
+        COALESCE(atot.assignment_count, 0) AS assignment_count,
+        COALESCE(atot.assignment_marks, 0) AS assignment_marks,
+        COALESCE(atot.assignment_max, 0) AS assignment_max,
+        COALESCE(atot.department_assignment_count, 0) AS department_assignment_count,
+        COALESCE(atot.department_assignment_marks, 0) AS department_assignment_marks,
+        COALESCE(atot.department_assignment_max, 0) AS department_assignment_max,
+
+        COALESCE(stot.subtopic_marks, 0) AS subtopic_marks,
+        COALESCE(stot.subtopic_max, 0) AS subtopic_max,
+        COALESCE(stot.scoped_subtopic_marks, 0) AS scoped_subtopic_marks,
+        COALESCE(stot.scoped_subtopic_max, 0) AS scoped_subtopic_max,
+        stot.topic_average_percentage,
+
+        (COALESCE(stot.scoped_subtopic_marks, 0) + COALESCE(atot.assignment_marks, 0)) AS overall_obtained,
+        (COALESCE(stot.scoped_subtopic_max, 0) + COALESCE(atot.assignment_max, 0)) AS overall_max,
+        ROUND(
+            (COALESCE(stot.scoped_subtopic_marks, 0) + COALESCE(atot.assignment_marks, 0)) /
+            NULLIF(COALESCE(stot.scoped_subtopic_max, 0) + COALESCE(atot.assignment_max, 0), 0) * 100,
+            2
+        ) AS overall_percentage,
+
+        COALESCE(sess.total_seconds, 0) AS total_seconds,
+        ROUND(COALESCE(sess.total_seconds, 0) / 3600, 2) AS total_hours
+    FROM report_students s
+    JOIN users u ON u.user_id = s.user_id
+    LEFT JOIN departments d ON d.department_id = u.department_id
+    LEFT JOIN assignment_totals atot ON atot.student_id = s.user_id
+    LEFT JOIN subtopic_totals stot ON stot.student_id = s.user_id
+    LEFT JOIN session_totals sess ON sess.user_id = s.user_id
+    ORDER BY u.username ASC
+"""
+
+
+def student_metrics_query(college_id=None, department_id=None, student_id=None,
+                          role_id=None, active_only=True):
+    """(sql, params) selecting report metrics for the matching students"""
+    filters = []
+    params = []
+    for column, value in (
+        ("u.college_id", college_id),
+        ("u.department_id", department_id),
+        ("u.user_id", student_id),
+        ("u.role_id", role_id),
+    ):
+        if value is not None:
+            filters.append(f"{column} = %s")
+            params.append(value)
+    if active_only:
+        filters.append("u.is_active = 1")
+    if not filters:
+        raise ValueError("student metrics need at least one filter")
+
+    return STUDENT_METRICS_SQL.format(student_filter=" AND ".join(filters)), params
+
+
+def fetch_student_metrics(cursor, **filters):
+    """
+    Report metrics for the students matching the filters (college_id,
+    department_id, student_id, role_id, active_only), ordered by username.
+    """
+    cursor.execute(*student_metrics_query(**filters))
+    return cursor.fetchall()
+
+
+def format_clock(value):
+    """datetime -> '21/12/25 - 4:13 PM' (MySQL '%d/%m/%y - %l:%i %p'); None stays None"""
+    if value is None:
+        return None
+    return f"{value:%d/%m/%y} - {value.hour % 12 or 12}:{value:%M} {'AM' if value.hour < 12 else 'PM'}"
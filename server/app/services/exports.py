@@ -0,0 +1,126 @@
+"""
+CSV / XLSX report exports that never hold the whole result in memory.
+
+Rows come from a generator (normally config.database.stream_rows) and go
+straight into the writer:
+
+    csv   - encoded in batches and streamed to the client as they are read
+    xlsx  - openpyxl write-only workbook: rows are spooled to a temporary
+            file as they arrive and the finished file is then sent from
+            disk (the zip container can only be written once complete)
+"""
+import csv
+import io
+import os
+import re
+import tempfile
+from datetime import date, datetime
+import openpyxl
+from fastapi.responses import StreamingResponse, FileResponse
+from starlette.background import BackgroundTask
+from config.database import run_db
+
+
+EXPORT_FORMATS = ("csv", "xlsx")
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Rows encoded per chunk of a CSV stream
+CSV_BATCH_ROWS = 500
+
+# Characters XML 1.0 (and so xlsx) cannot store
+_ILLEGAL_XLSX_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_INVALID_SHEET_TITLE_CHARS = re.compile(r"[\\/*?:\[\]]")
+
+
+def export_filename(name, export_format):
+    """Safe attachment name: 'overall-report-cse.csv'"""
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", name).strip("-").lower() or "export"
+    return f"{slug}.{export_format}"
+
+
+def content_disposition(filename):
+    return f'attachment; filename="{filename}"'
+
+
+def iter_csv(columns, rows):
+    """
+    Encode rows (dicts) as CSV bytes in small batches. `columns` is a list
+    of (key, header) pairs.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    # BOM so Excel opens the UTF-8 names correctly
+    buffer.write("\ufeff")
+    writer.writerow([header for _, header in columns])
+
+    pending = 0
+    for row in rows:
+        writer.writerow([row.get(key) for key, _ in columns])
+        pending += 1
+        if pending >= CSV_BATCH_ROWS:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    yield buffer.getvalue().encode("utf-8")
+
+
+def _xlsx_value(value):
+    if value is None or isinstance(value, (int, float, datetime, date)):
+        return value
+    if isinstance(value, str):
+        return _ILLEGAL_XLSX_CHARS.sub("", value)
+    # Decimal and friends
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def write_xlsx(columns, rows, sheet_title="Report"):
+    """
+    Write rows into a write-only workbook saved to a temporary file and
+    return its path; the caller deletes it once sent.
+    """
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=_INVALID_SHEET_TITLE_CHARS.sub(" ", sheet_title)[:31] or "Report")
+    sheet.append([header for _, header in columns])
+    for row in rows:
+        sheet.append([_xlsx_value(row.get(key)) for key, _ in columns])
+
+    fd, path = tempfile.mkstemp(prefix="export-", suffix=".xlsx")
+    os.close(fd)
+    try:
+        workbook.save(path)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+async def export_response(columns, rows, name, export_format):
+    """
+    Response for an export: CSV streamed as rows are read, XLSX built on
+    the DB executor into a temporary file that is removed once sent.
+    """
+    filename = export_filename(name, export_format)
+    if export_format == "csv":
+        return StreamingResponse(
+            iter_csv(columns, rows),
+            media_type=MEDIA_TYPES["csv"],
+            headers={"Content-Disposition": content_disposition(filename)}
+        )
+
+    path = await run_db(write_xlsx, columns, rows, name)
+    return FileResponse(
+        path,
+        media_type=MEDIA_TYPES["xlsx"],
+        filename=filename,
+        background=BackgroundTask(os.remove, path)
+    )
@@ -0,0 +1,163 @@
+"""
+Daily learning-hours rollup.
+
+`learning_hours_daily` keeps one row per (scope, scope_id, day) with the
+number of finished sessions and their total seconds:
+
+    global      scope_id = 0
+    college     scope_id = users.college_id
+    department  scope_id = users.department_id
+
+A session counts towards the day it ended on (DATE(end_time)), the same
+as the old GROUP BY over user_sessions. `record_session_end` folds one
+closed session into the rollup inside the transaction that closes it;
+`rebuild_learning_hours` recomputes a date range from user_sessions
+(backfill / repair, see commands.backfill_learning_hours).
+"""
+from datetime import timedelta
+
+
+# scope -> users column holding its id (global has a single row per day)
+SCOPE_COLUMNS = {
+    "global": None,
+    "college": "u.college_id",
+    "department": "u.department_id",
+}
+GRANULARITIES = ("day", "week", "month")
+
+# First day of the bucket a rollup day falls in (weeks start on Monday)
+BUCKET_SQL = {
+    "day": "day",
+    "week": "DATE_SUB(day, INTERVAL WEEKDAY(day) DAY)",
+    "month": "DATE_FORMAT(day, '%%Y-%%m-01')",
+}
+
+
+def _scope_rows(user, day, sessions, seconds):
+    rows = [("global", 0, day, sessions, seconds)]
+    if user.get("college_id") is not None:
+        rows.append(("college", user["college_id"], day, sessions, seconds))
+    if user.get("department_id") is not None:
+        rows.append(("department", user["department_id"], day, sessions, seconds))
+    return rows
+
+
+def record_session_end(cursor, session_id):
+    """
+    Add a just-closed session to its day's totals. Call in the same
+    transaction as the UPDATE that set end_time, after it.
+    """
+    cursor.execute("""
+        SELECT us.end_time, us.duration_seconds, u.college_id, u.department_id
+        FROM user_sessions us
+        JOIN users u ON u.user_id = us.user_id
+        WHERE us.id = %s AND us.end_time IS NOT NULL
+    """, (session_id,))
+    session = cursor.fetchone()
+    if not session:
+        return
+
+    rows = _scope_rows(session, session["end_time"].date(), 1, int(session["duration_seconds"] or 0))
+    placeholders = ", ".join(["(%s, %s, %s, %s, %s)"] * len(rows))
+    cursor.execute(f"""
+        INSERT INTO learning_hours_daily (scope, scope_id, day, sessions, total_seconds)
+        VALUES {placeholders}
+        ON DUPLICATE KEY UPDATE
+            sessions = sessions + VALUES(sessions),
+            total_seconds = total_seconds + VALUES(total_seconds)
+    """, [value for row in rows for value in row])
+
+
+def rebuild_learning_hours(conn, start=None, end=None, chunk_days=31):
+    """
+    Recompute the rollup for end_time days in [start, end] from user_sessions,
+    one transaction per chunk of days. Defaults to the whole session history.
+    Returns per-run counts.
+    """
+    with conn.cursor() as cursor:
+        if start is None or end is None:
+            cursor.execute("""
+                SELECT DATE(MIN(end_time)) AS first_day, DATE(MAX(end_time)) AS last_day
+                FROM user_sessions
+                WHERE end_time IS NOT NULL
+            """)
+            bounds = cursor.fetchone()
+            start = start or bounds["first_day"]
+            end = end or bounds["last_day"]
+
+    report = {"start": start, "end": end, "chunks": 0, "days": 0, "sessions": 0, "rows_written": 0}
+    if start is None or end is None:
+        return report
+
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(end, chunk_start + timedelta(days=chunk_days - 1))
+        window = (chunk_start, chunk_end + timedelta(days=1))
+
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM learning_hours_daily WHERE day >= %s AND day < %s",
+                window
+            )
+            for scope, scope_column in SCOPE_COLUMNS.items():
+                if scope_column:
+                    scope_filter = f"AND {scope_column} IS NOT NULL"
+                    group_by = f"{scope_column}, DATE(us.end_time)"
+                else:
+                    scope_column, scope_filter, group_by = "0", "", "DATE(us.end_time)"
+                cursor.execute(f"""
+                    INSERT INTO learning_hours_daily (scope, scope_id, day, sessions, total_seconds)
+                    SELECT %s, {scope_column}, DATE(us.end_time), COUNT(*), COALESCE(SUM(us.duration_seconds), 0)
+                    FROM user_sessions us
+                    JOIN users u ON u.user_id = us.user_id
+                    WHERE us.end_time >= %s AND us.end_time < %s {scope_filter}
+                    GROUP BY {group_by}
+                """, (scope, *window))
+                report["rows_written"] += cursor.rowcount
+
+            cursor.execute("""
+                SELECT COUNT(*) AS days, COALESCE(SUM(sessions), 0) AS sessions
+                FROM learning_hours_daily
+                WHERE scope = 'global' AND day >= %s AND day < %s
+            """, window)
+            totals = cursor.fetchone()
+            report["days"] += int(totals["days"])
+            report["sessions"] += int(totals["sessions"])
+        conn.commit()
+
+        report["chunks"] += 1
+        chunk_start = chunk_end + timedelta(days=1)
+
+    return report
+
+
+def fetch_learning_hours(cursor, scope="global", scope_id=0, start=None, end=None, granularity="day"):
+    """Total hours per day / week / month for one scope, oldest bucket first"""
+    bucket = BUCKET_SQL[granularity]
+    filters = ["scope = %s", "scope_id = %s"]
+    params = [scope, scope_id]
+    if start is not None:
+        filters.append("day >= %s")
+        params.append(start)
+    if end is not None:
+        filters.append("day <= %s")
+        params.append(end)
+
+    cursor.execute(f"""
+        SELECT
+            {bucket} AS bucket,
+            SUM(sessions) AS sessions,
+            ROUND(SUM(total_seconds) / 3600, 2) AS total_hours
+        FROM learning_hours_daily
+        WHERE {" AND ".join(filters)}
+        GROUP BY bucket
+        ORDER BY bucket ASC
+    """, params)
+    return [
+        {
+            "date": str(row["bucket"]),
+            "sessions": int(row["sessions"]),
+            "total_hours": float(row["total_hours"]),
+        }
+        for row in cursor.fetchall()
+    ]
@@ -0,0 +1,216 @@
+"""
+Versioned schema migrations.
+
+The schema lives in server/migrations as numbered SQL files
+(`0001_baseline.sql`, `0002_...sql`), applied in order and recorded in
+`schema_migrations` with a checksum of the file:
+
+    pending     on disk, not yet applied
+    applied     applied, file unchanged since
+    changed     applied, but the file was edited afterwards (refused:
+                write a new migration instead)
+    missing     recorded as applied but the file is gone
+
+MySQL commits DDL implicitly, so a migration is not atomic: a failure
+leaves the statements before it applied and the version unrecorded. Keep
+one schema change per statement so a failed run can be finished by hand
+(or the statement fixed) and re-run.
+
+Runs hold the MySQL named lock `schema_migrations`, so two deploys
+starting at once apply each migration only once.
+"""
+import hashlib
+import re
+import time
+from pathlib import Path
+
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+MIGRATION_FILE = re.compile(r"^(\d{4})_(\w+)\.sql$")
+LOCK_NAME = "schema_migrations"
+LOCK_TIMEOUT_SECONDS = 60
+
+
+class MigrationError(Exception):
+    """Raised when the migration history and the files disagree or a statement fails"""
+
+
+def discover_migrations(directory=MIGRATIONS_DIR):
+    """[{version, name, path, checksum}] for every migration file, oldest first"""
+    migrations = {}
+    for path in sorted(Path(directory).glob("*.sql")):
+        match = MIGRATION_FILE.match(path.name)
+        if not match:
+            raise MigrationError(f"Unexpected file in migrations: {path.name}")
+        version = int(match.group(1))
+        if version in migrations:
+            raise MigrationError(f"Duplicate migration version {version:04d}: {path.name}")
+        migrations[version] = {
+            "version": version,
+            "name": match.group(2),
+            "path": path,
+            "checksum": hashlib.sha256(path.read_bytes()).hexdigest(),
+        }
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def split_statements(sql):
+    """
+    Split a migration file into statements on `;`, ignoring semicolons
+    inside quotes, backticks and comments. Comments are dropped.
+    """
+    statements = []
+    current = []
+    i = 0
+    length = len(sql)
+    while i < length:
+        char = sql[i]
+        if char in ("'", '"', "`"):
+            end = i + 1
+            while end < length:
+                if sql[end] == "\\" and char != "`":
+                    end += 2
+                    continue
+                if sql[end] == char:
+                    # doubled quote is an escaped quote
+                    if end + 1 < length and sql[end + 1] == char:
+                        end += 2
+                        continue
+                    break
+                end += 1
+            current.append(sql[i:end + 1])
+            i = end + 1
+        elif sql.startswith("--", i) or char == "#":
+            newline = sql.find("\n", i)
+            i = length if newline == -1 else newline
+        elif sql.startswith("/*", i):
+            close = sql.find("*/", i + 2)
+            i = length if close == -1 else close + 2
+        elif char == ";":
+            statement = "".join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+            i += 1
+        else:
+            current.append(char)
+            i += 1
+
+    statement = "".join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+def ensure_history_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+          version int NOT NULL,
+          name varchar(255) NOT NULL,
+          checksum char(64) NOT NULL,
+          applied_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          execution_ms int NOT NULL DEFAULT '0',
+          PRIMARY KEY (version)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci
+    """)
+
+
+def _applied(cursor):
+    cursor.execute("SELECT version, name, checksum, applied_at FROM schema_migrations ORDER BY version")
+    return {row["version"]: row for row in cursor.fetchall()}
+
+
+def migration_status(conn, directory=MIGRATIONS_DIR):
+    """One entry per known version with its state (see module docstring)"""
+    with conn.cursor() as cursor:
+        ensure_history_table(cursor)
+        applied = _applied(cursor)
+    conn.commit()
+
+    status = []
+    for migration in discover_migrations(directory):
+        row = applied.pop(migration["version"], None)
+        if row is None:
+            state = "pending"
+        elif row["checksum"] != migration["checksum"]:
+            state = "changed"
+        else:
+            state = "applied"
+        status.append({
+            "version": migration["version"],
+            "name": migration["name"],
+            "state": state,
+            "applied_at": row["applied_at"] if row else None,
+        })
+
+    for version, row in applied.items():
+        status.append({
+            "version": version,
+            "name": row["name"],
+            "state": "missing",
+            "applied_at": row["applied_at"],
+        })
+    return sorted(status, key=lambda entry: entry["version"])
+
+
+def apply_migrations(conn, target=None, fake=False, directory=MIGRATIONS_DIR):
+    """
+    Apply pending migrations up to `target` (inclusive; default: all).
+    With fake=True they are only recorded as applied, for databases whose
+    schema was already brought up to date by hand. Returns what was done.
+    """
+    report = {"applied": [], "faked": [], "pending_after": 0}
+
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT GET_LOCK(%s, %s) AS acquired", (LOCK_NAME, LOCK_TIMEOUT_SECONDS))
+        if not cursor.fetchone()["acquired"]:
+            raise MigrationError("Another migration run holds the schema_migrations lock")
+
+        try:
+            ensure_history_table(cursor)
+            applied = _applied(cursor)
+            migrations = discover_migrations(directory)
+
+            changed = [
+                f"{m['version']:04d}_{m['name']}" for m in migrations
+                if m["version"] in applied and applied[m["version"]]["checksum"] != m["checksum"]
+            ]
+            if changed:
+                raise MigrationError(f"Applied migrations were edited afterwards: {', '.join(changed)}")
+
+            pending = [m for m in migrations if m["version"] not in applied]
+            if target is not None:
+                later = [m for m in pending if m["version"] > target]
+                pending = [m for m in pending if m["version"] <= target]
+                report["pending_after"] = len(later)
+
+            for migration in pending:
+                label = f"{migration['version']:04d}_{migration['name']}"
+                started = time.perf_counter()
+                if not fake:
+                    statements = split_statements(migration["path"].read_text(encoding="utf-8"))
+                    for number, statement in enumerate(statements, start=1):
+                        try:
+                            cursor.execute(statement)
+                        except Exception as e:
+                            conn.rollback()
+                            raise MigrationError(
+                                f"{label}: statement {number} of {len(statements)} failed: {e}"
+                            ) from e
+
+                cursor.execute("""
+                    INSERT INTO schema_migrations (version, name, checksum, execution_ms)
+                    VALUES (%s, %s, %s, %s)
+                """, (
+                    migration["version"],
+                    migration["name"],
+                    migration["checksum"],
+                    int((time.perf_counter() - started) * 1000),
+                ))
+                conn.commit()
+                report["faked" if fake else "applied"].append(label)
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+            cursor.fetchall()
+
+    return report
@@ -0,0 +1,140 @@
+"""
+Keyset (cursor) pagination for the listing endpoints.
+
+Pages are ordered on the table's primary key and continue from the last
+key of the previous page (`WHERE id < last` / `id > last`), so every page
+is one index range scan of at most `limit + 1` rows no matter how deep
+the client pages, and rows inserted meanwhile never shift a page.
+
+Paging is opt-in while clients still expect whole lists: a request with
+neither `limit` nor `cursor` gets every row (`fetch_all`, same order)
+and `next_cursor` None.
+
+`next_cursor` is an opaque token for the following page (None on the
+last page). Totals come from `estimated_total`: an exact COUNT(*) per
+filter set, reused for LIST_COUNT_CACHE_SECONDS, so paging through a
+large list doesn't count it again on every request.
+"""
+import base64
+import threading
+import time
+from collections import OrderedDict
+from fastapi import HTTPException
+from config.settings import LIST_DEFAULT_LIMIT, LIST_MAX_LIMIT, LIST_COUNT_CACHE_SECONDS
+
+
+COUNT_CACHE_MAX_ENTRIES = 1024
+
+
+def clamp_limit(limit):
+    if limit is None:
+        return LIST_DEFAULT_LIMIT
+    return max(1, min(int(limit), LIST_MAX_LIMIT))
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(f"k:{key}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Key a page continues from (None for the first page); 400 if malformed"""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        prefix, key = raw.split(":", 1)
+        if prefix != "k":
+            raise ValueError(raw)
+        return int(key)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def prefix_pattern(prefix):
+    """LIKE pattern matching values that start with `prefix` (wildcards escaped)"""
+    escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+
+def fetch_page(cursor, select_sql, filters, params, key_column, key_field,
+               page_cursor=None, limit=None, descending=True):
+    """
+    Run `select_sql` (a SELECT ... FROM ... without WHERE / ORDER BY) for
+    one page. Returns (rows, next_cursor).
+    """
+    limit = clamp_limit(limit)
+    after = decode_cursor(page_cursor)
+    filters = list(filters)
+    params = list(params)
+    if after is not None:
+        filters.append(f"{key_column} {'<' if descending else '>'} %s")
+        params.append(after)
+
+    where = f"WHERE {' AND '.join(filters)}" if filters else ""
+    cursor.execute(f"""
+        {select_sql}
+        {where}
+        ORDER BY {key_column} {'DESC' if descending else 'ASC'}
+        LIMIT %s
+    """, params + [limit + 1])
+    rows = cursor.fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][key_field])
+    return rows, next_cursor
+
+
+def fetch_all(cursor, select_sql, filters, params, key_column, descending=True):
+    """Every row of `select_sql` in page order, for callers that don't page"""
+    where = f"WHERE {' AND '.join(filters)}" if filters else ""
+    cursor.execute(f"""
+        {select_sql}
+        {where}
+        ORDER BY {key_column} {'DESC' if descending else 'ASC'}
+    """, list(params))
+    return cursor.fetchall()
+
+
+class CountCache:
+    """Recent COUNT(*) results per (list, filters), bounded LRU with a TTL"""
+
+    def __init__(self, ttl_seconds=LIST_COUNT_CACHE_SECONDS, max_entries=COUNT_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+count_cache = CountCache()
+
+
+def estimated_total(cursor, list_name, count_sql, filters, params):
+    """
+    Row count for a filtered list, at most LIST_COUNT_CACHE_SECONDS old.
+    `count_sql` is a SELECT COUNT(*) AS total FROM ... without WHERE.
+    """
+    key = (list_name, tuple(filters), tuple(params))
+    total = count_cache.get(key)
+    if total is None:
+        where = f"WHERE {' AND '.join(filters)}" if filters else ""
+        cursor.execute(f"{count_sql} {where}", list(params))
+        total = int(cursor.fetchone()["total"])
+        count_cache.put(key, total)
+    return total
@@ -0,0 +1,82 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import bcrypt
+from config.settings import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS
+
+
+# bcrypt only reads this many bytes of a password and bcrypt>=5 rejects longer ones
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def get_hash_executor():
+    """
+    Process-wide pool for bulk hashing. bcrypt releases the GIL while it
+    works, so threads scale with cores without pickling passwords across
+    processes.
+    """
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _executor_lock:
+            if _executor is None or _executor_pid != pid:
+                _executor = ThreadPoolExecutor(
+                    max_workers=PASSWORD_HASH_WORKERS,
+                    thread_name_prefix="bcrypt"
+                )
+                _executor_pid = pid
+    return _executor
+
+
+def password_too_long(password: str) -> bool:
+    return len(password.encode("utf-8")) > BCRYPT_MAX_PASSWORD_BYTES
+
+
+def hash_password(password: str, rounds: int = None) -> str:
+    return bcrypt.hashpw(
+        password.encode("utf-8"),
+        bcrypt.gensalt(rounds or BCRYPT_ROUNDS)
+    ).decode("utf-8")
+
+
+def _hash_chunk(passwords, rounds):
+    return [hash_password(p, rounds) for p in passwords]
+
+
+def hash_passwords(passwords, rounds=None, progress=None, chunk_size=None):
+    """
+    Hash many passwords in parallel, preserving input order.
+
+    `progress(done, total)` is called from the calling thread each time a
+    chunk finishes.
+    """
+    passwords = list(passwords)
+    total = len(passwords)
+    if not total:
+        return []
+
+    rounds = rounds or BCRYPT_ROUNDS
+    if chunk_size is None:
+        # a few chunks per worker keeps every core busy and progress granular
+        chunk_size = max(1, min(100, total // (PASSWORD_HASH_WORKERS * 4) or 1))
+
+    executor = get_hash_executor()
+    futures = {
+        executor.submit(_hash_chunk, passwords[start:start + chunk_size], rounds): start
+        for start in range(0, total, chunk_size)
+    }
+
+    hashes = [None] * total
+    done = 0
+    for future in as_completed(futures):
+        start = futures[future]
+        chunk = future.result()
+        hashes[start:start + len(chunk)] = chunk
+        done += len(chunk)
+        if progress:
+            progress(done, total)
+    return hashes
@@ -0,0 +1,156 @@
+"""
+EXPLAIN checks for the hot queries.
+
+HOT_QUERIES holds the statements the routers run on nearly every request,
+with representative parameters, and the aliases that must be read through
+an index. `check_query_plans` EXPLAINs each one and reports a failure when
+such a table is read with a full table scan (type ALL) or a full index
+scan (type index); the other tables of a query (lookup tables joined on
+their primary key, derived tables) are listed but not judged.
+
+Run it against a database with realistic row counts: on a near-empty
+table the optimizer may legitimately prefer a scan.
+"""
+
+
+HOT_QUERIES = [
+    {
+        "name": "test_completed",
+        "source": "students.py (retake / completion checks)",
+        "sql": """
+            SELECT attempt_id, obtained_marks
+            FROM student_test_attempts
+            WHERE student_id = %s
+              AND test_scope = 'sub_topic'
+              AND reference_id = %s
+              AND is_completed = TRUE
+            LIMIT 1
+        """,
+        "params": (1, 1),
+        "indexed": ("student_test_attempts",),
+    },
+    {
+        "name": "latest_completed_attempt",
+        "source": "students.py (attempt details)",
+        "sql": """
+            SELECT attempt_id, is_completed, obtained_marks, total_marks,
+                   started_at, completed_at, attempt_number
+            FROM student_test_attempts
+            WHERE student_id = %s
+              AND test_scope = %s
+              AND reference_id = %s
+              AND is_completed = TRUE
+            ORDER BY attempt_number DESC
+            LIMIT 1
+        """,
+        "params": (1, "assignment", 1),
+        "indexed": ("student_test_attempts",),
+    },
+    {
+        "name": "question_set",
+        "source": "services/question_bundles.py, students.py",
+        "sql": """
+            SELECT * FROM questions
+            WHERE test_scope = %s AND reference_id = %s
+            ORDER BY order_no
+        """,
+        "params": ("sub_topic", 1),
+        "indexed": ("questions",),
+    },
+    {
+        "name": "student_topic_marks",
+        "source": "users.py (topic breakdown)",
+        "sql": """
+            SELECT t.topic_id, t.topic_name,
+                   SUM(stm.marks_obtained) AS total_marks_obtained,
+                   SUM(stm.max_marks) AS total_marks_possible
+            FROM sub_topic_marks stm
+            JOIN sub_topics st ON stm.sub_topic_id = st.sub_topic_id
+            JOIN topics t ON st.topic_id = t.topic_id
+            WHERE stm.student_id = %s
+            GROUP BY t.topic_id, t.topic_name
+        """,
+        "params": (1,),
+        "indexed": ("stm",),
+    },
+    {
+        "name": "student_topic_marks_by_topic",
+        "source": "sub_topic_marks per (student, topic)",
+        "sql": """
+            SELECT SUM(marks_obtained) AS obtained, SUM(max_marks) AS possible
+            FROM sub_topic_marks
+            WHERE student_id = %s AND topic_id = %s
+        """,
+        "params": (1, 1),
+        "indexed": ("sub_topic_marks",),
+    },
+    {
+        "name": "user_learning_time",
+        "source": "users.py (learning hours), services/department_report.py",
+        "sql": """
+            SELECT ROUND(SUM(us.duration_seconds) / 3600, 2) AS total_hours
+            FROM user_sessions us
+            WHERE us.user_id = %s AND us.end_time IS NOT NULL
+        """,
+        "params": (1,),
+        "indexed": ("us",),
+    },
+    {
+        "name": "department_topics",
+        "source": "topics.py (topics of a college department)",
+        "sql": """
+            SELECT t.topic_id, t.topic_number, t.topic_name
+            FROM topic_college_department tcd
+            JOIN topics t ON t.topic_id = tcd.topic_id
+            WHERE tcd.college_id = %s
+              AND tcd.department_id = %s
+              AND tcd.is_active = 1
+              AND t.is_active = 1
+            ORDER BY CAST(t.topic_number AS UNSIGNED), t.topic_name
+        """,
+        "params": (1, 1),
+        "indexed": ("tcd",),
+    },
+]
+
+SCAN_TYPES = ("ALL", "index")
+
+
+def explain(cursor, sql, params=()):
+    cursor.execute(f"EXPLAIN {sql}", params)
+    return cursor.fetchall()
+
+
+def check_query_plans(cursor, queries=HOT_QUERIES):
+    """
+    EXPLAIN every query; returns {"queries": [...], "full_scans": n}.
+    Each query lists its plan rows (table, type, key, rows, Extra) and
+    whether one of its indexed tables is scanned.
+    """
+    results = []
+    full_scans = 0
+    for query in queries:
+        plan = []
+        scanned = []
+        for row in explain(cursor, query["sql"], query["params"]):
+            entry = {
+                "table": row.get("table"),
+                "type": row.get("type"),
+                "key": row.get("key"),
+                "rows": row.get("rows"),
+                "extra": row.get("Extra"),
+            }
+            plan.append(entry)
+            if entry["table"] in query["indexed"] and entry["type"] in SCAN_TYPES:
+                scanned.append(entry["table"])
+
+        full_scans += len(scanned)
+        results.append({
+            "name": query["name"],
+            "source": query["source"],
+            "ok": not scanned,
+            "full_scans": scanned,
+            "plan": plan,
+        })
+
+    return {"queries": results, "full_scans": full_scans}
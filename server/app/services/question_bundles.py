@@ -0,0 +1,177 @@
+"""
+Precompiled question bundles.
+
+A test's questions are compiled once, when they are uploaded, into the
+exact JSON bodies the question endpoints return, and stored in
+`question_bundles` together with a content-hash ETag:
+
+    full     - list of question rows (assignments / questions endpoints)
+    student  - {"status", "count", "data"} sub-topic view (users endpoint)
+
+Readers keep bundles in memory (tagged with the catalog version; question
+uploads bump it), so when a whole class starts a test each process does a
+single DB read and every other request is served from pre-encoded bytes,
+or answered with 304 when the client already holds the current ETag.
+"""
+import hashlib
+import json
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from config.database import get_db
+from config.settings import QUESTION_BUNDLE_CACHE_ENTRIES
+from services.catalog_cache import CatalogCache
+
+
+BUNDLE_VIEWS = ("full", "student")
+
+# Columns of the sub-topic (student) view, in response order
+STUDENT_FIELDS = ("question_id", "question_text", "question_data", "marks", "order_no", "created_at")
+
+bundle_cache = CatalogCache(max_entries=QUESTION_BUNDLE_CACHE_ENTRIES)
+
+
+def _parse_question_data(value):
+    if not value or isinstance(value, dict):
+        return value
+    try:
+        return json.loads(value)
+    except (TypeError, ValueError):
+        return {}
+
+
+def _encode(payload):
+    # same encoding FastAPI's JSONResponse would produce for the payload
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _etag(body):
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def build_bundle(cursor, test_scope, reference_id):
+    """Encode every view of a question set from the current rows"""
+    cursor.execute("SELECT question_type_id, question_type FROM question_type")
+    type_names = {row["question_type_id"]: row["question_type"] for row in cursor.fetchall()}
+
+    cursor.execute("""
+        SELECT * FROM questions
+        WHERE test_scope = %s AND reference_id = %s
+        ORDER BY order_no
+    """, (test_scope, reference_id))
+    rows = cursor.fetchall()
+
+    for row in rows:
+        row["question_data"] = _parse_question_data(row["question_data"])
+
+    student = [
+        {**{field: row[field] for field in STUDENT_FIELDS}, "question_type": type_names[row["question_type_id"]]}
+        for row in rows
+        if row["question_type_id"] in type_names
+    ]
+
+    bodies = {
+        "full": _encode(rows),
+        "student": _encode({"status": "success", "count": len(student), "data": student}),
+    }
+    return {
+        "question_count": len(rows),
+        "bodies": bodies,
+        "etags": {view: _etag(body) for view, body in bodies.items()},
+    }
+
+
+def compile_question_bundle(cursor, test_scope, reference_id):
+    """
+    (Re)compile and store the bundle for a question set. Call inside the
+    transaction that changed the questions, before commit, then bump the
+    catalog version after commit.
+    """
+    bundle = build_bundle(cursor, test_scope, reference_id)
+    cursor.execute("""
+        INSERT INTO question_bundles
+        (test_scope, reference_id, version, question_count,
+         full_etag, full_body, student_etag, student_body, compiled_at)
+        VALUES (%s, %s, 1, %s, %s, %s, %s, %s, NOW())
+        ON DUPLICATE KEY UPDATE
+            version = version + 1,
+            question_count = VALUES(question_count),
+            full_etag = VALUES(full_etag),
+            full_body = VALUES(full_body),
+            student_etag = VALUES(student_etag),
+            student_body = VALUES(student_body),
+            compiled_at = NOW()
+    """, (
+        test_scope, reference_id, bundle["question_count"],
+        bundle["etags"]["full"], bundle["bodies"]["full"],
+        bundle["etags"]["student"], bundle["bodies"]["student"],
+    ))
+    return bundle
+
+
+def drop_question_bundle(cursor, test_scope, reference_id):
+    cursor.execute(
+        "DELETE FROM question_bundles WHERE test_scope = %s AND reference_id = %s",
+        (test_scope, reference_id)
+    )
+
+
+def _load_bundle(test_scope, reference_id):
+    with get_db() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT question_count, full_etag, full_body, student_etag, student_body
+                FROM question_bundles
+                WHERE test_scope = %s AND reference_id = %s
+            """, (test_scope, reference_id))
+            row = cursor.fetchone()
+            if row:
+                return {
+                    "question_count": row["question_count"],
+                    "bodies": {view: bytes(row[f"{view}_body"]) for view in BUNDLE_VIEWS},
+                    "etags": {view: row[f"{view}_etag"] for view in BUNDLE_VIEWS},
+                }
+
+            # Uploaded before bundles existed: compile now. Empty sets are
+            # not stored so probing unknown ids doesn't fill the table.
+            bundle = build_bundle(cursor, test_scope, reference_id)
+            if bundle["question_count"]:
+                compile_question_bundle(cursor, test_scope, reference_id)
+                conn.commit()
+            return bundle
+
+
+def get_question_bundle(test_scope, reference_id):
+    """The current bundle for a question set (memory first, then one DB read)"""
+    return bundle_cache.get_or_load(
+        ("question_bundle", test_scope, reference_id),
+        lambda: _load_bundle(test_scope, reference_id)
+    )
+
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def bundle_response(bundle, view, if_none_match=None):
+    """Pre-encoded bundle body, or 304 when the client's ETag is current"""
+    etag = bundle["etags"][view]
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=bundle["bodies"][view], media_type="application/json", headers=headers)
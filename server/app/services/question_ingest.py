@@ -0,0 +1,165 @@
+import json
+import math
+import os
+import time
+import openpyxl
+import pandas as pd
+from config.settings import QUESTION_INGEST_CHUNK_SIZE
+
+
+# Only %s placeholders so pymysql's executemany folds each chunk into one
+# multi-row INSERT (created_at / updated_at use the column defaults)
+QUESTION_INSERT_SQL = """
+    INSERT INTO questions
+    (test_scope, reference_id, question_type_id, question_text, question_data, marks, order_no)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+class QuestionIngestError(ValueError):
+    """Raised when a workbook cannot be turned into questions"""
+
+
+def _is_blank(value):
+    if value is None:
+        return True
+    if isinstance(value, float) and math.isnan(value):
+        return True
+    return isinstance(value, str) and not value.strip()
+
+
+def _number(value, default, cast):
+    if _is_blank(value):
+        return default
+    try:
+        return cast(float(value))
+    except (TypeError, ValueError):
+        raise QuestionIngestError(f"Invalid number: {value!r}")
+
+
+def iter_excel_rows(file_path):
+    """
+    Yield each data row of the first sheet as a dict keyed by the
+    lowercased, stripped header.
+
+    .xlsx files are streamed with openpyxl's read-only reader, so memory
+    stays flat however many rows the sheet has. Legacy .xls files have no
+    streaming reader and go through pandas (they cap at 65k rows anyway).
+    """
+    if os.path.splitext(file_path)[1].lower() == ".xls":
+        df = pd.read_excel(file_path)
+        headers = [str(c).strip().lower() for c in df.columns]
+        for values in df.itertuples(index=False, name=None):
+            yield dict(zip(headers, values))
+        return
+
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if not header:
+            return
+        headers = [str(c).strip().lower() if c is not None else "" for c in header]
+        for values in rows:
+            if values is None or all(v is None for v in values):
+                continue
+            yield dict(zip(headers, values))
+    finally:
+        wb.close()
+
+
+def load_question_types(cursor):
+    """question_type name -> question_type_id (the table holds a handful of rows)"""
+    cursor.execute("SELECT question_type_id, question_type FROM question_type")
+    return {row["question_type"]: row["question_type_id"] for row in cursor.fetchall()}
+
+
+def extra_columns_data(row, q_type):
+    """Default question_data: every non-empty column except type and text"""
+    return {
+        k: v for k, v in row.items()
+        if k and k not in ("question_type", "question_text") and not _is_blank(v)
+    }
+
+
+def ingest_questions(cursor, file_path, test_scope, reference_id,
+                     build_question_data=extra_columns_data, chunk_size=None, progress=None):
+    """
+    Stream questions from an Excel file into `questions`.
+
+    Rows are read one at a time, converted with `build_question_data(row, q_type)`
+    and inserted in fixed-size executemany chunks, so at most `chunk_size`
+    prepared rows are held in memory. Rows without question text are skipped.
+    The caller owns the transaction (commit / rollback). `progress(rows_inserted)`
+    is called after every chunk.
+
+    Returns ingestion stats including rows/sec.
+    """
+    chunk_size = chunk_size or QUESTION_INGEST_CHUNK_SIZE
+    started = time.perf_counter()
+
+    question_types = load_question_types(cursor)
+    chunk = []
+    inserted = 0
+    skipped = 0
+    chunks = 0
+    seen_header = False
+
+    for position, row in enumerate(iter_excel_rows(file_path)):
+        if not seen_header:
+            if "question_type" not in row or "question_text" not in row:
+                raise QuestionIngestError("Excel must contain 'question_type' and 'question_text'")
+            seen_header = True
+
+        question_text = row.get("question_text")
+        if _is_blank(question_text):
+            skipped += 1
+            continue
+
+        q_type = str(row.get("question_type")).strip().lower()
+        question_type_id = question_types.get(q_type)
+        if question_type_id is None:
+            raise QuestionIngestError(f"Invalid question type: {q_type}")
+
+        try:
+            question_data = build_question_data(row, q_type)
+        except ValueError as e:
+            raise QuestionIngestError(f"Row {position + 2}: {e}")
+
+        chunk.append((
+            test_scope,
+            reference_id,
+            question_type_id,
+            question_text,
+            json.dumps(question_data, default=str),
+            _number(row.get("marks"), 1.0, float),
+            _number(row.get("order_no"), position + 1, int),
+        ))
+
+        if len(chunk) >= chunk_size:
+            cursor.executemany(QUESTION_INSERT_SQL, chunk)
+            inserted += len(chunk)
+            chunks += 1
+            chunk.clear()
+            if progress:
+                progress(inserted)
+
+    if chunk:
+        cursor.executemany(QUESTION_INSERT_SQL, chunk)
+        inserted += len(chunk)
+        chunks += 1
+        if progress:
+            progress(inserted)
+
+    if not inserted:
+        raise QuestionIngestError("No valid questions found")
+
+    elapsed = time.perf_counter() - started
+    return {
+        "rows_inserted": inserted,
+        "rows_skipped": skipped,
+        "chunks": chunks,
+        "chunk_size": chunk_size,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(inserted / elapsed, 1) if elapsed > 0 else None,
+    }
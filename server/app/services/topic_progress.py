@@ -0,0 +1,300 @@
+"""
+Incremental maintenance of student_topic_progress.
+
+Each (student, topic) row keeps running counters next to the derived
+columns:
+  - completed_sub_topics: distinct sub-topics the student has marks for
+  - marks_count / percent_sum: number of scored submissions and the sum of
+    their percentages, so average_score = percent_sum / marks_count
+
+A new submission bumps the counters in a single upsert instead of
+re-aggregating the student's whole sub_topic_marks history.
+`reconcile_topic_progress` rebuilds the same numbers from sub_topic_marks
+and reports (optionally fixes) any drift.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+
+TWO_PLACES = Decimal("0.01")
+SIX_PLACES = Decimal("0.000001")
+
+# Same thresholds as the status mapping in students.store_marks
+STATUS_SQL = """
+    CASE
+        WHEN progress_percent = 0 THEN 'Not Started'
+        WHEN progress_percent < 50 THEN 'Learning Now'
+        WHEN progress_percent < 100 THEN 'Ongoing'
+        ELSE 'Completed'
+    END
+"""
+
+
+def progress_status(progress_percent):
+    """Map a progress percentage to the student_topic_progress status"""
+    if progress_percent == 0:
+        return 'Not Started'
+    elif progress_percent < 50:
+        return 'Learning Now'
+    elif progress_percent < 100:
+        return 'Ongoing'
+    return 'Completed'
+
+
+def mark_percentage(marks_obtained, max_marks):
+    """Percentage of one submission, at the precision stored in percent_sum"""
+    value = Decimal(str(marks_obtained)) / Decimal(str(max_marks)) * 100
+    return value.quantize(SIX_PLACES, rounding=ROUND_HALF_UP)
+
+
+def compute_progress(completed_sub_topics, total_sub_topics, marks_count, percent_sum):
+    """Derived columns for a set of counters (used by reconciliation)"""
+    progress_percent = (
+        Decimal(completed_sub_topics) * 100 / Decimal(total_sub_topics)
+        if total_sub_topics else Decimal(0)
+    ).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+    average_score = (
+        Decimal(percent_sum) / Decimal(marks_count)
+        if marks_count else Decimal(0)
+    ).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+    return {
+        "completed_sub_topics": int(completed_sub_topics),
+        "total_sub_topics": int(total_sub_topics),
+        "marks_count": int(marks_count),
+        "percent_sum": Decimal(percent_sum).quantize(SIX_PLACES, rounding=ROUND_HALF_UP),
+        "progress_percent": progress_percent,
+        "average_score": average_score,
+        "status": progress_status(progress_percent),
+    }
+
+
+def apply_sub_topic_mark(cursor, student_id, topic_id, sub_topic_id, marks_obtained, max_marks):
+    """
+    Fold one new sub_topic_marks row into the student's topic progress.
+
+    Must run in the same transaction as the sub_topic_marks INSERT, *before*
+    that insert, so the "first mark for this sub-topic" check is accurate.
+    Returns the updated progress row.
+    """
+    # Does this sub-topic already count as completed? (single indexed probe)
+    cursor.execute("""
+        SELECT 1 FROM sub_topic_marks
+        WHERE student_id = %s AND sub_topic_id = %s
+        LIMIT 1
+    """, (student_id, sub_topic_id))
+    new_sub_topic = 0 if cursor.fetchone() else 1
+
+    # Active sub-topics in the topic (bounded by the catalog, not by history)
+    cursor.execute("""
+        SELECT COUNT(*) AS total_sub_topics
+        FROM sub_topics
+        WHERE topic_id = %s AND is_active = TRUE
+    """, (topic_id,))
+    total_sub_topics = int(cursor.fetchone().get("total_sub_topics") or 0)
+
+    percentage = mark_percentage(marks_obtained, max_marks)
+    first = compute_progress(new_sub_topic, total_sub_topics, 1, percentage)
+
+    # MySQL applies ON DUPLICATE assignments left to right, so the derived
+    # columns below see the freshly incremented counters.
+    cursor.execute(f"""
+        INSERT INTO student_topic_progress
+        (student_id, topic_id, completed_sub_topics, total_sub_topics, marks_count, percent_sum,
+         progress_percent, average_score, status, last_updated)
+        VALUES (%s, %s, %s, %s, 1, %s, %s, %s, %s, NOW())
+        ON DUPLICATE KEY UPDATE
+            completed_sub_topics = completed_sub_topics + %s,
+            marks_count = marks_count + 1,
+            percent_sum = percent_sum + %s,
+            total_sub_topics = VALUES(total_sub_topics),
+            progress_percent = IF(total_sub_topics > 0,
+                                  ROUND(completed_sub_topics * 100 / total_sub_topics, 2), 0),
+            average_score = ROUND(percent_sum / marks_count, 2),
+            status = {STATUS_SQL},
+            last_updated = NOW()
+    """, (
+        student_id,
+        topic_id,
+        new_sub_topic,
+        total_sub_topics,
+        percentage,
+        first["progress_percent"],
+        first["average_score"],
+        first["status"],
+        new_sub_topic,
+        percentage,
+    ))
+
+    cursor.execute("""
+        SELECT completed_sub_topics, total_sub_topics, progress_percent, average_score, status
+        FROM student_topic_progress
+        WHERE student_id = %s AND topic_id = %s
+    """, (student_id, topic_id))
+    return cursor.fetchone()
+
+
+# ------------------------------------------
+# Reconciliation
+# ------------------------------------------
+COMPARED_FIELDS = [
+    "completed_sub_topics", "total_sub_topics", "marks_count",
+    "percent_sum", "progress_percent", "average_score", "status",
+]
+
+
+def _differs(field, stored, expected):
+    if field in ("percent_sum", "progress_percent", "average_score"):
+        return abs(Decimal(str(stored or 0)) - expected) > TWO_PLACES / 2
+    return stored != expected
+
+
+def _expected_for_topic(cursor, topic_id, student_id=None):
+    cursor.execute("""
+        SELECT COUNT(*) AS total_sub_topics
+        FROM sub_topics
+        WHERE topic_id = %s AND is_active = TRUE
+    """, (topic_id,))
+    total_sub_topics = int(cursor.fetchone().get("total_sub_topics") or 0)
+
+    params = [topic_id]
+    student_filter = ""
+    if student_id is not None:
+        student_filter = "AND student_id = %s"
+        params.append(student_id)
+
+    cursor.execute(f"""
+        SELECT
+            student_id,
+            COUNT(DISTINCT sub_topic_id) AS completed_sub_topics,
+            COUNT(marks_obtained / NULLIF(max_marks, 0)) AS marks_count,
+            COALESCE(SUM((marks_obtained / NULLIF(max_marks, 0)) * 100), 0) AS percent_sum
+        FROM sub_topic_marks
+        WHERE topic_id = %s {student_filter}
+        GROUP BY student_id
+    """, params)
+
+    return {
+        row["student_id"]: compute_progress(
+            row["completed_sub_topics"], total_sub_topics, row["marks_count"], row["percent_sum"]
+        )
+        for row in cursor.fetchall()
+    }, total_sub_topics
+
+
+def _write_progress(cursor, student_id, topic_id, values):
+    cursor.execute("""
+        INSERT INTO student_topic_progress
+        (student_id, topic_id, completed_sub_topics, total_sub_topics, marks_count, percent_sum,
+         progress_percent, average_score, status, last_updated)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
+        ON DUPLICATE KEY UPDATE
+            completed_sub_topics = VALUES(completed_sub_topics),
+            total_sub_topics = VALUES(total_sub_topics),
+            marks_count = VALUES(marks_count),
+            percent_sum = VALUES(percent_sum),
+            progress_percent = VALUES(progress_percent),
+            average_score = VALUES(average_score),
+            status = VALUES(status),
+            last_updated = NOW()
+    """, (
+        student_id, topic_id,
+        values["completed_sub_topics"], values["total_sub_topics"],
+        values["marks_count"], values["percent_sum"],
+        values["progress_percent"], values["average_score"], values["status"],
+    ))
+
+
+def reconcile_topic_progress(conn, apply=False, student_id=None, topic_id=None, sample_limit=20):
+    """
+    Rebuild progress from sub_topic_marks, one topic at a time, and compare
+    it with student_topic_progress.
+
+    Reports rows that drifted, rows that are missing, and stored rows that
+    no longer have any marks. With apply=True the rebuilt values are
+    written back (each topic commits separately).
+    """
+    report = {
+        "topics_checked": 0,
+        "rows_checked": 0,
+        "rows_in_sync": 0,
+        "rows_drifted": 0,
+        "rows_missing": 0,
+        "rows_orphaned": 0,
+        "rows_fixed": 0,
+        "field_drift": {field: 0 for field in COMPARED_FIELDS},
+        "samples": [],
+    }
+
+    with conn.cursor() as cursor:
+        if topic_id is not None:
+            topic_ids = [topic_id]
+        else:
+            cursor.execute("""
+                SELECT topic_id FROM topics
+                UNION
+                SELECT DISTINCT topic_id FROM student_topic_progress
+            """)
+            topic_ids = sorted(row["topic_id"] for row in cursor.fetchall())
+
+        for tid in topic_ids:
+            expected, total_sub_topics = _expected_for_topic(cursor, tid, student_id)
+
+            params = [tid]
+            student_filter = ""
+            if student_id is not None:
+                student_filter = "AND student_id = %s"
+                params.append(student_id)
+            cursor.execute(f"""
+                SELECT student_id, completed_sub_topics, total_sub_topics, marks_count, percent_sum,
+                       progress_percent, average_score, status
+                FROM student_topic_progress
+                WHERE topic_id = %s {student_filter}
+            """, params)
+            stored = {row["student_id"]: row for row in cursor.fetchall()}
+
+            report["topics_checked"] += 1
+            fixes = []
+
+            for sid in sorted(set(expected) | set(stored)):
+                report["rows_checked"] += 1
+                row = stored.get(sid)
+                values = expected.get(sid) or compute_progress(0, total_sub_topics, 0, 0)
+
+                if row is None:
+                    report["rows_missing"] += 1
+                    kind = "missing"
+                    drifted = list(COMPARED_FIELDS)
+                else:
+                    drifted = [f for f in COMPARED_FIELDS if _differs(f, row[f], values[f])]
+                    if not drifted:
+                        report["rows_in_sync"] += 1
+                        continue
+                    if sid not in expected:
+                        report["rows_orphaned"] += 1
+                        kind = "orphaned"
+                    else:
+                        report["rows_drifted"] += 1
+                        kind = "drifted"
+                    for field in drifted:
+                        report["field_drift"][field] += 1
+
+                if len(report["samples"]) < sample_limit:
+                    report["samples"].append({
+                        "student_id": sid,
+                        "topic_id": tid,
+                        "kind": kind,
+                        "fields": {
+                            f: {
+                                "stored": None if row is None else str(row[f]),
+                                "expected": str(values[f]),
+                            } for f in drifted
+                        },
+                    })
+                fixes.append((sid, values))
+
+            if apply and fixes:
+                for sid, values in fixes:
+                    _write_progress(cursor, sid, tid, values)
+                conn.commit()
+                report["rows_fixed"] += len(fixes)
+
+    return report
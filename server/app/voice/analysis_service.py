@@ -0,0 +1,292 @@
+"""
+Voice analysis service.
+
+VoiceAnalyzer work (librosa decoding, numpy, transcription) is CPU-bound
+and holds the GIL, so it runs in a dedicated process pool with one warm
+analyzer per worker process. In front of the pool sits a bounded priority
+queue: when it is full new requests are rejected immediately
+(VoiceQueueFull carries a Retry-After estimate) instead of piling up
+until they time out.
+
+When every other worker is busy, short clips (priority 0) waiting
+together are handed to one worker as a batch, so the recognizer and the
+process round trip are shared instead of paid per clip. That only pays
+off for backends whose batch shares real work (vosk reuses one decoder);
+with google every clip is its own network round trip, so clips are never
+batched and each one gets its own worker and its own timeout.
+"""
+import asyncio
+import itertools
+import math
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from config.settings import VOICE_WORKERS, VOICE_QUEUE_SIZE, VOICE_TIMEOUT_SECONDS, VOICE_BATCH_SIZE, VOICE_RECOGNIZER
+from voice.recognizers import batches_work
+
+
+# ------------------------------------------
+# Worker process side
+# ------------------------------------------
+_analyzer = None
+
+
+def _init_worker():
+    """Load the analyzer (and its recognizer model) once per worker process"""
+    global _analyzer
+    from voice.voice_analyzer import VoiceAnalyzer
+    _analyzer = VoiceAnalyzer()
+    try:
+        _analyzer.warm_up()
+    except Exception as e:
+        # keep the worker: clips still get clarity scores and a fallback transcription
+        print(f"Voice recognizer warm-up failed: {e}")
+
+
+def _warm_up():
+    return True
+
+
+def analyze_audio(audio):
+    """Analyze an in-memory clip (bytes are pickled to the worker, no temp files)"""
+    return _analyzer.analyze_audio(audio)
+
+
+def analyze_batch(clips):
+    """Analyze several short clips in one call; one result or exception per clip"""
+    return _analyzer.analyze_batch(clips)
+
+
+# ------------------------------------------
+# API process side
+# ------------------------------------------
+class VoiceQueueFull(Exception):
+    """Raised when the analysis queue is at capacity"""
+
+    def __init__(self, retry_after):
+        super().__init__("Voice analysis queue is full")
+        self.retry_after = retry_after
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class VoiceAnalysisService:
+    """
+    Bounded, prioritized front end to the analyzer process pool.
+
+    - `workers` analyses run at once (one per process)
+    - at most `queue_size` more wait in line; lower priority values go first,
+      FIFO within a priority
+    - `timeout` covers queue wait plus processing
+    - up to `batch_size` queued priority-0 clips go to a worker together,
+      only while every other worker is busy and only for recognizers that
+      share work across a batch
+    """
+
+    def __init__(self, workers=VOICE_WORKERS, queue_size=VOICE_QUEUE_SIZE, timeout=VOICE_TIMEOUT_SECONDS,
+                 batch_size=VOICE_BATCH_SIZE, recognizer=VOICE_RECOGNIZER):
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.timeout = timeout
+        self.batch_size = max(1, batch_size) if batches_work(recognizer) else 1
+
+        self._executor = None
+        self._queue = None
+        self._consumers = []
+        self._seq = itertools.count()
+        self._queued = 0
+        self._active = 0
+        self._busy = 0
+
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "timeouts": 0,
+            "worker_restarts": 0,
+            "batches": 0,
+            "batched_clips": 0,
+        }
+        # rolling windows (seconds) for percentiles and Retry-After estimates
+        self._waits = deque(maxlen=1000)
+        self._runs = deque(maxlen=1000)
+        self._started_at = None
+
+    def _new_executor(self):
+        # spawn: workers must not inherit the API process's threads and sockets
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+
+    @property
+    def started(self):
+        return self._executor is not None
+
+    def start(self):
+        if self.started:
+            return
+        self._executor = self._new_executor()
+        self._queue = asyncio.PriorityQueue()
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(self.workers)]
+        self._started_at = time.monotonic()
+        # start every worker process now so the first requests don't pay for model loading
+        for _ in range(self.workers):
+            self._executor.submit(_warm_up)
+
+    async def stop(self):
+        for task in self._consumers:
+            task.cancel()
+        for task in self._consumers:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._consumers = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def retry_after(self):
+        """Seconds until a slot is likely to free up (for the Retry-After header)"""
+        avg_run = (sum(self._runs) / len(self._runs)) if self._runs else 2.0
+        backlog = self._queued + self._active
+        return max(1, min(60, math.ceil(backlog / self.workers * avg_run)))
+
+    async def analyze(self, audio, priority=0):
+        """
+        Queue an analysis of `audio` (encoded bytes) and wait for it.
+
+        Returns (result, metrics) where metrics holds queue_wait_ms and
+        processing_ms. Raises VoiceQueueFull when the queue is at capacity
+        and asyncio.TimeoutError after `timeout` seconds.
+        """
+        if not self.started:
+            self.start()
+
+        if self._queued + self._active >= self.workers + self.queue_size:
+            self._stats["rejected"] += 1
+            raise VoiceQueueFull(self.retry_after())
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queued += 1
+        self._stats["submitted"] += 1
+        self._queue.put_nowait((priority, next(self._seq), time.monotonic(), audio, future))
+
+        try:
+            return await asyncio.wait_for(future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            raise
+
+    def _next_batch(self, first):
+        """
+        `first` plus any short clips already waiting behind it. An idle
+        worker would pick those up itself, so a batch is only formed when
+        every other worker is busy.
+        """
+        batch = [first]
+        if self._busy < self.workers - 1:
+            return batch
+        while first[0] == 0 and len(batch) < self.batch_size and not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item[0] != 0:
+                # queue is priority-ordered: nothing short is left
+                self._queue.put_nowait(item)
+                break
+            self._queued -= 1
+            if not item[4].done():
+                batch.append(item)
+        return batch
+
+    async def _consume(self):
+        while True:
+            first = await self._queue.get()
+            self._queued -= 1
+            if first[4].done():
+                # caller timed out or went away while queued
+                continue
+            batch = self._next_batch(first)
+
+            started = time.monotonic()
+            for _, _, enqueued_at, _, _ in batch:
+                self._waits.append(started - enqueued_at)
+            self._active += len(batch)
+            self._busy += 1
+            executor = self._executor
+            try:
+                if len(batch) == 1:
+                    results = [await asyncio.wrap_future(executor.submit(analyze_audio, batch[0][3]))]
+                else:
+                    self._stats["batches"] += 1
+                    self._stats["batched_clips"] += len(batch)
+                    results = await asyncio.wrap_future(
+                        executor.submit(analyze_batch, [item[3] for item in batch])
+                    )
+            except BrokenProcessPool as e:
+                self._restart_pool(executor)
+                results = [e] * len(batch)
+            except Exception as e:
+                results = [e] * len(batch)
+            finally:
+                self._active -= len(batch)
+                self._busy -= 1
+
+            run = time.monotonic() - started
+            for (_, _, enqueued_at, _, future), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    self._stats["failed"] += 1
+                    if not future.done():
+                        future.set_exception(result)
+                    continue
+                self._runs.append(run / len(batch))
+                self._stats["completed"] += 1
+                if not future.done():
+                    future.set_result((result, {
+                        "queue_wait_ms": round((started - enqueued_at) * 1000, 2),
+                        "processing_ms": round(run * 1000, 2),
+                        "batch_size": len(batch),
+                    }))
+
+    def _restart_pool(self, broken):
+        if broken is self._executor:
+            self._stats["worker_restarts"] += 1
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._new_executor()
+
+    def stats(self):
+        waits = list(self._waits)
+        runs = list(self._runs)
+        uptime = time.monotonic() - self._started_at if self._started_at else 0
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "batch_size": self.batch_size,
+            "queued": self._queued,
+            "active": self._active,
+            **self._stats,
+            "analyses_per_sec": round(self._stats["completed"] / uptime, 3) if uptime else 0.0,
+            "queue_wait_ms": {
+                "p50": round(_percentile(waits, 50) * 1000, 2),
+                "p95": round(_percentile(waits, 95) * 1000, 2),
+                "max": round(max(waits) * 1000, 2) if waits else 0.0,
+            },
+            "processing_ms": {
+                "p50": round(_percentile(runs, 50) * 1000, 2),
+                "p95": round(_percentile(runs, 95) * 1000, 2),
+                "max": round(max(runs) * 1000, 2) if runs else 0.0,
+            },
+        }
+
+
+voice_service = VoiceAnalysisService()
@@ -0,0 +1,155 @@
+"""
+Speech-recognition backends for VoiceAnalyzer.
+
+Every backend takes decoded mono int16 PCM and returns text, so audio is
+decoded once by VoiceAnalyzer whichever backend is configured. Backends
+are created once per analyzer worker process and kept warm.
+
+    google  - speech_recognition's Google Web Speech API (network round trip)
+    vosk    - offline Kaldi model on the CPU (pip install vosk, plus a model
+              directory from https://alphacephei.com/vosk/models)
+
+Select one with VOICE_RECOGNIZER.
+"""
+import json
+import speech_recognition as sr
+from config.settings import VOICE_RECOGNIZER, VOICE_VOSK_MODEL_PATH
+
+
+class NoSpeechRecognized(Exception):
+    """The recognizer ran but found no words"""
+
+
+class RecognizerUnavailable(Exception):
+    """The recognizer could not run (service down, model missing, ...)"""
+
+
+class Recognizer:
+    """
+    Base class. Subclasses implement `transcribe`; `transcribe_batch` may be
+    overridden when a backend can share work across clips.
+    """
+
+    name = "base"
+    # True when transcribe_batch shares real work across clips (a loaded
+    # model, one decoder); only then does the voice service batch clips
+    shares_batch_work = False
+
+    def warm_up(self):
+        """Load models / open sessions before the first real request"""
+
+    def transcribe(self, pcm16, sample_rate):
+        raise NotImplementedError
+
+    def transcribe_batch(self, clips, sample_rate):
+        """
+        Transcribe several clips. Returns one entry per clip: the text, or
+        the exception raised for that clip.
+        """
+        results = []
+        for pcm16 in clips:
+            try:
+                results.append(self.transcribe(pcm16, sample_rate))
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+class GoogleRecognizer(Recognizer):
+    name = "google"
+
+    def __init__(self):
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, pcm16, sample_rate):
+        audio = sr.AudioData(pcm16, sample_rate, 2)
+        try:
+            return self.recognizer.recognize_google(audio)
+        except sr.UnknownValueError:
+            raise NoSpeechRecognized()
+        except sr.RequestError as e:
+            raise RecognizerUnavailable(str(e))
+
+
+class VoskRecognizer(Recognizer):
+    """
+    Offline recognition with a Vosk (Kaldi) model. The model is loaded once
+    and shared by every clip the worker handles; a batch reuses a single
+    KaldiRecognizer, resetting it between clips.
+    """
+
+    name = "vosk"
+    shares_batch_work = True
+    # feed the decoder in ~0.25s chunks at 16 kHz
+    CHUNK_BYTES = 8000
+
+    def __init__(self, model_path=VOICE_VOSK_MODEL_PATH):
+        self.model_path = model_path
+        self._vosk = None
+        self._model = None
+
+    def _load(self):
+        if self._model is not None:
+            return
+        try:
+            import vosk
+        except ImportError:
+            raise RecognizerUnavailable("vosk is not installed (pip install vosk)")
+        vosk.SetLogLevel(-1)
+        try:
+            self._model = vosk.Model(self.model_path)
+        except Exception as e:
+            raise RecognizerUnavailable(f"Could not load Vosk model from {self.model_path}: {e}")
+        self._vosk = vosk
+
+    def warm_up(self):
+        self._load()
+        # one pass over a short silence pages in the model's graph
+        self.transcribe_batch([b"\x00\x00" * 1600], 16000)
+
+    def _run(self, recognizer, pcm16):
+        for start in range(0, len(pcm16), self.CHUNK_BYTES):
+            recognizer.AcceptWaveform(pcm16[start:start + self.CHUNK_BYTES])
+        text = json.loads(recognizer.FinalResult()).get("text", "").strip()
+        if not text:
+            raise NoSpeechRecognized()
+        return text
+
+    def transcribe(self, pcm16, sample_rate):
+        return self.transcribe_batch([pcm16], sample_rate)[0]
+
+    def transcribe_batch(self, clips, sample_rate):
+        try:
+            self._load()
+        except RecognizerUnavailable as e:
+            return [e for _ in clips]
+
+        recognizer = self._vosk.KaldiRecognizer(self._model, sample_rate)
+        results = []
+        for pcm16 in clips:
+            try:
+                results.append(self._run(recognizer, pcm16))
+            except Exception as e:
+                results.append(e)
+            recognizer.Reset()
+        return results
+
+
+RECOGNIZERS = {
+    "google": GoogleRecognizer,
+    "vosk": VoskRecognizer,
+}
+
+
+def batches_work(name=None):
+    """Whether the backend gains from batched clips (see Recognizer.shares_batch_work)"""
+    cls = RECOGNIZERS.get((name or VOICE_RECOGNIZER).lower())
+    return bool(cls and cls.shares_batch_work)
+
+
+def get_recognizer(name=None):
+    name = (name or VOICE_RECOGNIZER).strip().lower()
+    try:
+        return RECOGNIZERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown VOICE_RECOGNIZER {name!r} (choose from {', '.join(RECOGNIZERS)})")
@@ -1,29 +1,65 @@
-import speech_recognition as sr
+import io
+import os
 import librosa
 import numpy as np
 from textblob import TextBlob
+from voice.recognizers import get_recognizer, NoSpeechRecognized
+
+# Decode everything at one rate: plenty for speech, and what offline recognizers expect
+SAMPLE_RATE = 16000
+
+
+NO_SPEECH_TEXT = "Could not understand the audio."
+SERVICE_FAILED_TEXT = "Speech recognition service failed."
+
 
 class VoiceAnalyzer:
-    def __init__(self):
-        self.recognizer = sr.Recognizer()
+    def __init__(self, recognizer=None):
+        # backend chosen by VOICE_RECOGNIZER unless one is passed in
+        self.recognizer = recognizer or get_recognizer()
+
+    def warm_up(self):
+        self.recognizer.warm_up()
+
+    def decode_audio(self, audio):
+        """
+        Decode audio once into mono float32 PCM at SAMPLE_RATE.
+        Accepts raw bytes, a binary file-like object, or a path.
+        """
+        if isinstance(audio, (bytes, bytearray, memoryview)):
+            audio = io.BytesIO(audio)
+        elif not isinstance(audio, (str, os.PathLike)) and hasattr(audio, "seek"):
+            audio.seek(0)
+        samples, _ = librosa.load(audio, sr=SAMPLE_RATE, mono=True)
+        return samples
+
+    def to_pcm16(self, samples):
+        """Decoded float PCM -> little-endian int16 bytes for the recognizer"""
+        return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+    def _transcription_text(self, outcome):
+        if isinstance(outcome, NoSpeechRecognized):
+            return NO_SPEECH_TEXT
+        if isinstance(outcome, Exception):
+            return SERVICE_FAILED_TEXT
+        return outcome
+
+    def transcribe_samples(self, samples):
+        return self.transcribe_many([samples])[0]
+
+    def transcribe_many(self, sample_arrays):
+        outcomes = self.recognizer.transcribe_batch(
+            [self.to_pcm16(samples) for samples in sample_arrays], SAMPLE_RATE
+        )
+        return [self._transcription_text(outcome) for outcome in outcomes]
 
     def transcribe_audio(self, audio_file):
-        with sr.AudioFile(audio_file) as source:
-            audio = self.recognizer.record(source)
-            try:
-                text = self.recognizer.recognize_google(audio)
-                return text
-            except sr.UnknownValueError:
-                return "Could not understand the audio."
-            except sr.RequestError:
-                return "Speech recognition service failed."
+        return self.transcribe_samples(self.decode_audio(audio_file))
 
-    def analyze_audio(self, audio_file):
-        y, sr_ = librosa.load(audio_file)
-        rms = np.sqrt(np.mean(y**2))
+    def _score(self, y, transcription):
+        rms = np.sqrt(np.mean(y**2)) if y.size else 0.0
         clarity_score = "Clear" if rms > 0.1 else "Low clarity"
 
-        transcription = self.transcribe_audio(audio_file)
         sentiment_label = "N/A"
         if "Could not" not in transcription:
             sentiment = TextBlob(transcription).sentiment.polarity
@@ -34,3 +70,30 @@ class VoiceAnalyzer:
             "transcription": transcription,
             "sentiment": sentiment_label
         }
+
+    def analyze_audio(self, audio_file):
+        # Clarity scoring and transcription share one decoded array
+        y = self.decode_audio(audio_file)
+        return self._score(y, self.transcribe_samples(y))
+
+    def analyze_batch(self, audio_files):
+        """
+        Analyze several clips with one recognizer call. Returns one entry per
+        clip: the result dict, or the exception that clip raised (e.g. an
+        undecodable upload), so one bad clip doesn't fail the others.
+        """
+        results = [None] * len(audio_files)
+        decoded = []
+        for index, audio in enumerate(audio_files):
+            try:
+                decoded.append((index, self.decode_audio(audio)))
+            except Exception as e:
+                results[index] = e
+
+        transcriptions = self.transcribe_many([y for _, y in decoded]) if decoded else []
+        for (index, y), transcription in zip(decoded, transcriptions):
+            try:
+                results[index] = self._score(y, transcription)
+            except Exception as e:
+                results[index] = e
+        return results
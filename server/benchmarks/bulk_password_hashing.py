@@ -0,0 +1,59 @@
+"""
+Password hashing cost of a bulk user upload, serial vs pooled.
+
+"serial" is the old path (one bcrypt.hashpw per row on a single thread);
+"pooled" is services.passwords.hash_passwords. Also reports how often the
+progress callback fired.
+
+Usage (from server/):
+    PYTHONPATH=app python benchmarks/bulk_password_hashing.py --rows 1000 5000 10000 --rounds 12
+
+Set PASSWORD_HASH_WORKERS to size the pool (defaults to the CPU count).
+"""
+import argparse
+import json
+import time
+import bcrypt
+from config.settings import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS
+from services.passwords import hash_passwords
+
+
+def serial(passwords, rounds):
+    return [bcrypt.hashpw(p.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8") for p in passwords]
+
+
+def run(rows, rounds, skip_serial):
+    passwords = [f"Student@{i:05d}" for i in range(rows)]
+    result = {"rows": rows, "rounds": rounds, "workers": PASSWORD_HASH_WORKERS}
+
+    if not skip_serial:
+        started = time.perf_counter()
+        serial(passwords, rounds)
+        elapsed = time.perf_counter() - started
+        result["serial_seconds"] = round(elapsed, 2)
+        result["serial_rows_per_sec"] = round(rows / elapsed, 1)
+
+    updates = []
+    started = time.perf_counter()
+    hashes = hash_passwords(passwords, rounds=rounds, progress=lambda done, total: updates.append(done))
+    elapsed = time.perf_counter() - started
+    assert len(hashes) == rows and bcrypt.checkpw(passwords[-1].encode(), hashes[-1].encode())
+    result["pooled_seconds"] = round(elapsed, 2)
+    result["pooled_rows_per_sec"] = round(rows / elapsed, 1)
+    result["progress_updates"] = len(updates)
+    if "serial_seconds" in result:
+        result["speedup"] = round(result["serial_seconds"] / elapsed, 2)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--rounds", type=int, default=BCRYPT_ROUNDS)
+    parser.add_argument("--skip-serial", action="store_true", help="only time the pooled path")
+    args = parser.parse_args()
+    print(json.dumps([run(n, args.rounds, args.skip_serial) for n in args.rows], indent=2))
+
+
+if __name__ == "__main__":
+    main()
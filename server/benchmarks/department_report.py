@@ -0,0 +1,349 @@
+"""
+Department overall report: previous per-metric queries vs the single-pass
+report engine (services.department_report).
+
+Seeds a throw-away college with one department of N students (default
+2,000) into the configured MySQL database, each with assignment marks,
+sub-topic marks and sessions, then times both ways of building
+GET /assignments/overall-report and GET /topics/overall-report, counting
+the SQL statements each one runs. Outputs are compared:
+
+    assignments  - must be identical
+    topics       - the old query joined sub_topic_marks and
+                   assignment_marks side by side, so every student with
+                   rows in both had their sums multiplied; the number of
+                   students whose totals change is reported
+
+The seeded rows are deleted at the end (pass --keep to leave them).
+
+Usage (from server/, needs the DB_* settings of a scratch database):
+    PYTHONPATH=app python benchmarks/department_report.py --students 2000 --repeat 10
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+import pymysql.cursors
+from config.database import get_db
+from routes import assignments, topics
+
+
+# ------------------------------------------
+# Query counting
+# ------------------------------------------
+executed = {"count": 0}
+_execute = pymysql.cursors.Cursor.execute
+
+
+def _counting_execute(self, query, args=None):
+    executed["count"] += 1
+    return _execute(self, query, args)
+
+
+pymysql.cursors.Cursor.execute = _counting_execute
+
+
+# ------------------------------------------
+# Previous implementations (as they were before the report engine)
+# ------------------------------------------
+def legacy_assignments_report(department_id):
+    with get_db() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT department_name, college_id
+                FROM departments
+                WHERE department_id = %s AND is_active = 1
+            """, (department_id,))
+            dept = cursor.fetchone()
+            college_id = dept["college_id"]
+
+            cursor.execute("""
+                SELECT
+                    u.user_id, u.username AS student_name, u.full_name, u.last_login, d.department_name,
+                    SUM(am.marks_obtained) AS total_assignment_marks,
+                    SUM(am.max_marks) AS total_assignment_max
+                FROM assignment_marks am
+                JOIN assignments a
+                    ON am.assignment_id = a.assignment_id
+                   AND a.department_id = %s AND a.college_id = %s AND a.is_active = 1
+                JOIN users u
+                    ON am.student_id = u.user_id
+                   AND u.department_id = %s AND u.college_id = %s AND u.is_active = 1
+                JOIN departments d ON d.department_id = u.department_id
+                GROUP BY u.user_id, u.username, u.full_name, u.last_login, d.department_name
+            """, (department_id, college_id, department_id, college_id))
+            assignment_rows = cursor.fetchall()
+
+            cursor.execute("""
+                SELECT u.user_id,
+                       ROUND(SUM(stm.marks_obtained) / SUM(stm.max_marks) * 100, 2) AS topic_avg
+                FROM sub_topic_marks stm
+                JOIN users u
+                    ON stm.student_id = u.user_id
+                   AND u.department_id = %s AND u.college_id = %s AND u.is_active = 1
+                JOIN sub_topics st ON stm.sub_topic_id = st.sub_topic_id AND st.is_active = 1
+                JOIN topics t ON st.topic_id = t.topic_id AND t.is_active = 1
+                JOIN topic_college_department tcd
+                    ON tcd.topic_id = t.topic_id
+                   AND tcd.college_id = %s AND tcd.department_id = %s AND tcd.is_active = 1
+                WHERE stm.marks_obtained IS NOT NULL AND stm.max_marks > 0
+                GROUP BY u.user_id
+            """, (department_id, college_id, college_id, department_id))
+            topic_avg_map = {row["user_id"]: row["topic_avg"] for row in cursor.fetchall()}
+
+            cursor.execute("""
+                SELECT u.user_id, COALESCE(SUM(us.duration_seconds), 0) AS total_seconds
+                FROM user_sessions us
+                JOIN users u
+                    ON us.user_id = u.user_id
+                   AND u.department_id = %s AND u.college_id = %s AND u.is_active = 1
+                GROUP BY u.user_id
+            """, (department_id, college_id))
+            session_map = {row["user_id"]: row["total_seconds"] for row in cursor.fetchall()}
+
+    final = []
+    for row in assignment_rows:
+        uid = row["user_id"]
+        total_marks = row["total_assignment_marks"] or 0
+        max_marks = row["total_assignment_max"] or 0
+        final.append({
+            "student_name": row["student_name"],
+            "full_name": row["full_name"],
+            "department_name": row["department_name"],
+            "assignment_percentage": round((total_marks / max_marks) * 100, 2) if max_marks > 0 else 0,
+            "topic_average_percentage": topic_avg_map.get(uid, 0),
+            "total_session_hours": round(session_map.get(uid, 0) / 3600, 2),
+            "last_login": row["last_login"].strftime("%d/%m/%y - %I:%M %p") if row["last_login"] else "No Login",
+        })
+    final.sort(key=lambda x: x["assignment_percentage"], reverse=True)
+    return {"status": "success", "department_id": department_id, "college_id": college_id,
+            "department_name": dept["department_name"], "count": len(final), "data": final}
+
+
+def legacy_topics_report(college_id, department_id):
+    with get_db() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT
+                    u.user_id, u.username AS student_name, u.full_name, u.last_login,
+                    (COALESCE(SUM(stm.marks_obtained), 0) + COALESCE(SUM(am.marks_obtained), 0)) AS total_obtained,
+                    (COALESCE(SUM(stm.max_marks), 0) + COALESCE(SUM(am.max_marks), 0)) AS total_max,
+                    ROUND(
+                        (COALESCE(SUM(stm.marks_obtained), 0) + COALESCE(SUM(am.marks_obtained), 0)) /
+                        NULLIF((COALESCE(SUM(stm.max_marks), 0) + COALESCE(SUM(am.max_marks), 0)), 0) * 100,
+                        2
+                    ) AS overall_percentage
+                FROM users u
+                LEFT JOIN sub_topic_marks stm
+                    ON stm.student_id = u.user_id AND stm.college_id = %s AND stm.department_id = %s
+                LEFT JOIN assignment_marks am ON am.student_id = u.user_id
+                LEFT JOIN assignments a
+                    ON a.assignment_id = am.assignment_id AND a.college_id = %s AND a.department_id = %s
+                WHERE u.college_id = %s AND u.department_id = %s AND u.role_id = '5' AND u.is_active = 1
+                GROUP BY u.user_id, u.username, u.full_name, u.last_login
+                ORDER BY u.username ASC
+            """, (college_id, department_id, college_id, department_id, college_id, department_id))
+            return {"status": "success", "data": cursor.fetchall()}
+
+
+# ------------------------------------------
+# Seeding
+# ------------------------------------------
+def seed(students, topics_count, sub_topics_per_topic, assignments_count, sessions_per_student, seed_value):
+    rng = random.Random(seed_value)
+    tag = f"bench-{uuid.uuid4().hex[:8]}"
+    base = datetime(2025, 6, 1, 9, 0, 0)
+
+    with get_db() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("INSERT INTO colleges (name, college_address) VALUES (%s, %s)", (tag, "benchmark"))
+            college_id = cursor.lastrowid
+            cursor.execute(
+                "INSERT INTO departments (department_name, department_code, college_id) VALUES (%s, %s, %s)",
+                (f"{tag}-dept", tag[-8:], college_id)
+            )
+            department_id = cursor.lastrowid
+
+            sub_topic_ids = []
+            topic_ids = []
+            for t in range(topics_count):
+                cursor.execute("INSERT INTO topics (topic_name, topic_number) VALUES (%s, %s)", (f"{tag}-topic-{t}", str(t + 1)))
+                topic_id = cursor.lastrowid
+                topic_ids.append(topic_id)
+                cursor.execute(
+                    "INSERT INTO topic_college_department (topic_id, college_id, department_id) VALUES (%s, %s, %s)",
+                    (topic_id, college_id, department_id)
+                )
+                for s in range(sub_topics_per_topic):
+                    cursor.execute(
+                        "INSERT INTO sub_topics (topic_id, sub_topic_name, sub_topic_order) VALUES (%s, %s, %s)",
+                        (topic_id, f"{tag}-sub-{t}-{s}", s + 1)
+                    )
+                    sub_topic_ids.append((cursor.lastrowid, topic_id))
+
+            assignment_ids = []
+            for a in range(assignments_count):
+                cursor.execute("""
+                    INSERT INTO assignments (assignment_number, assignment_topic, department_id, college_id, start_date)
+                    VALUES (%s, %s, %s, %s, %s)
+                """, (str(a + 1), f"{tag}-assignment-{a}", department_id, college_id, base))
+                assignment_ids.append(cursor.lastrowid)
+
+            cursor.executemany("""
+                INSERT INTO users (username, password_hash, full_name, college_id, department_id, role_id, last_login)
+                VALUES (%s, 'x', %s, %s, %s, 5, %s)
+            """, [
+                (f"{tag}-s{i:05d}", f"Student {i}", college_id, department_id,
+                 base + timedelta(minutes=rng.randint(0, 90000)) if rng.random() < 0.9 else None)
+                for i in range(students)
+            ])
+            cursor.execute("SELECT user_id FROM users WHERE department_id = %s", (department_id,))
+            student_ids = [row["user_id"] for row in cursor.fetchall()]
+
+            marks = []
+            for sid in student_ids:
+                for sub_topic_id, topic_id in rng.sample(sub_topic_ids, k=rng.randint(0, len(sub_topic_ids))):
+                    marks.append((sid, sub_topic_id, topic_id, college_id, department_id,
+                                  rng.randint(0, 10), 10, base))
+            cursor.executemany("""
+                INSERT INTO sub_topic_marks
+                (student_id, sub_topic_id, topic_id, college_id, department_id, marks_obtained, max_marks, attempted_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            """, marks)
+
+            assignment_marks = [
+                (sid, assignment_id, rng.randint(0, 20), 20)
+                for sid in student_ids
+                for assignment_id in assignment_ids
+                if rng.random() < 0.8
+            ]
+            cursor.executemany("""
+                INSERT INTO assignment_marks (student_id, assignment_id, marks_obtained, max_marks)
+                VALUES (%s, %s, %s, %s)
+            """, assignment_marks)
+
+            sessions = []
+            for sid in student_ids:
+                for _ in range(rng.randint(0, sessions_per_student * 2)):
+                    start = base + timedelta(minutes=rng.randint(0, 90000))
+                    sessions.append((sid, start, start + timedelta(seconds=rng.randint(60, 5400))))
+            cursor.executemany(
+                "INSERT INTO user_sessions (user_id, start_time, end_time) VALUES (%s, %s, %s)",
+                sessions
+            )
+            conn.commit()
+
+    return {
+        "college_id": college_id,
+        "department_id": department_id,
+        "topic_ids": topic_ids,
+        "assignment_ids": assignment_ids,
+        "rows": {
+            "students": len(student_ids),
+            "sub_topic_marks": len(marks),
+            "assignment_marks": len(assignment_marks),
+            "user_sessions": len(sessions),
+        },
+    }
+
+
+def cleanup(seeded):
+    college_id = seeded["college_id"]
+    department_id = seeded["department_id"]
+    with get_db() as conn:
+        with conn.cursor() as cursor:
+            student_filter = "SELECT user_id FROM users WHERE department_id = %s"
+            cursor.execute(f"DELETE FROM user_sessions WHERE user_id IN ({student_filter})", (department_id,))
+            cursor.execute(f"DELETE FROM sub_topic_marks WHERE student_id IN ({student_filter})", (department_id,))
+            cursor.execute(f"DELETE FROM assignment_marks WHERE student_id IN ({student_filter})", (department_id,))
+            cursor.execute("DELETE FROM users WHERE department_id = %s", (department_id,))
+            cursor.execute("DELETE FROM assignments WHERE department_id = %s", (department_id,))
+            cursor.execute("DELETE FROM topic_college_department WHERE department_id = %s", (department_id,))
+            for topic_id in seeded["topic_ids"]:
+                cursor.execute("DELETE FROM sub_topics WHERE topic_id = %s", (topic_id,))
+                cursor.execute("DELETE FROM topics WHERE topic_id = %s", (topic_id,))
+            cursor.execute("DELETE FROM departments WHERE department_id = %s", (department_id,))
+            cursor.execute("DELETE FROM colleges WHERE college_id = %s", (college_id,))
+            conn.commit()
+
+
+# ------------------------------------------
+# Timing
+# ------------------------------------------
+def measure(func, repeat):
+    func()  # warm-up
+    samples = []
+    queries = 0
+    result = None
+    for _ in range(repeat):
+        executed["count"] = 0
+        started = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - started) * 1000)
+        queries = executed["count"]
+    return result, {
+        "queries": queries,
+        "median_ms": round(statistics.median(samples), 2),
+        "min_ms": round(min(samples), 2),
+        "max_ms": round(max(samples), 2),
+    }
+
+
+def normalize(payload):
+    return json.loads(json.dumps(payload, default=str))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--topics", type=int, default=5)
+    parser.add_argument("--sub-topics", type=int, default=6, help="per topic")
+    parser.add_argument("--assignments", type=int, default=8)
+    parser.add_argument("--sessions", type=int, default=10, help="average per student")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="leave the seeded rows in place")
+    args = parser.parse_args()
+
+    seeded = seed(args.students, args.topics, args.sub_topics, args.assignments, args.sessions, args.seed)
+    college_id = seeded["college_id"]
+    department_id = seeded["department_id"]
+
+    try:
+        # the route modules' functions, without the db_route executor hop
+        new_assignments = assignments.get_overall_report.__wrapped__
+        new_topics = topics.get_overall_report.__wrapped__
+
+        old_a, old_a_stats = measure(lambda: legacy_assignments_report(department_id), args.repeat)
+        new_a, new_a_stats = measure(lambda: new_assignments(department_id), args.repeat)
+        old_t, old_t_stats = measure(lambda: legacy_topics_report(college_id, department_id), args.repeat)
+        new_t, new_t_stats = measure(lambda: new_topics(college_id, department_id), args.repeat)
+
+        old_totals = {row["user_id"]: row["total_obtained"] for row in old_t["data"]}
+        inflated = sum(1 for row in new_t["data"] if old_totals.get(row["user_id"]) != row["total_obtained"])
+
+        print(json.dumps({
+            "seeded": seeded["rows"],
+            "repeat": args.repeat,
+            "assignments_overall_report": {
+                "before": old_a_stats,
+                "after": new_a_stats,
+                "identical_output": normalize(old_a) == normalize(new_a),
+            },
+            "topics_overall_report": {
+                "before": old_t_stats,
+                "after": new_t_stats,
+                "students": len(new_t["data"]),
+                "students_with_corrected_totals": inflated,
+            },
+        }, indent=2))
+    finally:
+        if not args.keep:
+            cleanup(seeded)
+
+
+if __name__ == "__main__":
+    main()
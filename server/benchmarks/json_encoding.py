@@ -0,0 +1,107 @@
+"""
+JSON response encoding: FastAPI default vs FastJSONResponse.
+
+Builds a 5,000-student department report shaped like
+assignments.get_overall_report / users.get_all_students (DictCursor rows
+with Decimal marks and datetime columns) and times the serialization
+step of each response path:
+
+    default  - jsonable_encoder + JSONResponse.render (json.dumps)
+    orjson   - FastJSONResponse.render (what FastJSONRoute does)
+
+It also checks that both paths produce the same JSON document.
+
+Usage (from server/):
+    PYTHONPATH=app python benchmarks/json_encoding.py --students 5000 --repeat 20
+"""
+import argparse
+import datetime
+import json
+import random
+import statistics
+import time
+from decimal import Decimal
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from config.responses import FastJSONResponse
+
+
+def build_report(students, seed=0):
+    rng = random.Random(seed)
+    base = datetime.datetime(2025, 6, 1, 9, 0, 0)
+    rows = []
+    for i in range(students):
+        obtained = Decimal(rng.randint(0, 5000)) / 100
+        rows.append({
+            "student_id": 10000 + i,
+            "username": f"student{i:05d}",
+            "full_name": f"Student Number {i}",
+            "college_name": "Government College of Engineering",
+            "department_name": rng.choice(["CSE", "ECE", "MECH", "CIVIL", "IT"]),
+            "assignments_completed": rng.randint(0, 12),
+            "total_marks_obtained": obtained,
+            "total_max_marks": Decimal("50.00"),
+            "average_percentage": (obtained * 2).quantize(Decimal("0.01")),
+            "topics": [
+                {
+                    "topic_id": t,
+                    "progress_percent": Decimal(rng.randint(0, 10000)) / 100,
+                    "average_score": Decimal(rng.randint(0, 10000)) / 100,
+                    "status": rng.choice(["Not Started", "Learning Now", "Ongoing", "Completed"]),
+                    "last_updated": base + datetime.timedelta(minutes=rng.randint(0, 90000)),
+                }
+                for t in range(1, 6)
+            ],
+            "created_at": base - datetime.timedelta(days=rng.randint(0, 400)),
+            "last_login": base + datetime.timedelta(seconds=rng.randint(0, 10 ** 7)),
+        })
+    return {"status": "success", "college_id": 1, "department_id": 2, "count": len(rows), "data": rows}
+
+
+def default_path(payload):
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def orjson_path(payload):
+    return FastJSONResponse(payload).body
+
+
+def time_it(func, payload, repeat):
+    func(payload)  # warm-up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = func(payload)
+        samples.append((time.perf_counter() - started) * 1000)
+    return body, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    payload = build_report(args.students)
+    results = {}
+    bodies = {}
+    for name, func in (("default", default_path), ("orjson", orjson_path)):
+        bodies[name], samples = time_it(func, payload, args.repeat)
+        results[name] = {
+            "median_ms": round(statistics.median(samples), 2),
+            "min_ms": round(min(samples), 2),
+            "max_ms": round(max(samples), 2),
+            "bytes": len(bodies[name]),
+        }
+
+    print(json.dumps({
+        "students": args.students,
+        "repeat": args.repeat,
+        "identical_json": json.loads(bodies["default"]) == json.loads(bodies["orjson"]),
+        "results": results,
+        "speedup": round(results["default"]["median_ms"] / results["orjson"]["median_ms"], 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,438 @@
+"""
+Load test against a running API, with results that can be compared
+between commits.
+
+Reads the manifest written by benchmarks/seed_data.py and drives one of
+these traffic mixes with --concurrency workers for --duration seconds:
+
+    login_storm      POST /users/login, everyone at once
+    test_start_herd  a class starting a test together: start a session,
+                     load the questions, check the attempt status, end
+                     the session
+    mark_burst       a class submitting together: store sub-topic marks
+                     for unattempted sub-topics, then refresh the
+                     dashboard
+    report_views     teachers and admins opening department / college
+                     reports
+    mixed            all of the above, weighted like a school day
+
+In the *_storm / *_herd / *_burst mixes every worker waits for the others
+before each round, so the requests arrive as a wave. Each worker keeps one
+keep-alive connection and its own random.Random(--seed + worker), so the
+same arguments replay the same choices.
+
+Per route template the run reports requests, errors, throughput and
+p50 / p95 / p99 / max latency and writes them, with the git commit and
+the seeded scale, to a JSON file. Given --compare OLD.json, the routes
+are compared with that run and the script exits 1 when any p95 grew by
+more than --threshold percent (or a route started failing).
+
+Usage (from server/, API running, data seeded):
+    python benchmarks/load_test.py --mix mixed --concurrency 32 --duration 60
+    python benchmarks/load_test.py --mix report_views --compare benchmarks/results/report_views-3f2a9c1.json
+    python benchmarks/load_test.py --input new.json --compare old.json
+"""
+import argparse
+import collections
+import http.client
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from datetime import datetime
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+MIXES = {
+    "login_storm": {"wave": True, "scenarios": {"login": 1}},
+    "test_start_herd": {"wave": True, "scenarios": {"start_test": 1}},
+    "mark_burst": {"wave": True, "scenarios": {"submit_marks": 1}},
+    "report_views": {"wave": False, "scenarios": {"report_view": 1}},
+    "mixed": {"wave": False, "scenarios": {
+        "login": 1, "dashboard": 4, "start_test": 2, "submit_marks": 2, "report_view": 1,
+    }},
+}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+# ------------------------------------------
+# HTTP
+# ------------------------------------------
+class Recorder:
+    """Latencies and status codes per route template, for one worker"""
+
+    def __init__(self, measuring):
+        self.measuring = measuring
+        self.latencies = collections.defaultdict(list)
+        self.statuses = collections.defaultdict(collections.Counter)
+
+    def record(self, route, elapsed_ms, status):
+        if self.measuring.is_set():
+            self.latencies[route].append(elapsed_ms)
+            self.statuses[route][status] += 1
+
+
+class Client:
+    """One keep-alive connection; reconnects after an error"""
+
+    def __init__(self, base_url, timeout, recorder):
+        parts = urllib.parse.urlsplit(base_url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.host = parts.netloc
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.recorder = recorder
+        self.conn = None
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def call(self, method, route, path, form=None, payload=None):
+        """Send one request; returns (status, parsed JSON or None). Status 0 = no response"""
+        headers = {}
+        body = None
+        if form is not None:
+            body = urllib.parse.urlencode(form).encode()
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        elif payload is not None:
+            body = json.dumps(payload).encode()
+            headers["Content-Type"] = "application/json"
+
+        status, data = 0, b""
+        started = time.perf_counter()
+        try:
+            if self.conn is None:
+                self.conn = self.connection_class(self.host, timeout=self.timeout)
+            self.conn.request(method, self.prefix + path, body=body, headers=headers)
+            resp = self.conn.getresponse()
+            data = resp.read()
+            status = resp.status
+            if (resp.getheader("connection") or "").lower() == "close":
+                self.close()
+        except Exception:
+            self.close()
+        self.recorder.record(f"{method} {route}", (time.perf_counter() - started) * 1000, status)
+
+        if not 200 <= status < 300:
+            return status, None
+        try:
+            return status, json.loads(data)
+        except ValueError:
+            return status, None
+
+
+# ------------------------------------------
+# Scenarios
+# ------------------------------------------
+class Workload:
+    """Seeded ids shared by every worker"""
+
+    def __init__(self, manifest):
+        self.students = manifest["students"]
+        self.password = manifest["password"]
+        self.max_marks = manifest["max_marks"]
+        self.departments = manifest["departments"]
+        self.sub_topics = [sid for t in manifest["topics"] for sid in t["sub_topic_ids"]]
+        self.topic_by_sub_topic = {sid: t["topic_id"] for t in manifest["topics"] for sid in t["sub_topic_ids"]}
+        # deque.popleft is atomic, so workers can share it without a lock
+        self.pending = collections.deque(tuple(pair) for pair in manifest["pending_marks"])
+
+    def next_pending(self, rng):
+        """An unattempted (student, sub-topic) pair; a repeat submission once they run out"""
+        try:
+            return self.pending.popleft()
+        except IndexError:
+            return rng.choice(self.students)["user_id"], rng.choice(self.sub_topics)
+
+
+def login(client, rng, work):
+    student = rng.choice(work.students)
+    client.call("POST", "/users/login", "/users/login",
+                form={"username": student["username"], "password": work.password})
+
+
+def dashboard(client, rng, work):
+    student = rng.choice(work.students)
+    client.call("GET", "/topics/{user_id}/subtopics", f"/topics/{student['user_id']}/subtopics")
+    client.call("GET", "/users/{student_id}/topics-progress", f"/users/{student['user_id']}/topics-progress")
+
+
+def start_test(client, rng, work):
+    student = rng.choice(work.students)
+    sub_topic_id = rng.choice(work.sub_topics)
+    _, started = client.call("POST", "/tests/start/{user_id}", f"/tests/start/{student['user_id']}")
+    client.call("GET", "/users/subtopic/{sub_topic_id}/questions", f"/users/subtopic/{sub_topic_id}/questions")
+    client.call("GET", "/student/{user_id}/test-attempt-status/{test_scope}/{reference_id}",
+                f"/student/{student['user_id']}/test-attempt-status/sub_topic/{sub_topic_id}")
+    if started and started.get("session_id"):
+        client.call("PUT", "/tests/end/{session_id}", f"/tests/end/{started['session_id']}")
+
+
+def submit_marks(client, rng, work):
+    student_id, sub_topic_id = work.next_pending(rng)
+    client.call("POST", "/student/store-marks", "/student/store-marks", payload={
+        "student_id": student_id,
+        "sub_topic_id": sub_topic_id,
+        "marks_obtained": rng.randint(0, work.max_marks),
+        "max_marks": work.max_marks,
+    })
+    client.call("GET", "/topics/{user_id}/subtopics/{topic_id}",
+                f"/topics/{student_id}/subtopics/{work.topic_by_sub_topic.get(sub_topic_id, 0)}")
+
+
+def report_view(client, rng, work):
+    d = rng.choice(work.departments)
+    college_id, department_id = d["college_id"], d["department_id"]
+    route, path = rng.choice([
+        ("/assignments/overall-report/{department_id}", f"/assignments/overall-report/{department_id}"),
+        ("/topics/overall-report/{college_id}/{department_id}", f"/topics/overall-report/{college_id}/{department_id}"),
+        ("/assignments/topic-averages/{department_id}", f"/assignments/topic-averages/{department_id}"),
+        ("/teacher/department/{college_id}/{department_id}/topics-progress",
+         f"/teacher/department/{college_id}/{department_id}/topics-progress"),
+        ("/superadmin/get-superadmin-report", "/superadmin/get-superadmin-report"),
+        ("/superadmin/daily-learning-hours", "/superadmin/daily-learning-hours"),
+        ("/users/overallreport/{user_id}", f"/users/overallreport/{rng.choice(work.students)['user_id']}"),
+    ])
+    client.call("GET", route, path)
+
+
+SCENARIOS = {
+    "login": login,
+    "dashboard": dashboard,
+    "start_test": start_test,
+    "submit_marks": submit_marks,
+    "report_view": report_view,
+}
+
+
+# ------------------------------------------
+# Run
+# ------------------------------------------
+def worker(index, args, work, mix, barrier, stop, recorder):
+    rng = random.Random(args.seed + index)
+    client = Client(args.base_url, args.timeout, recorder)
+    names = list(mix["scenarios"])
+    weights = [mix["scenarios"][n] for n in names]
+    try:
+        while not stop.is_set():
+            if barrier is not None:
+                try:
+                    barrier.wait()
+                except threading.BrokenBarrierError:
+                    break
+            SCENARIOS[rng.choices(names, weights)[0]](client, rng, work)
+            if args.think_ms:
+                time.sleep(args.think_ms / 1000)
+    finally:
+        client.close()
+
+
+def summarize(recorders, duration):
+    latencies = collections.defaultdict(list)
+    statuses = collections.defaultdict(collections.Counter)
+    for r in recorders:
+        for route, values in r.latencies.items():
+            latencies[route] += values
+        for route, counts in r.statuses.items():
+            statuses[route].update(counts)
+
+    def stats(values, counts):
+        errors = sum(n for status, n in counts.items() if not 200 <= status < 300)
+        return {
+            "requests": len(values),
+            "errors": errors,
+            "error_rate": round(errors / len(values), 4) if values else 0.0,
+            "rps": round(len(values) / duration, 2),
+            "mean_ms": round(sum(values) / len(values), 2) if values else 0.0,
+            "p50_ms": round(percentile(values, 50), 2),
+            "p95_ms": round(percentile(values, 95), 2),
+            "p99_ms": round(percentile(values, 99), 2),
+            "max_ms": round(max(values), 2) if values else 0.0,
+            "status": {str(status): n for status, n in sorted(counts.items())},
+        }
+
+    routes = {route: stats(latencies[route], statuses[route]) for route in sorted(latencies)}
+    every_latency = [v for values in latencies.values() for v in values]
+    every_status = collections.Counter()
+    for counts in statuses.values():
+        every_status.update(counts)
+    return stats(every_latency, every_status), routes
+
+
+def git_revision():
+    def git(*cmd):
+        return subprocess.run(["git", *cmd], cwd=HERE, capture_output=True, text=True, timeout=10).stdout.strip()
+    try:
+        return {
+            "commit": git("rev-parse", "--short", "HEAD") or None,
+            "branch": git("rev-parse", "--abbrev-ref", "HEAD") or None,
+            "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        }
+    except (OSError, subprocess.SubprocessError):
+        return {"commit": None, "branch": None, "dirty": None}
+
+
+def run(args, manifest):
+    mix = MIXES[args.mix]
+    work = Workload(manifest)
+    stop, measuring = threading.Event(), threading.Event()
+    barrier = threading.Barrier(args.concurrency) if mix["wave"] else None
+    recorders = [Recorder(measuring) for _ in range(args.concurrency)]
+    threads = [
+        threading.Thread(target=worker, args=(i, args, work, mix, barrier, stop, recorders[i]), daemon=True)
+        for i in range(args.concurrency)
+    ]
+    started_at = datetime.now().isoformat(timespec="seconds")
+    for t in threads:
+        t.start()
+
+    time.sleep(args.warmup)
+    measuring.set()
+    measure_started = time.perf_counter()
+    time.sleep(args.duration)
+    measuring.clear()
+    measured = time.perf_counter() - measure_started
+
+    stop.set()
+    if barrier is not None:
+        barrier.abort()
+    for t in threads:
+        t.join(args.timeout)
+
+    totals, routes = summarize(recorders, measured)
+    return {
+        "meta": {
+            **git_revision(),
+            "started_at": started_at,
+            "base_url": args.base_url,
+            "mix": args.mix,
+            "concurrency": args.concurrency,
+            "duration": round(measured, 2),
+            "warmup": args.warmup,
+            "think_ms": args.think_ms,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "tag": manifest.get("tag"),
+            "scale": manifest.get("scale"),
+        },
+        "totals": totals,
+        "routes": routes,
+    }
+
+
+# ------------------------------------------
+# Compare
+# ------------------------------------------
+def pct_change(old, new):
+    if not old:
+        return None
+    return round((new - old) / old * 100, 1)
+
+
+def compare(old, new, threshold):
+    """Route-by-route deltas; returns (rows, regressions, warnings)"""
+    warnings = [
+        f"{key} differs: {old['meta'].get(key)} -> {new['meta'].get(key)}"
+        for key in ("mix", "concurrency", "scale", "think_ms")
+        if old["meta"].get(key) != new["meta"].get(key)
+    ]
+    rows, regressions = [], []
+    for route in sorted(set(old["routes"]) | set(new["routes"])):
+        before, after = old["routes"].get(route), new["routes"].get(route)
+        if before is None or after is None:
+            rows.append({"route": route, "only_in": "new" if before is None else "old"})
+            continue
+        row = {
+            "route": route,
+            "p95_ms": [before["p95_ms"], after["p95_ms"]],
+            "p95_change_pct": pct_change(before["p95_ms"], after["p95_ms"]),
+            "p99_ms": [before["p99_ms"], after["p99_ms"]],
+            "rps": [before["rps"], after["rps"]],
+            "rps_change_pct": pct_change(before["rps"], after["rps"]),
+            "error_rate": [before["error_rate"], after["error_rate"]],
+        }
+        rows.append(row)
+        if row["p95_change_pct"] is not None and row["p95_change_pct"] > threshold:
+            regressions.append(f"{route}: p95 {before['p95_ms']} -> {after['p95_ms']} ms (+{row['p95_change_pct']}%)")
+        if after["error_rate"] > before["error_rate"] + 0.01:
+            regressions.append(f"{route}: error rate {before['error_rate']} -> {after['error_rate']}")
+    return rows, regressions, warnings
+
+
+def print_comparison(old, new, rows, regressions, warnings):
+    print(f"\n{old['meta'].get('commit')} -> {new['meta'].get('commit')} ({new['meta'].get('mix')})")
+    for warning in warnings:
+        print(f"  warning: {warning}")
+    print(f"  {'route':<72} {'p95 ms':>19} {'change':>8} {'rps':>17}")
+    for row in rows:
+        if "only_in" in row:
+            print(f"  {row['route']:<72} only in {row['only_in']} run")
+            continue
+        change = "n/a" if row["p95_change_pct"] is None else f"{row['p95_change_pct']:+.1f}%"
+        print(f"  {row['route']:<72} {row['p95_ms'][0]:>9} -> {row['p95_ms'][1]:<6} {change:>8} "
+              f"{row['rps'][0]:>7} -> {row['rps'][1]:<7}")
+    for regression in regressions:
+        print(f"  REGRESSION {regression}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--manifest", default=os.path.join(HERE, "seed_manifest.json"))
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds run before measuring")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="pause between iterations per worker")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="results file (default benchmarks/results/<mix>-<commit>.json)")
+    parser.add_argument("--input", help="compare this results file instead of running")
+    parser.add_argument("--compare", help="earlier results file to compare with")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed p95 growth in percent")
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input) as f:
+            results = json.load(f)
+    else:
+        with open(args.manifest) as f:
+            manifest = json.load(f)
+        results = run(args, manifest)
+        out = args.out or os.path.join(
+            HERE, "results", f"{args.mix}-{results['meta']['commit'] or 'unknown'}.json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+        with open(out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(json.dumps({"out": out, "totals": results["totals"], "routes": {
+            route: {k: s[k] for k in ("requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms")}
+            for route, s in results["routes"].items()
+        }}, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows, regressions, warnings = compare(baseline, results, args.threshold)
+        print_comparison(baseline, results, rows, regressions, warnings)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Login latency while department reports are being generated.
+
+Fires a steady stream of POST /users/login requests and, at the same time,
+keeps a number of GET /assignments/overall-report/{department_id} requests
+in flight. Prints login p50/p95/p99 so runs before and after a change can be
+compared.
+
+Usage (API must be running):
+    python benchmarks/login_under_report_load.py \
+        --base-url http://localhost:8000 \
+        --username student1 --password secret \
+        --department-id 1 --report-workers 8 --duration 30
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def timed_request(req, timeout):
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+            ok = 200 <= resp.status < 300
+    except urllib.error.HTTPError as e:
+        e.read()
+        ok = False
+    except Exception:
+        ok = False
+    return (time.perf_counter() - started) * 1000, ok
+
+
+def report_worker(args, stop, results):
+    url = f"{args.base_url}/assignments/overall-report/{args.department_id}"
+    while not stop.is_set():
+        elapsed, ok = timed_request(urllib.request.Request(url), args.timeout)
+        results.append((elapsed, ok))
+
+
+def login_worker(args, stop, results):
+    url = f"{args.base_url}/users/login"
+    body = urllib.parse.urlencode({"username": args.username, "password": args.password}).encode()
+    interval = 1.0 / args.login_rate if args.login_rate else 0
+    while not stop.is_set():
+        started = time.perf_counter()
+        req = urllib.request.Request(
+            url, data=body, headers={"Content-Type": "application/x-www-form-urlencoded"}
+        )
+        elapsed, ok = timed_request(req, args.timeout)
+        results.append((elapsed, ok))
+        sleep_for = interval - (time.perf_counter() - started)
+        if sleep_for > 0:
+            time.sleep(sleep_for)
+
+
+def summarize(results):
+    latencies = [elapsed for elapsed, _ in results]
+    return {
+        "requests": len(results),
+        "errors": sum(1 for _, ok in results if not ok),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(statistics.mean(latencies), 2) if latencies else 0.0,
+    }
+
+
+def run(args, report_workers):
+    stop = threading.Event()
+    login_results, report_results = [], []
+    threads = [
+        threading.Thread(target=report_worker, args=(args, stop, report_results), daemon=True)
+        for _ in range(report_workers)
+    ]
+    threads += [
+        threading.Thread(target=login_worker, args=(args, stop, login_results), daemon=True)
+        for _ in range(args.login_workers)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(args.duration)
+    stop.set()
+    for t in threads:
+        t.join(args.timeout)
+    return {"login": summarize(login_results), "report": summarize(report_results)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--department-id", type=int, required=True)
+    parser.add_argument("--report-workers", type=int, default=8)
+    parser.add_argument("--login-workers", type=int, default=2)
+    parser.add_argument("--login-rate", type=float, default=5.0, help="logins/sec per login worker")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--baseline", action="store_true", help="also run once without report load")
+    args = parser.parse_args()
+
+    output = {}
+    if args.baseline:
+        output["idle"] = run(args, report_workers=0)
+    output["under_report_load"] = run(args, report_workers=args.report_workers)
+    print(json.dumps(output, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Offline micro-benchmarks for the CPU hot paths.
+
+    build_question_json      tests.build_question_json over the rows of a
+                             large question DataFrame (every question type)
+    normalize_columns        tests.normalize_columns on that DataFrame
+    workbook_all_sheets      pd.read_excel(sheet_name=None) + normalize_columns
+                             on every sheet of a multi-sheet workbook
+    workbook_stream          services.question_ingest.iter_excel_rows +
+                             build_question_json on the same workbook (the
+                             upload path; only the first sheet is read)
+    hash_passwords           services.passwords.hash_passwords, the bcrypt
+                             step of users.bulk_create_users
+    analyze_audio_<n>s       VoiceAnalyzer.analyze_audio on a <n>-second clip
+
+All inputs are generated from fixed seeds, so every run sees the same
+data. Nothing touches the network or the database: analyze_audio runs
+with a recognizer that returns a fixed sentence, so the numbers cover
+decoding, clarity and sentiment scoring (transcription backends have
+benchmarks/voice_recognizers.py).
+
+Every case runs once to warm up, then --repeat rounds of at least
+--min-time seconds each with the garbage collector off (like timeit).
+Reported per case: ops/sec as the median of the rounds, the spread
+between rounds (relative stdev, high values mean the machine was busy)
+and the peak Python heap of one extra call under tracemalloc. "ops" are
+rows, passwords or clips as listed in `unit`.
+
+Results are written to --out; --compare OLD.json prints the change per
+case and exits 1 when one got slower than --threshold percent.
+
+Usage (from server/):
+    PYTHONPATH=app python benchmarks/micro_benchmarks.py
+    PYTHONPATH=app python benchmarks/micro_benchmarks.py --only build_question_json workbook \\
+        --compare benchmarks/results/micro-3f2a9c1.json
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import wave
+import numpy as np
+import openpyxl
+import pandas as pd
+from config.settings import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS
+from routes.tests import build_question_json, normalize_columns
+from services.passwords import hash_passwords
+from services.question_ingest import iter_excel_rows
+from voice.recognizers import Recognizer
+from voice.voice_analyzer import VoiceAnalyzer, SAMPLE_RATE
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+HEADERS = [" Question_Type", "Question_Text ", "Option_A", "Option_B", "Option_C", "Option_D",
+           "Correct_Answer", "Pronunciation_Word", "Column2", "Extra_1", "Marks", "Order_No"]
+
+# one sample row per question type the builder knows
+QUESTION_ROWS = [
+    ["mcq", "Pick the noun", "run", "table", "quickly", "blue", "table", None, None, None, 1],
+    ["true_false", "The sun is a star", None, None, None, None, "T", None, None, None, 1],
+    ["fill_blank", "She ___ to school", None, None, None, None, "goes, walks", None, None, None, 1],
+    ["pronunciation", "Say the word", None, None, None, None, None, "thorough", None, None, 1],
+    ["match", "Match the pairs", "cat", "dog", "cow", "hen", "B,A,D,C", None, "bark,meow,cluck,moo", None, 4],
+    ["one_word", "Opposite of hot", None, None, None, None, "cold", None, None, None, 1],
+    ["own_response", "Describe your day", None, None, None, None, None, None, None, "morning, school, friends", 5],
+]
+
+
+def question_frame(rows):
+    data = [QUESTION_ROWS[i % len(QUESTION_ROWS)] + [i + 1] for i in range(rows)]
+    return pd.DataFrame(data, columns=HEADERS)
+
+
+def build_workbook(path, sheets, rows):
+    wb = openpyxl.Workbook(write_only=True)
+    for s in range(sheets):
+        ws = wb.create_sheet(f"Sheet{s + 1}")
+        ws.append(HEADERS)
+        for i in range(rows):
+            ws.append(QUESTION_ROWS[i % len(QUESTION_ROWS)] + [i + 1])
+    wb.save(path)
+
+
+def make_clip(seconds, seed):
+    """Encoded WAV bytes: a voiced tone with noise, the same for a given seed"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    signal = 0.3 * np.sin(2 * np.pi * 220 * t) * (1 + 0.5 * np.sin(2 * np.pi * 3 * t))
+    signal += 0.05 * rng.standard_normal(t.size)
+    pcm = (np.clip(signal, -1, 1) * 32767).astype("<i2")
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+class FixedRecognizer(Recognizer):
+    """Offline stand-in: always hears the same sentence"""
+
+    name = "fixed"
+
+    def transcribe(self, pcm16, sample_rate):
+        return "I really enjoyed reading this wonderful story today"
+
+
+# ------------------------------------------
+# Cases: (name, unit, ops per call, call)
+# ------------------------------------------
+def build_cases(args, workdir):
+    cases = []
+
+    df = question_frame(args.rows)
+    records = df.rename(columns=lambda c: c.strip().lower()).to_dict("records")
+
+    def build_all():
+        for row in records:
+            build_question_json(row, row["question_type"])
+
+    def normalize():
+        normalize_columns(df.copy(deep=False))
+
+    cases.append(("build_question_json", "rows", len(records), build_all))
+    cases.append(("normalize_columns", "frames", 1, normalize))
+
+    workbook = os.path.join(workdir, "questions.xlsx")
+    build_workbook(workbook, args.sheets, args.sheet_rows)
+
+    def all_sheets():
+        for sheet in pd.read_excel(workbook, sheet_name=None).values():
+            normalize_columns(sheet)
+
+    def stream():
+        for row in iter_excel_rows(workbook):
+            build_question_json(row, row["question_type"])
+
+    cases.append(("workbook_all_sheets", "rows", args.sheets * args.sheet_rows, all_sheets))
+    cases.append(("workbook_stream", "rows", args.sheet_rows, stream))
+
+    passwords = [f"Student@{i:05d}" for i in range(args.passwords)]
+    cases.append(("hash_passwords", "passwords", len(passwords),
+                  lambda: hash_passwords(passwords, rounds=args.bcrypt_rounds)))
+
+    analyzer = VoiceAnalyzer(recognizer=FixedRecognizer())
+    for seconds in args.clip_seconds:
+        clip = make_clip(seconds, seed=int(seconds * 1000))
+        cases.append((f"analyze_audio_{seconds:g}s", "clips", 1, lambda clip=clip: analyzer.analyze_audio(clip)))
+
+    if args.only:
+        cases = [c for c in cases if any(c[0].startswith(prefix) for prefix in args.only)]
+    return cases
+
+
+# ------------------------------------------
+# Measuring
+# ------------------------------------------
+def measure(call, ops, repeat, min_time):
+    call()  # warm-up: imports, caches, pools
+
+    rates = []
+    gc_was_enabled = gc.isenabled()
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            calls = 0
+            started = time.perf_counter()
+            while True:
+                call()
+                calls += 1
+                elapsed = time.perf_counter() - started
+                if elapsed >= min_time:
+                    break
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        rates.append(calls * ops / elapsed)
+
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    median = statistics.median(rates)
+    return {
+        "ops_per_sec": round(median, 2),
+        "min_ops_per_sec": round(min(rates), 2),
+        "max_ops_per_sec": round(max(rates), 2),
+        "spread_pct": round(statistics.pstdev(rates) / statistics.mean(rates) * 100, 2),
+        "rounds": repeat,
+        "peak_mb": round((peak - baseline) / 1024 / 1024, 2),
+    }
+
+
+def git_revision():
+    def git(*cmd):
+        return subprocess.run(["git", *cmd], cwd=HERE, capture_output=True, text=True, timeout=10).stdout.strip()
+    try:
+        return {
+            "commit": git("rev-parse", "--short", "HEAD") or None,
+            "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        }
+    except (OSError, subprocess.SubprocessError):
+        return {"commit": None, "dirty": None}
+
+
+def run(args):
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, unit, ops, call in build_cases(args, workdir):
+            results[name] = {"unit": unit, "ops_per_call": ops, **measure(call, ops, args.repeat, args.min_time)}
+            print(f"{name:<24} {results[name]['ops_per_sec']:>12,.1f} {unit}/s  "
+                  f"±{results[name]['spread_pct']}%  peak {results[name]['peak_mb']} MB", file=sys.stderr)
+    return {
+        "meta": {
+            **git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "repeat": args.repeat,
+            "min_time": args.min_time,
+            "sizes": {
+                "rows": args.rows, "sheets": args.sheets, "sheet_rows": args.sheet_rows,
+                "passwords": args.passwords, "bcrypt_rounds": args.bcrypt_rounds,
+                "hash_workers": PASSWORD_HASH_WORKERS, "clip_seconds": args.clip_seconds,
+            },
+        },
+        "cases": results,
+    }
+
+
+def compare(old, new, threshold):
+    """Per-case ops/sec change; returns (rows, regressions)"""
+    rows, regressions = [], []
+    for name in sorted(set(old["cases"]) & set(new["cases"])):
+        before, after = old["cases"][name]["ops_per_sec"], new["cases"][name]["ops_per_sec"]
+        change = round((after - before) / before * 100, 1) if before else None
+        rows.append({"case": name, "ops_per_sec": [before, after], "change_pct": change,
+                     "peak_mb": [old["cases"][name]["peak_mb"], new["cases"][name]["peak_mb"]]})
+        if change is not None and change < -threshold:
+            regressions.append(f"{name}: {before} -> {after} ops/s ({change}%)")
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", help="case name prefixes to run")
+    parser.add_argument("--rows", type=int, default=20000, help="DataFrame rows")
+    parser.add_argument("--sheets", type=int, default=3)
+    parser.add_argument("--sheet-rows", type=int, default=2000)
+    parser.add_argument("--passwords", type=int, default=16)
+    parser.add_argument("--bcrypt-rounds", type=int, default=BCRYPT_ROUNDS)
+    parser.add_argument("--clip-seconds", type=float, nargs="+", default=[1, 5, 15, 30])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds per round")
+    parser.add_argument("--out", help="results file (default benchmarks/results/micro-<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare with")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed ops/sec drop in percent")
+    args = parser.parse_args()
+
+    results = run(args)
+    out = args.out or os.path.join(HERE, "results", f"micro-{results['meta']['commit'] or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps({"out": out, "cases": results["cases"]}, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline["meta"].get("sizes") != results["meta"]["sizes"]:
+            print("warning: input sizes differ from the baseline run", file=sys.stderr)
+        rows, regressions = compare(baseline, results, args.threshold)
+        print(json.dumps({"against": baseline["meta"].get("commit"), "cases": rows}, indent=2))
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Excel question ingestion throughput and memory.
+
+Generates a synthetic question workbook, streams it through
+services.question_ingest.ingest_questions and reports rows/sec plus the
+peak Python heap. The cursor only counts rows, so the numbers cover
+parsing and row building (the part that used to go through pandas).
+
+Usage (from server/):
+    PYTHONPATH=app python benchmarks/question_ingest.py --rows 10000 50000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import openpyxl
+from services.question_ingest import ingest_questions
+
+
+QUESTION_TYPES = [
+    {"question_type_id": 1, "question_type": "mcq"},
+    {"question_type_id": 2, "question_type": "fill_blank"},
+    {"question_type_id": 6, "question_type": "true_false"},
+]
+
+
+class CountingCursor:
+    """Stands in for a DictCursor; keeps only counters"""
+
+    def __init__(self):
+        self.rows = 0
+        self.batches = 0
+
+    def execute(self, sql, params=None):
+        pass
+
+    def fetchall(self):
+        return QUESTION_TYPES
+
+    def executemany(self, sql, rows):
+        self.rows += len(rows)
+        self.batches += 1
+
+
+def build_workbook(path, rows):
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(["Question_Type", "Question_Text", "Option_A", "Option_B", "Option_C",
+               "Option_D", "Correct_Answer", "Marks", "Order_No"])
+    types = ["mcq", "fill_blank", "true_false"]
+    for i in range(rows):
+        ws.append([types[i % 3], f"Question number {i}?", "alpha", "beta", "gamma",
+                   "delta", "alpha", 1, i + 1])
+    wb.save(path)
+
+
+def run(rows, chunk_size):
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        build_workbook(path, rows)
+        cursor = CountingCursor()
+        tracemalloc.start()
+        started = time.perf_counter()
+        stats = ingest_questions(cursor, path, "sub_topic", 1, chunk_size=chunk_size)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {
+            "rows": rows,
+            "file_mb": round(os.path.getsize(path) / 1024 / 1024, 2),
+            "rows_per_sec": round(stats["rows_inserted"] / elapsed, 1),
+            "seconds": round(elapsed, 3),
+            "chunks": cursor.batches,
+            "peak_heap_mb": round(peak / 1024 / 1024, 2),
+        }
+    finally:
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    print(json.dumps([run(n, args.chunk_size) for n in args.rows], indent=2))
+
+
+if __name__ == "__main__":
+    main()
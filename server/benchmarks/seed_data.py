@@ -0,0 +1,380 @@
+"""
+Synthetic data for load tests.
+
+Seeds a configurable number of colleges into the configured MySQL
+database, every one of them with departments, students, a shared set of
+topics / sub-topics with question banks, assignments and a history of
+sub-topic marks, test attempts, assignment marks and sessions. The same
+--seed and scale arguments always produce the same rows, so runs on two
+commits see the same data shape.
+
+Every seeded name starts with a tag ("bench-<hex>"); the derived tables
+(student_topic_progress, learning_hours_daily) are rebuilt for the seeded
+rows afterwards, the way the migrations tell an operator to.
+
+All students share one password (--password), so the load test can log
+in as any of them. Some sub-topics are left unattempted per student; the
+pairs are listed in the manifest for the mark-submission burst.
+
+The manifest (ids, usernames, scale) is written to --manifest and read by
+benchmarks/load_test.py. Remove the data again with --cleanup:
+
+Usage (from server/, needs the DB_* settings of a scratch database):
+    PYTHONPATH=app python benchmarks/seed_data.py --colleges 2 \
+        --departments-per-college 3 --students-per-department 300
+    PYTHONPATH=app python benchmarks/seed_data.py --cleanup --manifest benchmarks/seed_manifest.json
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from config.database import get_db
+from services.learning_hours import rebuild_learning_hours
+from services.passwords import hash_password
+from services.topic_progress import reconcile_topic_progress
+
+
+BATCH_SIZE = 5000
+SEED_START = datetime(2025, 6, 1, 8, 0, 0)
+SEED_DAYS = 60
+
+QUESTION_TYPES = {"mcq": 1, "fill_blank": 2, "true_false": 8, "one_word": 7}
+
+
+def batched_insert(cursor, sql, rows):
+    for i in range(0, len(rows), BATCH_SIZE):
+        cursor.executemany(sql, rows[i:i + BATCH_SIZE])
+    return len(rows)
+
+
+def question_rows(rng, test_scope, reference_id, count):
+    rows = []
+    for n in range(count):
+        q_type = rng.choice(list(QUESTION_TYPES))
+        if q_type == "mcq":
+            data = {"options": ["alpha", "beta", "gamma", "delta"], "correct_answer": rng.choice(["alpha", "beta", "gamma", "delta"])}
+        elif q_type == "true_false":
+            data = {"options": ["True", "False"], "correct_answer": rng.choice(["true", "false"])}
+        elif q_type == "fill_blank":
+            data = {"correct_answers": [f"word{rng.randint(1, 99)}"]}
+        else:
+            data = {"correct_answer": f"answer{rng.randint(1, 99)}"}
+        rows.append((test_scope, reference_id, QUESTION_TYPES[q_type],
+                     f"Question {n + 1} ({q_type})", json.dumps(data), 1, n + 1))
+    return rows
+
+
+def random_time(rng):
+    return SEED_START + timedelta(seconds=rng.randint(0, SEED_DAYS * 86400))
+
+
+# ------------------------------------------
+# Seeding
+# ------------------------------------------
+def seed(args):
+    rng = random.Random(args.seed)
+    tag = f"bench-{uuid.uuid4().hex[:8]}"
+    rows = {}
+    started = time.perf_counter()
+
+    # one hash for everyone: bulk bcrypt would dominate the seeding time
+    password_hash = hash_password(args.password)
+
+    with get_db() as conn:
+        with conn.cursor() as cursor:
+            # 1️⃣ Colleges and departments
+            departments = []
+            for c in range(args.colleges):
+                cursor.execute(
+                    "INSERT INTO colleges (name, college_address) VALUES (%s, %s)",
+                    (f"{tag}-college-{c}", "load test")
+                )
+                college_id = cursor.lastrowid
+                for d in range(args.departments_per_college):
+                    cursor.execute(
+                        "INSERT INTO departments (department_name, department_code, college_id) VALUES (%s, %s, %s)",
+                        (f"{tag}-dept-{c}-{d}", f"D{d + 1}", college_id)
+                    )
+                    departments.append({"college_id": college_id, "department_id": cursor.lastrowid})
+
+            # 2️⃣ Topics and sub-topics, assigned to every department
+            topics = []
+            for t in range(args.topics):
+                cursor.execute(
+                    "INSERT INTO topics (topic_name, topic_number, total_sub_topics) VALUES (%s, %s, %s)",
+                    (f"{tag}-topic-{t}", str(t + 1), args.subtopics_per_topic)
+                )
+                topic_id = cursor.lastrowid
+                sub_topic_ids = []
+                for s in range(args.subtopics_per_topic):
+                    cursor.execute(
+                        "INSERT INTO sub_topics (topic_id, sub_topic_name, sub_topic_order) VALUES (%s, %s, %s)",
+                        (topic_id, f"{tag}-sub-{t}-{s}", s + 1)
+                    )
+                    sub_topic_ids.append(cursor.lastrowid)
+                topics.append({"topic_id": topic_id, "sub_topic_ids": sub_topic_ids})
+
+            rows["topic_college_department"] = batched_insert(cursor, """
+                INSERT INTO topic_college_department (topic_id, college_id, department_id)
+                VALUES (%s, %s, %s)
+            """, [(t["topic_id"], d["college_id"], d["department_id"]) for d in departments for t in topics])
+
+            # 3️⃣ Assignments per department
+            assignment_rows = []
+            for d in departments:
+                for a in range(args.assignments_per_department):
+                    assignment_rows.append((str(a + 1), f"{tag}-assignment-{a}", d["department_id"],
+                                            d["college_id"], SEED_START))
+            rows["assignments"] = batched_insert(cursor, """
+                INSERT INTO assignments (assignment_number, assignment_topic, department_id, college_id, start_date)
+                VALUES (%s, %s, %s, %s, %s)
+            """, assignment_rows)
+            department_ids = [d["department_id"] for d in departments]
+            placeholders = ", ".join(["%s"] * len(department_ids))
+            cursor.execute(
+                f"SELECT assignment_id, department_id FROM assignments WHERE department_id IN ({placeholders})",
+                department_ids
+            )
+            assignments_by_department = {}
+            for row in cursor.fetchall():
+                assignments_by_department.setdefault(row["department_id"], []).append(row["assignment_id"])
+
+            # 4️⃣ Question banks
+            questions = []
+            for t in topics:
+                for sub_topic_id in t["sub_topic_ids"]:
+                    questions += question_rows(rng, "sub_topic", sub_topic_id, args.questions_per_test)
+            for assignment_ids in assignments_by_department.values():
+                for assignment_id in assignment_ids:
+                    questions += question_rows(rng, "assignment", assignment_id, args.questions_per_test)
+            rows["questions"] = batched_insert(cursor, """
+                INSERT INTO questions
+                (test_scope, reference_id, question_type_id, question_text, question_data, marks, order_no)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """, questions)
+
+            # 5️⃣ Students
+            users = []
+            for i, d in enumerate(departments):
+                for s in range(args.students_per_department):
+                    users.append((f"{tag}-d{i}-s{s:05d}", password_hash, f"Student {i}-{s}",
+                                  d["college_id"], d["department_id"],
+                                  random_time(rng) if rng.random() < 0.9 else None))
+            rows["users"] = batched_insert(cursor, """
+                INSERT INTO users (username, password_hash, full_name, college_id, department_id, role_id, last_login)
+                VALUES (%s, %s, %s, %s, %s, 5, %s)
+            """, users)
+            cursor.execute(
+                "SELECT user_id, username, college_id, department_id FROM users WHERE username LIKE %s ORDER BY user_id",
+                (f"{tag}-%",)
+            )
+            students = cursor.fetchall()
+
+            # 6️⃣ History: sub-topic marks with their attempts, assignment marks, sessions
+            all_sub_topics = [(sid, t["topic_id"]) for t in topics for sid in t["sub_topic_ids"]]
+            marks, attempts, assignment_marks, sessions, pending = [], [], [], [], []
+            for student in students:
+                for sub_topic_id, topic_id in all_sub_topics:
+                    if rng.random() >= args.mark_density:
+                        pending.append([student["user_id"], sub_topic_id])
+                        continue
+                    obtained = rng.randint(0, args.questions_per_test)
+                    at = random_time(rng)
+                    marks.append((student["user_id"], sub_topic_id, topic_id, student["college_id"],
+                                  student["department_id"], obtained, args.questions_per_test, at))
+                    attempts.append((student["user_id"], "sub_topic", sub_topic_id, 1, 1,
+                                     args.questions_per_test, obtained, at, at))
+
+                for assignment_id in assignments_by_department.get(student["department_id"], []):
+                    if rng.random() < args.mark_density:
+                        assignment_marks.append((student["user_id"], assignment_id,
+                                                 rng.randint(0, 20), 20, random_time(rng)))
+
+                for _ in range(args.sessions_per_student):
+                    start = random_time(rng)
+                    sessions.append((student["user_id"], start, start + timedelta(seconds=rng.randint(60, 5400))))
+
+            rows["sub_topic_marks"] = batched_insert(cursor, """
+                INSERT INTO sub_topic_marks
+                (student_id, sub_topic_id, topic_id, college_id, department_id, marks_obtained, max_marks, attempted_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            """, marks)
+            rows["student_test_attempts"] = batched_insert(cursor, """
+                INSERT INTO student_test_attempts
+                (student_id, test_scope, reference_id, attempt_number, is_completed,
+                 total_marks, obtained_marks, started_at, completed_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, attempts)
+            rows["assignment_marks"] = batched_insert(cursor, """
+                INSERT INTO assignment_marks (student_id, assignment_id, marks_obtained, max_marks, graded_at)
+                VALUES (%s, %s, %s, %s, %s)
+            """, assignment_marks)
+            rows["user_sessions"] = batched_insert(cursor, """
+                INSERT INTO user_sessions (user_id, start_time, end_time) VALUES (%s, %s, %s)
+            """, sessions)
+            conn.commit()
+
+        # 7️⃣ Derived tables
+        for t in topics:
+            reconcile_topic_progress(conn, apply=True, topic_id=t["topic_id"])
+        rebuild_learning_hours(conn, SEED_START.date(), (SEED_START + timedelta(days=SEED_DAYS + 1)).date())
+
+    rng.shuffle(pending)
+    return {
+        "tag": tag,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "seed_seconds": round(time.perf_counter() - started, 2),
+        "scale": {
+            "colleges": args.colleges,
+            "departments_per_college": args.departments_per_college,
+            "students_per_department": args.students_per_department,
+            "topics": args.topics,
+            "subtopics_per_topic": args.subtopics_per_topic,
+            "questions_per_test": args.questions_per_test,
+            "assignments_per_department": args.assignments_per_department,
+            "mark_density": args.mark_density,
+            "sessions_per_student": args.sessions_per_student,
+            "seed": args.seed,
+        },
+        "rows": rows,
+        "password": args.password,
+        "max_marks": args.questions_per_test,
+        "departments": departments,
+        "topics": topics,
+        "assignments": assignments_by_department,
+        "students": [
+            {"user_id": s["user_id"], "username": s["username"],
+             "college_id": s["college_id"], "department_id": s["department_id"]}
+            for s in students
+        ],
+        "pending_marks": pending[:args.pending_limit],
+    }
+
+
+# ------------------------------------------
+# Cleanup
+# ------------------------------------------
+def cleanup(tag):
+    """Delete everything seeded under `tag`, children first"""
+    pattern = f"{tag}-%"
+    students = "SELECT user_id FROM users WHERE username LIKE %s"
+    topics = "SELECT topic_id FROM topics WHERE topic_name LIKE %s"
+    deleted = {}
+
+    with get_db() as conn:
+        with conn.cursor() as cursor:
+            # derived tables are filled by ids, not names: note the span of sessions first
+            cursor.execute(f"""
+                SELECT DATE(MIN(end_time)) AS first_day, DATE(MAX(end_time)) AS last_day
+                FROM user_sessions WHERE user_id IN ({students})
+            """, (pattern,))
+            span = cursor.fetchone()
+
+            cursor.execute(f"SELECT sub_topic_id FROM sub_topics WHERE topic_id IN ({topics})", (pattern,))
+            sub_topic_ids = [row["sub_topic_id"] for row in cursor.fetchall()]
+            cursor.execute(
+                "SELECT a.assignment_id FROM assignments a JOIN departments d ON d.department_id = a.department_id "
+                "WHERE d.department_name LIKE %s", (pattern,)
+            )
+            assignment_ids = [row["assignment_id"] for row in cursor.fetchall()]
+
+            for table, column in (
+                ("student_test_attempts", "student_id"),
+                ("sub_topic_marks", "student_id"),
+                ("assignment_marks", "student_id"),
+                ("user_sessions", "user_id"),
+                ("student_topic_progress", "student_id"),
+                ("student_subtopic_progress", "student_id"),
+            ):
+                cursor.execute(f"DELETE FROM {table} WHERE {column} IN ({students})", (pattern,))
+                deleted[table] = cursor.rowcount
+
+            deleted["questions"] = 0
+            deleted["question_bundles"] = 0
+            for scope, ids in (("sub_topic", sub_topic_ids), ("assignment", assignment_ids)):
+                for i in range(0, len(ids), BATCH_SIZE):
+                    chunk = ids[i:i + BATCH_SIZE]
+                    placeholders = ", ".join(["%s"] * len(chunk))
+                    for table in ("questions", "question_bundles"):
+                        cursor.execute(
+                            f"DELETE FROM {table} WHERE test_scope = %s AND reference_id IN ({placeholders})",
+                            [scope, *chunk]
+                        )
+                        deleted[table] += cursor.rowcount
+
+            cursor.execute("DELETE FROM users WHERE username LIKE %s", (pattern,))
+            deleted["users"] = cursor.rowcount
+            cursor.execute(f"DELETE FROM topic_college_department WHERE topic_id IN ({topics})", (pattern,))
+            deleted["topic_college_department"] = cursor.rowcount
+            cursor.execute(f"DELETE FROM sub_topics WHERE topic_id IN ({topics})", (pattern,))
+            deleted["sub_topics"] = cursor.rowcount
+            cursor.execute("DELETE FROM topics WHERE topic_name LIKE %s", (pattern,))
+            deleted["topics"] = cursor.rowcount
+            cursor.execute(
+                "DELETE a FROM assignments a JOIN departments d ON d.department_id = a.department_id "
+                "WHERE d.department_name LIKE %s", (pattern,)
+            )
+            deleted["assignments"] = cursor.rowcount
+            cursor.execute("DELETE FROM departments WHERE department_name LIKE %s", (pattern,))
+            deleted["departments"] = cursor.rowcount
+            cursor.execute("DELETE FROM colleges WHERE name LIKE %s", (pattern,))
+            deleted["colleges"] = cursor.rowcount
+            conn.commit()
+
+        if span and span["first_day"]:
+            rebuild_learning_hours(conn, span["first_day"], span["last_day"])
+
+    return deleted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--colleges", type=int, default=2)
+    parser.add_argument("--departments-per-college", type=int, default=3)
+    parser.add_argument("--students-per-department", type=int, default=200)
+    parser.add_argument("--topics", type=int, default=10)
+    parser.add_argument("--subtopics-per-topic", type=int, default=5)
+    parser.add_argument("--questions-per-test", type=int, default=10)
+    parser.add_argument("--assignments-per-department", type=int, default=4)
+    parser.add_argument("--mark-density", type=float, default=0.6,
+                        help="share of sub-topics / assignments every student has marks for")
+    parser.add_argument("--sessions-per-student", type=int, default=10)
+    parser.add_argument("--pending-limit", type=int, default=50000,
+                        help="unattempted (student, sub-topic) pairs kept in the manifest")
+    parser.add_argument("--password", default="bench-password")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--manifest", default="benchmarks/seed_manifest.json")
+    parser.add_argument("--cleanup", action="store_true", help="delete the rows of the manifest's tag")
+    parser.add_argument("--tag", help="tag to clean up when the manifest is gone")
+    args = parser.parse_args()
+
+    try:
+        if args.cleanup:
+            tag = args.tag
+            if not tag:
+                with open(args.manifest) as f:
+                    tag = json.load(f)["tag"]
+            if not tag.startswith("bench-"):
+                raise ValueError(f"Refusing to clean up tag {tag!r}")
+            print(json.dumps({"tag": tag, "deleted": cleanup(tag)}, indent=2))
+            return
+
+        manifest = seed(args)
+        with open(args.manifest, "w") as f:
+            json.dump(manifest, f, indent=1)
+        print(json.dumps({
+            "tag": manifest["tag"],
+            "manifest": args.manifest,
+            "seed_seconds": manifest["seed_seconds"],
+            "rows": manifest["rows"],
+        }, indent=2))
+    except Exception as e:
+        print(f"Seeding failed: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Transcription latency per speech-recognition backend.
+
+Decodes a set of WAV clips once, then runs them through each requested
+recognizer (voice.recognizers) in-process, one clip at a time and in
+batches, and reports latency percentiles, clips/sec and how many clips
+came back as errors. The point of comparison is that the offline backend
+keeps the same latency with or without network access, while google
+depends entirely on the external service.
+
+Clips come from --samples (a directory of .wav files, e.g. real student
+recordings); without it a set of synthetic clips of mixed length is used.
+Backends that cannot run here (vosk not installed, model missing) are
+reported as unavailable rather than failing the run.
+
+Usage (from server/):
+    PYTHONPATH=app python benchmarks/voice_recognizers.py --backends google vosk \\
+        --samples path/to/wavs --batch-size 8
+"""
+import argparse
+import glob
+import json
+import os
+import time
+from voice.recognizers import get_recognizer, RecognizerUnavailable, NoSpeechRecognized
+from voice.voice_analyzer import VoiceAnalyzer, SAMPLE_RATE
+from voice_throughput import make_clip
+
+
+def pct(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] if ordered else 0.0
+
+
+def load_clips(samples_dir, count):
+    # only used for decoding; the recognizer is never called
+    analyzer = VoiceAnalyzer(recognizer=get_recognizer("google"))
+    if samples_dir:
+        paths = sorted(glob.glob(os.path.join(samples_dir, "*.wav")))
+        if not paths:
+            raise SystemExit(f"No .wav files in {samples_dir}")
+        sources = [(os.path.basename(p), open(p, "rb").read()) for p in paths]
+    else:
+        # short answers dominate real traffic: mostly 1-3s, a few longer ones
+        lengths = [1.0, 1.5, 2.0, 3.0, 6.0]
+        sources = [(f"synthetic_{i}", make_clip(lengths[i % len(lengths)], seed=i)) for i in range(count)]
+    return [(name, analyzer.to_pcm16(analyzer.decode_audio(data))) for name, data in sources]
+
+
+def classify(outcome):
+    if isinstance(outcome, NoSpeechRecognized):
+        return "no_speech"
+    if isinstance(outcome, Exception):
+        return "error"
+    return "text"
+
+
+def run_backend(name, clips, batch_size):
+    recognizer = get_recognizer(name)
+    started = time.perf_counter()
+    try:
+        recognizer.warm_up()
+    except RecognizerUnavailable as e:
+        return {"backend": name, "available": False, "reason": str(e)}
+    warm_up_ms = (time.perf_counter() - started) * 1000
+
+    single = []
+    outcomes = {"text": 0, "no_speech": 0, "error": 0}
+    for _, pcm16 in clips:
+        t0 = time.perf_counter()
+        outcome = recognizer.transcribe_batch([pcm16], SAMPLE_RATE)[0]
+        single.append((time.perf_counter() - t0) * 1000)
+        outcomes[classify(outcome)] += 1
+
+    batched_started = time.perf_counter()
+    for start in range(0, len(clips), batch_size):
+        recognizer.transcribe_batch([pcm16 for _, pcm16 in clips[start:start + batch_size]], SAMPLE_RATE)
+    batched = time.perf_counter() - batched_started
+
+    audio_seconds = sum(len(pcm16) / 2 / SAMPLE_RATE for _, pcm16 in clips)
+    return {
+        "backend": name,
+        "available": True,
+        "warm_up_ms": round(warm_up_ms, 1),
+        "clips": len(clips),
+        "audio_seconds": round(audio_seconds, 1),
+        "outcomes": outcomes,
+        "latency_ms": {
+            "p50": round(pct(single, 50), 1),
+            "p95": round(pct(single, 95), 1),
+            "max": round(max(single), 1),
+        },
+        "clips_per_sec": round(len(clips) / (sum(single) / 1000), 2),
+        "batched_clips_per_sec": round(len(clips) / batched, 2),
+        "real_time_factor": round(sum(single) / 1000 / audio_seconds, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["google", "vosk"])
+    parser.add_argument("--samples", help="directory of .wav clips (default: synthetic clips)")
+    parser.add_argument("--clips", type=int, default=20, help="number of synthetic clips")
+    parser.add_argument("--batch-size", type=int, default=8)
+    args = parser.parse_args()
+
+    clips = load_clips(args.samples, args.clips)
+    print(json.dumps([run_backend(name, clips, args.batch_size) for name in args.backends], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Voice analysis throughput vs worker count.
+
+Builds a set of synthetic in-memory WAV clips, pushes them through
+voice.analysis_service.VoiceAnalysisService with 1..N worker processes
+and reports analyses/sec plus queue-wait / processing percentiles.
+Throughput should grow roughly with the number of cores.
+
+Note: transcription uses whichever recognizer VoiceAnalyzer is configured
+with; with the Google recognizer and no network each clip fails fast,
+so the numbers mostly reflect decoding and scoring.
+
+Usage (from server/):
+    PYTHONPATH=app python benchmarks/voice_throughput.py --workers 1 2 4 --clips 40
+"""
+import argparse
+import asyncio
+import io
+import json
+import time
+import wave
+import numpy as np
+from voice.analysis_service import VoiceAnalysisService
+
+
+def make_clip(seconds, rate=16000, seed=0):
+    """Encoded WAV bytes, as an upload would deliver them"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * rate)) / rate
+    signal = 0.3 * np.sin(2 * np.pi * (180 + 40 * seed % 200) * t) + 0.05 * rng.standard_normal(t.size)
+    pcm = (np.clip(signal, -1, 1) * 32767).astype("<i2")
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+async def run(workers, clips):
+    service = VoiceAnalysisService(workers=workers, queue_size=len(clips), timeout=600)
+    service.start()
+    # let every worker finish loading before timing
+    await asyncio.gather(*(service.analyze(clips[0]) for _ in range(workers)))
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(service.analyze(clip) for clip in clips), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    await service.stop()
+
+    metrics = [r[1] for r in results if not isinstance(r, Exception)]
+    waits = sorted(m["queue_wait_ms"] for m in metrics)
+    runs = sorted(m["processing_ms"] for m in metrics)
+
+    def pct(values, p):
+        return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))] if values else 0.0
+
+    return {
+        "workers": workers,
+        "clips": len(clips),
+        "errors": len(results) - len(metrics),
+        "seconds": round(elapsed, 2),
+        "analyses_per_sec": round(len(clips) / elapsed, 2),
+        "queue_wait_ms": {"p50": pct(waits, 50), "p95": pct(waits, 95)},
+        "processing_ms": {"p50": pct(runs, 50), "p95": pct(runs, 95)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clips", type=int, default=40)
+    parser.add_argument("--seconds", type=float, default=3.0, help="length of each clip")
+    args = parser.parse_args()
+
+    clips = [make_clip(args.seconds, seed=i) for i in range(args.clips)]
+    results = [asyncio.run(run(n, clips)) for n in args.workers]
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
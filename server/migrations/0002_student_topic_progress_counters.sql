@@ -0,0 +1,19 @@
+-- Running counters for incremental student_topic_progress maintenance.
+--
+-- 1. Drop duplicate (student_id, topic_id) rows (keep the newest) so the
+--    unique key can be added; store_marks' upsert relies on it.
+-- 2. Add marks_count / percent_sum next to the derived columns.
+-- 3. Then seed the counters from sub_topic_marks:
+--        cd server/app && python -m commands.reconcile_progress --apply
+
+DELETE stp
+FROM student_topic_progress stp
+JOIN student_topic_progress newer
+  ON newer.student_id = stp.student_id
+ AND newer.topic_id = stp.topic_id
+ AND newer.id > stp.id;
+
+ALTER TABLE student_topic_progress
+  ADD COLUMN marks_count int NOT NULL DEFAULT '0' AFTER total_sub_topics,
+  ADD COLUMN percent_sum decimal(14,6) NOT NULL DEFAULT '0.000000' AFTER marks_count,
+  ADD UNIQUE KEY uq_student_topic (student_id, topic_id);
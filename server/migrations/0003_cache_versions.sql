@@ -0,0 +1,26 @@
+-- Shared state for the in-process caches.
+--
+-- Each API / job worker keeps its own copy of cached catalog reads and
+-- polls this row to learn when another process changed the catalog
+-- (CATALOG_CACHE_BACKEND=mysql).
+
+CREATE TABLE IF NOT EXISTS cache_versions (
+  name varchar(64) NOT NULL,
+  version bigint NOT NULL DEFAULT '0',
+  updated_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+INSERT IGNORE INTO cache_versions (name, version) VALUES ('catalog', 0);
+
+-- Per-key invalidation log (e.g. one student's dashboard snapshot), polled
+-- by every process (DASHBOARD_CACHE_BACKEND=mysql). Rows older than a day
+-- are trimmed by the writers.
+CREATE TABLE IF NOT EXISTS cache_invalidations (
+  id bigint NOT NULL AUTO_INCREMENT,
+  cache_name varchar(64) NOT NULL,
+  cache_key varchar(128) NOT NULL,
+  created_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (id),
+  KEY idx_cache_invalidations_created (created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
@@ -0,0 +1,16 @@
+-- Precompiled question bundles: the encoded JSON bodies of a test's
+-- questions plus their ETags, written whenever the questions change
+-- (services/question_bundles.py). Existing tests are compiled on first read.
+
+CREATE TABLE IF NOT EXISTS question_bundles (
+  test_scope enum('assignment','sub_topic') NOT NULL,
+  reference_id int NOT NULL,
+  version int NOT NULL DEFAULT '1',
+  question_count int NOT NULL DEFAULT '0',
+  full_etag varchar(66) NOT NULL,
+  full_body longblob NOT NULL,
+  student_etag varchar(66) NOT NULL,
+  student_body longblob NOT NULL,
+  compiled_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (test_scope, reference_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
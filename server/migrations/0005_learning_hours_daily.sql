@@ -0,0 +1,19 @@
+-- Daily learning-hours rollup read by superadmin.get_daily_learning_hours
+-- and kept current by tests.end_session (see services/learning_hours.py).
+--
+-- After creating it, fill in the existing history:
+--     cd server/app && python -m commands.backfill_learning_hours
+
+CREATE TABLE IF NOT EXISTS learning_hours_daily (
+  scope enum('global','college','department') NOT NULL,
+  scope_id int NOT NULL DEFAULT '0',
+  day date NOT NULL,
+  sessions int NOT NULL DEFAULT '0',
+  total_seconds bigint NOT NULL DEFAULT '0',
+  updated_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (scope, scope_id, day),
+  KEY idx_day (day)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- Backfill reads user_sessions by end_time range
+ALTER TABLE user_sessions ADD KEY idx_end_time (end_time);
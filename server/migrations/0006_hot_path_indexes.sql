@@ -0,0 +1,31 @@
+-- Composite indexes for the predicates the routers repeat on every request.
+-- Each replaces a single-column key that is its leftmost prefix (so the
+-- foreign keys stay backed by an index) instead of adding a second one
+-- that every insert would also have to maintain. Checked by
+--     cd server/app && python -m commands.check_query_plans
+
+-- "Has the student completed this test?" (students.py, users.py):
+-- student_id + test_scope + reference_id + is_completed, newest attempt first
+ALTER TABLE student_test_attempts
+  ADD KEY idx_sta_student_test (student_id, test_scope, reference_id, is_completed, attempt_number),
+  DROP KEY student_id;
+
+-- A test's question set in order (question_bundles, students.py)
+ALTER TABLE questions
+  ADD KEY idx_questions_scope_ref_order (test_scope, reference_id, order_no),
+  DROP KEY idx_test_scope_ref;
+
+-- One student's marks per topic (users.py topic breakdown, reports)
+ALTER TABLE sub_topic_marks
+  ADD KEY idx_stm_student_topic (student_id, topic_id),
+  DROP KEY student_id;
+
+-- Learning time per user: covers SUM(duration_seconds) without reading rows
+ALTER TABLE user_sessions
+  ADD KEY idx_sessions_user_end (user_id, end_time, duration_seconds),
+  DROP KEY user_id;
+
+-- Topics assigned to a college department (topics.py, departments.py);
+-- topic_id is included so the join to topics is served from the index
+ALTER TABLE topic_college_department
+  ADD KEY idx_tcd_college_dept_active (college_id, department_id, is_active, topic_id);
@@ -0,0 +1,14 @@
+-- Background jobs record their result here in the same transaction as
+-- their own DB work (jobs/runner.py: record_job_commit). A job that is
+-- requeued after its work was committed (worker died before the job
+-- store was told) finds its row and reuses the result instead of
+-- importing the file a second time.
+
+CREATE TABLE IF NOT EXISTS job_commits (
+  job_id char(32) NOT NULL,
+  kind varchar(64) NOT NULL,
+  result longtext,
+  committed_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (job_id),
+  KEY idx_committed_at (committed_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
@@ -0,0 +1,21 @@
+-- Seed the marks_count / percent_sum counters added by 0002 from
+-- sub_topic_marks. Until they are seeded, apply_sub_topic_mark averages
+-- only the new mark and overwrites the student's earlier average_score.
+-- Same aggregates as services/topic_progress.py (reconciliation), so
+-- databases already fixed with `commands.reconcile_progress --apply` get
+-- the same values again.
+
+UPDATE student_topic_progress stp
+JOIN (
+  SELECT
+    student_id,
+    topic_id,
+    COUNT(marks_obtained / NULLIF(max_marks, 0)) AS marks_count,
+    COALESCE(SUM((marks_obtained / NULLIF(max_marks, 0)) * 100), 0) AS percent_sum
+  FROM sub_topic_marks
+  GROUP BY student_id, topic_id
+) seeded
+  ON seeded.student_id = stp.student_id
+ AND seeded.topic_id = stp.topic_id
+SET stp.marks_count = seeded.marks_count,
+    stp.percent_sum = seeded.percent_sum;